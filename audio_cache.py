@@ -0,0 +1,108 @@
+"""
+解码音频缓存 - audio_to_text.py 与 audio_to_text_diarize.py 共用
+ffmpeg 把媒体文件解码为 16kHz 单声道 float32 PCM 后保存为 .npy，
+以 (路径, 大小, 修改时间) 为键；之后重复运行、断点续传以及普通/说话人识别
+两个脚本处理同一文件时，直接用 np.load(mmap_mode="r") 内存映射读取，不再重复解码
+"""
+
+import hashlib
+import os
+import subprocess
+from pathlib import Path
+
+import numpy as np
+
+# Whisper / WhisperX 要求的采样率
+SAMPLE_RATE = 16000
+
+# 默认缓存容量上限（MB）
+DEFAULT_MAX_MB = 20480
+
+
+def decode_audio(audio_file, start=0.0, sr=SAMPLE_RATE):
+    """
+    使用 ffmpeg 解码音频为单声道 float32 数组
+
+    Args:
+        audio_file: 音视频文件路径
+        start: 起始偏移（秒），ffmpeg 直接跳转到该位置，之前的部分不解码
+        sr: 目标采样率
+
+    Returns:
+        numpy.ndarray: 取值范围 [-1, 1] 的 float32 音频
+    """
+    cmd = ["ffmpeg", "-nostdin", "-threads", "0"]
+    if start > 0:
+        cmd += ["-ss", f"{start:.3f}"]
+    cmd += [
+        "-i",
+        str(audio_file),
+        "-f",
+        "s16le",
+        "-ac",
+        "1",
+        "-acodec",
+        "pcm_s16le",
+        "-ar",
+        str(sr),
+        "-",
+    ]
+    try:
+        out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"音频解码失败: {e.stderr.decode(errors='ignore')}") from e
+
+    return np.frombuffer(out, np.int16).flatten().astype(np.float32) / 32768.0
+
+
+def cache_path(audio_file, cache_dir):
+    """缓存文件路径：由绝对路径、文件大小和修改时间生成的键"""
+    stat = os.stat(audio_file)
+    identity = f"{os.path.abspath(audio_file)}|{stat.st_size}|{stat.st_mtime_ns}"
+    key = hashlib.sha1(identity.encode("utf-8")).hexdigest()
+    return Path(cache_dir) / f"{key}.npy"
+
+
+def prune_cache(cache_dir, max_mb=DEFAULT_MAX_MB, keep=None):
+    """缓存总大小超过上限时，按最近使用时间从旧到新删除（keep 指定的文件除外）"""
+    files = sorted(Path(cache_dir).glob("*.npy"), key=lambda p: p.stat().st_mtime)
+    total = sum(p.stat().st_size for p in files)
+    limit = max_mb * 1024 * 1024
+    for path in files:
+        if total <= limit:
+            break
+        if path == keep:
+            continue
+        total -= path.stat().st_size
+        path.unlink(missing_ok=True)
+
+
+def load_audio(audio_file, start=0.0, cache_dir=None, max_mb=DEFAULT_MAX_MB):
+    """
+    加载 16kHz 单声道 float32 音频
+
+    未指定 cache_dir 时直接用 ffmpeg 从 start 处开始解码；指定时整段解码一次
+    写入缓存，之后以只读内存映射方式读取并切片
+
+    Returns:
+        numpy.ndarray（使用缓存时为只读 memmap）
+    """
+    if not cache_dir:
+        return decode_audio(audio_file, start=start)
+
+    path = cache_path(audio_file, cache_dir)
+    if path.exists():
+        # 更新修改时间，作为 LRU 淘汰依据
+        os.utime(path)
+    else:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        audio = decode_audio(audio_file)
+        # 先写临时文件再替换，避免并发进程读到写了一半的缓存
+        tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, audio)
+        os.replace(tmp_path, path)
+        prune_cache(cache_dir, max_mb, keep=path)
+
+    audio = np.load(path, mmap_mode="r")
+    return audio[int(start * SAMPLE_RATE) :] if start > 0 else audio
@@ -0,0 +1,159 @@
+"""
+音频预取 - batch_transcribe.py 进程内 / 批量解码模式使用
+模型转录当前文件时，后台解码线程提前用 ffmpeg 把后面 lookahead 个文件解码为
+16kHz PCM，使解码和推理重叠（视频文件解码耗时明显时吞吐量提升最多）。
+解码在 ffmpeg 子进程中进行，等待期间释放 GIL，因此使用线程即可。
+
+已解码但尚未交给转录的音频总大小受 max_mb 限制；单个文件超过上限时
+仍会解码（此时不再预取其他文件），保证不会卡住。从解码缓存内存映射的音频
+不占用内存，不计入上限
+"""
+
+import queue
+import threading
+
+import numpy as np
+
+from audio_cache import SAMPLE_RATE
+
+# 默认预取文件数
+DEFAULT_PREFETCH_FILES = 2
+
+# 默认预取内存上限（MB）：16kHz float32 每小时音频约 220MB
+DEFAULT_PREFETCH_MB = 1024
+
+# 默认解码线程数
+DEFAULT_DECODERS = 2
+
+# float32 PCM 每秒字节数
+BYTES_PER_SECOND = SAMPLE_RATE * 4
+
+
+class AudioPrefetcher:
+    """
+    按输入顺序产出 (文件, 音频, 错误)，音频由后台线程提前解码
+
+    Args:
+        media_files: 文件列表或可迭代对象（可以是流式扫描或监视目录，按需读取）
+        load:        解码函数 load(文件) -> numpy 数组；返回 None 表示该文件
+                     不需要预取（例如已有输出文件），原样交给调用方处理
+        lookahead:   最多提前解码的文件数
+        max_mb:      已解码未取走的音频总大小上限（MB）
+        decoders:    解码线程数
+        duration:    时长函数 duration(文件) -> 秒或 None，用于解码前预留内存
+                     （未知时解码完成后按实际大小计入）
+    """
+
+    def __init__(
+        self,
+        media_files,
+        load,
+        lookahead=DEFAULT_PREFETCH_FILES,
+        max_mb=DEFAULT_PREFETCH_MB,
+        decoders=DEFAULT_DECODERS,
+        duration=None,
+    ):
+        self.load = load
+        self.lookahead = max(1, lookahead)
+        self.max_bytes = max_mb * 1024 * 1024
+        self.duration = duration
+        self._files = media_files
+        self._tasks = queue.Queue()
+        self._cond = threading.Condition()
+        self._results = {}  # 序号 -> (文件, 音频, 错误, 占用字节数)
+        self._reserved = 0  # 预取中及已解码未取走的音频字节数
+        self._consumed = 0  # 下一个交给调用方的序号
+        self._total = None  # 输入读取完毕后的文件总数
+        self._feed_error = None
+        self._closed = False
+        self._decoders = max(1, min(decoders, self.lookahead))
+        self._threads = []
+
+    def _spawn(self, target, name):
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _estimate(self, media_file):
+        seconds = self.duration(media_file) if self.duration else None
+        return int(seconds * BYTES_PER_SECOND) if seconds else 0
+
+    def _feed(self):
+        """按顺序读取输入，在预取数量和内存上限允许时交给解码线程"""
+        count = 0
+        try:
+            for media_file in self._files:
+                estimate = self._estimate(media_file)
+                with self._cond:
+                    while not self._closed and (
+                        count - self._consumed >= self.lookahead
+                        or (self._reserved and self._reserved + estimate > self.max_bytes)
+                    ):
+                        self._cond.wait()
+                    if self._closed:
+                        return
+                    self._reserved += estimate
+                self._tasks.put((count, media_file, estimate))
+                count += 1
+        except Exception as e:
+            self._feed_error = e
+        finally:
+            for _ in range(self._decoders):
+                self._tasks.put(None)
+            with self._cond:
+                self._total = count
+                self._cond.notify_all()
+
+    def _decode(self):
+        while True:
+            task = self._tasks.get()
+            if task is None or self._closed:
+                return
+            index, media_file, estimate = task
+            audio, error = None, None
+            try:
+                audio = self.load(media_file)
+            except Exception as e:
+                error = e
+            # 内存映射的解码缓存按需从磁盘读取，不计入预取内存
+            if audio is None or isinstance(audio, np.memmap):
+                nbytes = 0
+            else:
+                nbytes = audio.nbytes
+            with self._cond:
+                self._reserved += nbytes - estimate
+                self._results[index] = (media_file, audio, error, nbytes)
+                self._cond.notify_all()
+
+    def __iter__(self):
+        self._spawn(self._feed, "prefetch-feed")
+        for i in range(self._decoders):
+            self._spawn(self._decode, f"prefetch-decode-{i}")
+        try:
+            index = 0
+            while True:
+                with self._cond:
+                    # 带超时地等待，保证 Ctrl+C 在 Windows 上也能及时响应
+                    while index not in self._results and (
+                        self._total is None or index < self._total
+                    ):
+                        self._cond.wait(timeout=1.0)
+                    if index not in self._results:
+                        break
+                    media_file, audio, error, nbytes = self._results.pop(index)
+                    self._reserved -= nbytes
+                    self._consumed = index + 1
+                    self._cond.notify_all()
+                yield media_file, audio, error
+                index += 1
+            if self._feed_error is not None:
+                raise self._feed_error
+        finally:
+            self.close()
+
+    def close(self):
+        """停止预取（未取走的音频随之释放）"""
+        with self._cond:
+            self._closed = True
+            self._results.clear()
+            self._cond.notify_all()
@@ -4,38 +4,45 @@
 支持断点续传功能
 """
 
-import whisper
 import argparse
 import os
 from pathlib import Path
-import torch
 import csv
 from datetime import timedelta
 
-# 尝试导入繁简转换库（可选）
-try:
-    from opencc import OpenCC
-
-    cc = OpenCC("t2s")  # 繁体转简体
-    HAS_OPENCC = True
-except ImportError:
-    HAS_OPENCC = False
-    try:
-        import zhconv
-
-        HAS_ZHCONV = True
-    except ImportError:
-        HAS_ZHCONV = False
-
-
-def convert_to_simplified(text):
-    """将文本转换为简体中文"""
-    if HAS_OPENCC:
-        return cc.convert(text)
-    elif HAS_ZHCONV:
-        return zhconv.convert(text, "zh-cn")
-    else:
-        return text
+from audio_cache import SAMPLE_RATE, load_audio
+from engines import ENGINES, create_engine
+from transcript_cache import (
+    DEFAULT_MAX_MB as DEFAULT_CACHE_MAX_MB,
+    TranscriptCache,
+    audio_fingerprint,
+    make_key,
+)
+from stage_metrics import StageTimer, stage
+from text_convert import convert_texts, get_converter
+from transcript_columnar import (
+    OUTPUT_FORMATS,
+    OUTPUT_SUFFIXES,
+    open_segment_writer,
+    read_last_end_time,
+    recover_interrupted,
+    resolve_format,
+)
+from transcript_io import mark_complete, read_journal, shift_segments, trim_window
+from vad import VAD_METHODS, detect_speech
+
+# 续传时剩余音频短于该秒数视为已完成（最后一个分段通常在音频结束前就结束了）
+COMPLETE_TOLERANCE_SECONDS = 1.5
+
+# CSV 输出字段
+CSV_FIELDNAMES = [
+    "start_time",
+    "end_time",
+    "start_timestamp",
+    "end_timestamp",
+    "duration",
+    "text",
+]
 
 
 def format_timestamp(seconds):
@@ -49,7 +56,9 @@ def format_timestamp(seconds):
 
 
 def read_last_timestamp(csv_file):
-    """读取CSV文件中最后一条记录的结束时间"""
+    """读取CSV文件中最后一条记录的结束时间（Parquet / Arrow 文件读取 end_time 列）"""
+    if resolve_format(csv_file) != "csv":
+        return read_last_end_time(csv_file)
     if not os.path.exists(csv_file):
         return 0.0
 
@@ -66,8 +75,24 @@ def read_last_timestamp(csv_file):
     return 0.0
 
 
-def check_gpu():
-    """检查GPU是否可用"""
+# 已加载的模型缓存：同一进程内相同模型只加载一次（批量转录时复用）
+_MODEL_CACHE = {}
+
+
+def check_gpu(engine="whisper"):
+    """检查GPU是否可用（ctranslate2 引擎通过 CTranslate2 检测，不需要安装 torch）"""
+    if engine == "ctranslate2":
+        import ctranslate2
+
+        if ctranslate2.get_cuda_device_count() > 0:
+            print("✓ GPU可用 (CTranslate2)")
+            return True
+        print("⚠ 未检测到GPU，将使用CPU运行（速度较慢）")
+        return False
+
+    # 延迟导入：--help、参数错误、命中缓存等不需要模型的路径不必加载 torch
+    import torch
+
     if torch.cuda.is_available():
         print(f"✓ GPU可用: {torch.cuda.get_device_name(0)}")
         print(f"✓ CUDA版本: {torch.version.cuda}")
@@ -77,6 +102,127 @@ def check_gpu():
         return False
 
 
+def load_model(
+    model_name="base", model_dir=None, timer=None, engine="whisper", quantize=False
+):
+    """
+    加载Whisper模型，同一进程内按 (引擎, 模型, 目录, 是否量化) 缓存
+
+    Args:
+        model_name: Whisper模型大小
+        model_dir: 模型存储位置（可选）
+        timer: StageTimer（可选），记录 GPU 检测和模型加载耗时
+        engine: 推理引擎 ('whisper' 或 'ctranslate2')
+        quantize: CPU 上对 Linear 层做动态 int8 量化（仅 whisper 引擎，量化结果缓存到磁盘）
+
+    Returns:
+        推理引擎对象（transcribe() 返回与 openai-whisper 相同结构的结果）
+    """
+    key = (engine, model_name, model_dir, quantize)
+    if key in _MODEL_CACHE:
+        return _MODEL_CACHE[key]
+
+    # 检查GPU
+    with stage(timer, "gpu_check"):
+        has_gpu = check_gpu(engine)
+
+    print(f"\n正在加载Whisper模型: {model_name} (引擎: {engine})...")
+    if model_dir:
+        print(f"模型目录: {model_dir}")
+    device = "cuda" if has_gpu else "cpu"
+    with stage(timer, "model_load"):
+        model = create_engine(engine, model_name, device, model_dir, quantize=quantize)
+    print(f"✓ 模型加载成功! (运行在{device.upper()}上)")
+
+    _MODEL_CACHE[key] = model
+    return model
+
+
+def build_rows(segments, detected_language, force_simplified=True, timestamps=True):
+    """
+    将Whisper分段转换为CSV行（中文时按需繁简转换）
+
+    timestamps=False 时不生成字符串时间戳列（列式输出整列换算时间戳）
+    """
+    texts = [seg["text"].strip() for seg in segments]
+
+    # 如果是中文且需要强制转换为简体（整份分段一次转换，重复句子只转换一次）
+    if force_simplified and detected_language == "zh":
+        texts = convert_texts(texts)
+
+    rows = []
+    for seg, text in zip(segments, texts):
+        row = {"start_time": seg["start"], "end_time": seg["end"]}
+        if timestamps:
+            row["start_timestamp"] = format_timestamp(seg["start"])
+            row["end_timestamp"] = format_timestamp(seg["end"])
+        row["duration"] = seg["end"] - seg["start"]
+        row["text"] = text
+        rows.append(row)
+    return rows
+
+
+def transcript_cache_key(
+    audio,
+    model_name,
+    engine,
+    quantize,
+    language,
+    initial_prompt,
+    force_simplified,
+    vad=None,
+):
+    """转录缓存键：音频内容指纹 + 影响转录结果的选项（逐个转录与批量解码共用）"""
+    options = {
+        "model": model_name,
+        "engine": engine,
+        "quantize": quantize,
+        "language": language,
+        "initial_prompt": initial_prompt,
+        "force_simplified": force_simplified,
+    }
+    # 未使用 VAD 时不加入该选项，与之前保存的缓存键保持一致
+    if vad:
+        options["vad"] = vad
+    return make_key(audio_fingerprint(audio), **options)
+
+
+def cache_entry(segments, language):
+    """写入转录缓存的内容：只保留分段时间和文本"""
+    return {
+        "language": language,
+        "segments": [
+            {"start": seg["start"], "end": seg["end"], "text": seg["text"]}
+            for seg in segments
+        ],
+    }
+
+
+def transcribe_windows(model, audio, options, offset=0.0, window_seconds=600.0):
+    """
+    按窗口逐段转录音频，每个窗口完成后立即 yield (分段列表, 检测语言)
+
+    分段时间戳已平移到原始时间轴（offset 为 audio 在原文件中的起始时间）
+    """
+    options = dict(options)
+    total = len(audio) / SAMPLE_RATE
+    pos = 0.0
+
+    while pos < total - 0.1:
+        end = min(total, pos + window_seconds)
+        window = audio[int(pos * SAMPLE_RATE) : int(end * SAMPLE_RATE)]
+        result = model.transcribe(window, **options)
+        segments = result["segments"]
+        language = result.get("language", "未知")
+
+        # 自动检测时，后续窗口沿用第一个窗口检测到的语言
+        options.setdefault("language", language)
+
+        segments, next_pos = trim_window(segments, pos, end, total)
+        yield shift_segments(segments, offset + pos), language
+        pos = next_pos
+
+
 def transcribe_audio(
     audio_file,
     model_name="base",
@@ -84,6 +230,18 @@ def transcribe_audio(
     output_file=None,
     model_dir=None,
     force_simplified=True,
+    stream_seconds=None,
+    parallel_workers=None,
+    chunk_seconds=300.0,
+    cache_dir=None,
+    cache_max_mb=DEFAULT_CACHE_MAX_MB,
+    audio_cache_dir=None,
+    metrics_out=None,
+    engine="whisper",
+    quantize=False,
+    output_format="csv",
+    audio=None,
+    vad=None,
 ):
     """
     转录音频文件到CSV格式（带时间轴），支持断点续传
@@ -95,6 +253,21 @@ def transcribe_audio(
         output_file: 输出CSV文件路径（可选）
         model_dir: 模型存储位置（可选）
         force_simplified: 强制转换为简体中文（默认: True）
+        stream_seconds: 流式输出窗口长度（秒），每转录完一个窗口立即写入CSV（可选）
+        parallel_workers: 并行分块转录的工作进程数（可选，不能与 stream_seconds 同时使用）
+        chunk_seconds: 并行分块转录的目标窗口长度（秒）
+        cache_dir: 转录缓存目录（可选，按音频内容和转录选项复用结果）
+        cache_max_mb: 转录缓存容量上限（MB），超出时按 LRU 淘汰
+        audio_cache_dir: 解码音频缓存目录（可选，重复运行/续传时不再重新解码）
+        metrics_out: 各阶段耗时统计输出文件（可选，每个文件追加一行 JSON）
+        engine: 推理引擎 ('whisper' 或 'ctranslate2'，默认: whisper)
+        quantize: CPU 上使用动态 int8 量化模型（仅 whisper 引擎）
+        output_format: 输出格式 ('csv'、'parquet' 或 'arrow'；输出文件扩展名为
+            .parquet / .arrow 时以扩展名为准）
+        audio: 已解码的整段 16kHz 单声道 float32 音频（可选，批量转录预取时传入，
+            不再调用 ffmpeg；续传时自动切掉已转录的部分）
+        vad: 推理前的语音活动检测方法（'energy' 或 'silero'，可选）：只转录检测到的
+            语音区间，时间戳映射回原始时间轴
 
     Returns:
         转录结果字典
@@ -102,14 +275,89 @@ def transcribe_audio(
     # 检查音频文件是否存在
     if not os.path.exists(audio_file):
         raise FileNotFoundError(f"音频文件不存在: {audio_file}")
+    if stream_seconds and parallel_workers:
+        raise ValueError("流式输出与并行分块转录不能同时使用")
+
+    # 各阶段耗时与内存统计（指定 metrics_out 时写出一条 JSON Lines 记录）
+    timer = StageTimer(
+        audio_file,
+        script="audio_to_text",
+        model=model_name,
+        engine=engine,
+        quantize=quantize,
+    )
+    try:
+        return _transcribe_audio(
+            timer,
+            audio_file,
+            model_name,
+            language,
+            output_file,
+            model_dir,
+            force_simplified,
+            stream_seconds,
+            parallel_workers,
+            chunk_seconds,
+            cache_dir,
+            cache_max_mb,
+            audio_cache_dir,
+            engine,
+            quantize,
+            output_format,
+            audio,
+            vad,
+        )
+    except BaseException as e:
+        timer.fail(e)
+        raise
+    finally:
+        if metrics_out:
+            timer.write(metrics_out)
+
 
-    # 确定输出文件路径
+def _transcribe_audio(
+    timer,
+    audio_file,
+    model_name,
+    language,
+    output_file,
+    model_dir,
+    force_simplified,
+    stream_seconds,
+    parallel_workers,
+    chunk_seconds,
+    cache_dir,
+    cache_max_mb,
+    audio_cache_dir,
+    engine,
+    quantize,
+    output_format,
+    audio,
+    vad,
+):
+    """transcribe_audio 的实现，各阶段耗时记录到 timer"""
+    # 确定输出文件路径与格式
+    output_format = resolve_format(output_file, output_format)
     if output_file is None:
         audio_path = Path(audio_file)
-        output_file = audio_path.parent / f"{audio_path.stem}_transcript.csv"
-
-    # 检查是否存在现有文件（断点续传）
-    last_timestamp = read_last_timestamp(output_file)
+        suffix = OUTPUT_SUFFIXES[output_format]
+        output_file = audio_path.parent / f"{audio_path.stem}_transcript{suffix}"
+    columnar = output_format != "csv"
+
+    # 检查是否存在现有文件（断点续传）：优先读取断点日志，不可用时再读取CSV
+    # （列式输出上次写入被中断时先从恢复日志恢复）
+    if stream_seconds and output_format == "arrow":
+        raise ValueError("Arrow 输出不支持 --stream（无法逐批追加），请使用 parquet 或 csv")
+    if columnar:
+        recover_interrupted(output_file)
+    checkpoint = read_journal(output_file)
+    if checkpoint is not None and checkpoint.get("complete"):
+        print(f"\n✓ 已转录完成（{output_file}），跳过")
+        return {"text": "", "segments": [], "language": language}
+    if checkpoint is not None:
+        last_timestamp = checkpoint["end_time"]
+    else:
+        last_timestamp = read_last_timestamp(output_file)
     is_resume = last_timestamp > 0
 
     if is_resume:
@@ -119,23 +367,37 @@ def transcribe_audio(
     else:
         print("\n✓ 开始新的转录任务")
 
-    # 检查GPU
-    has_gpu = check_gpu()
-
-    # 加载模型
-    print(f"\n正在加载Whisper模型: {model_name}...")
-    if model_dir:
-        print(f"模型目录: {model_dir}")
-    device = "cuda" if has_gpu else "cpu"
-    model = whisper.load_model(model_name, device=device, download_root=model_dir)
-    print(f"✓ 模型加载成功! (运行在{device.upper()}上)")
-
-    # 转录音频
-    print(f"\n正在转录音频: {audio_file}")
-    print("请稍候，这可能需要一些时间...")
+    # 解码音频：断点续传时从上次位置开始解码，之前的部分不再解码和转录
+    # （启用解码缓存时直接内存映射已解码的 PCM 并切片；已预取时直接切片）
+    if audio is None:
+        with timer.stage("decode"):
+            audio = load_audio(
+                audio_file, start=last_timestamp, cache_dir=audio_cache_dir
+            )
+    else:
+        timer.meta["prefetched"] = True
+        if last_timestamp > 0:
+            audio = audio[int(last_timestamp * SAMPLE_RATE) :]
+    timer.meta["audio_seconds"] = round(len(audio) / SAMPLE_RATE, 3)
+    duration = last_timestamp + len(audio) / SAMPLE_RATE
+    if is_resume and len(audio) < SAMPLE_RATE * COMPLETE_TOLERANCE_SECONDS:
+        print("\n✓ 没有新内容需要转录")
+        mark_complete(output_file, last_timestamp, duration)
+        return {"text": "", "segments": [], "language": language}
+
+    # 语音活动检测：只把语音区间拼接起来送入模型，静音部分不推理
+    timeline = None
+    if vad:
+        with timer.stage("vad"):
+            timeline = detect_speech(audio, vad)
+        timer.meta["speech_seconds"] = round(timeline.speech_seconds, 3)
+        timer.meta["vad_skipped_seconds"] = round(timeline.skipped_seconds, 3)
+        print(f"✓ VAD ({vad}): {timeline.describe()}")
+    no_speech = timeline is not None and not timeline.spans
+    speech_audio = timeline.concatenate(audio) if timeline is not None else audio
 
     # 设置转录选项
-    options = {"fp16": has_gpu, "verbose": False}  # GPU时使用半精度加速
+    options = {"verbose": False}
 
     if language != "auto":
         options["language"] = language
@@ -144,79 +406,158 @@ def transcribe_audio(
     if language == "zh" or (language == "auto" and "zh" in str(language)):
         options["initial_prompt"] = "以下是简体中文的转录内容："
 
-    # 执行转录
-    result = model.transcribe(audio_file, **options)
+    # 转录缓存：内容相同的音频（复制、改名、重新封装）直接复用之前的结果
+    cache, cache_key, cached = None, None, None
+    if cache_dir and not is_resume:
+        with timer.stage("cache_lookup"):
+            cache = TranscriptCache(cache_dir, max_mb=cache_max_mb)
+            cache_key = transcript_cache_key(
+                audio,
+                model_name,
+                engine,
+                quantize,
+                language,
+                options.get("initial_prompt"),
+                force_simplified,
+                vad,
+            )
+            cached = cache.get(cache_key)
+        timer.meta["cache_hit"] = cached is not None
+
+    # 加载模型（已加载过则直接复用；命中缓存时不加载，并行分块模式由各工作进程自行加载）
+    model = None
+    if cached is None and not no_speech and not parallel_workers:
+        model = load_model(
+            model_name, model_dir, timer=timer, engine=engine, quantize=quantize
+        )
 
-    # 提取分段信息
-    segments = result["segments"]
-    detected_language = result.get("language", "未知")
+    if cached is None and not no_speech:
+        print(f"\n正在转录音频: {audio_file}")
+        print("请稍候，这可能需要一些时间...")
+
+    # 执行转录并写入CSV（续传时时间戳平移回原始时间轴，新内容追加到文件末尾）
+    writer = open_segment_writer(
+        output_file,
+        CSV_FIELDNAMES,
+        output_format,
+        file=str(audio_file),
+        model=model_name,
+        engine=engine,
+    )
+    with writer:
+        if stream_seconds and cached is None and not no_speech:
+            print(f"流式输出: 每转录 {stream_seconds:.0f} 秒音频写入一次")
+            segments = []
+            processed_segments = []
+            detected_language = "未知"
+            # 使用 VAD 时窗口时间先相对拼接后的音频，映射回原始时间轴后再平移
+            windows = transcribe_windows(
+                model,
+                speech_audio,
+                options,
+                0.0 if timeline is not None else last_timestamp,
+                stream_seconds,
+            )
+            while True:
+                with timer.stage("inference"):
+                    window = next(windows, None)
+                if window is None:
+                    break
+                window_segments, detected_language = window
+                if timeline is not None:
+                    window_segments = shift_segments(
+                        timeline.remap_segments(window_segments), last_timestamp
+                    )
+                with timer.stage("convert"):
+                    rows = build_rows(
+                        [seg for seg in window_segments if seg["end"] > last_timestamp],
+                        detected_language,
+                        force_simplified,
+                        timestamps=not columnar,
+                    )
+                with timer.stage("csv_write"):
+                    writer.write(rows, language=detected_language)
+                segments.extend(window_segments)
+                processed_segments.extend(rows)
+                if rows:
+                    print(f"  ✓ 已写入至 {format_timestamp(rows[-1]['end_time'])}")
+            result = {
+                "text": "".join(seg["text"] for seg in segments),
+                "segments": segments,
+                "language": detected_language,
+            }
+        else:
+            if cached is not None:
+                print("\n✓ 命中转录缓存，跳过模型加载和转录")
+                result = cached
+            elif no_speech:
+                print("\n✓ 未检测到语音，跳过转录")
+                detected = language if language != "auto" else "未知"
+                result = {"text": "", "segments": [], "language": detected}
+            elif parallel_workers:
+                import chunked_transcribe
+
+                with timer.stage("inference"):
+                    result = chunked_transcribe.transcribe_parallel(
+                        speech_audio,
+                        options,
+                        model_name,
+                        model_dir,
+                        workers=parallel_workers,
+                        chunk_seconds=chunk_seconds,
+                        engine=engine,
+                        quantize=quantize,
+                    )
+            else:
+                with timer.stage("inference"):
+                    result = model.transcribe(speech_audio, **options)
+            if timeline is not None and cached is None:
+                timeline.remap_segments(result["segments"])
+            segments = shift_segments(result["segments"], last_timestamp)
+            detected_language = result.get("language", "未知")
+
+            # 过滤已转录的分段（断点续传）
+            new_segments = [seg for seg in segments if seg["end"] > last_timestamp]
+            with timer.stage("convert"):
+                processed_segments = build_rows(
+                    new_segments,
+                    detected_language,
+                    force_simplified,
+                    timestamps=not columnar,
+                )
+            with timer.stage("csv_write"):
+                writer.write(processed_segments, language=detected_language)
+    end_time = processed_segments[-1]["end_time"] if processed_segments else last_timestamp
+    mark_complete(output_file, end_time, duration)
+    timer.meta["segments"] = len(processed_segments)
+    timer.meta["language"] = detected_language
+
+    if cache is not None:
+        if cached is None:
+            with timer.stage("cache_store"):
+                cache.put(cache_key, cache_entry(segments, detected_language))
+        cache.close()
 
     print("\n✓ 转录完成!")
     print(f"检测语言: {detected_language}")
     print(f"总分段数: {len(segments)}")
 
-    # 过滤已转录的分段（断点续传）
-    new_segments = [seg for seg in segments if seg["end"] > last_timestamp]
-
     if is_resume:
-        print(f"已跳过分段: {len(segments) - len(new_segments)}")
-        print(f"新增分段: {len(new_segments)}")
+        print(f"已跳过分段: {len(segments) - len(processed_segments)}")
+        print(f"新增分段: {len(processed_segments)}")
 
-    if not new_segments:
+    if not processed_segments:
         print("\n✓ 没有新内容需要转录")
         return result
 
-    # 处理分段文本（繁简转换）
-    processed_segments = []
-    for seg in new_segments:
-        text = seg["text"].strip()
-
-        # 如果是中文且需要强制转换为简体
-        if force_simplified and detected_language == "zh":
-            text = convert_to_simplified(text)
-
-        processed_segments.append(
-            {
-                "start_time": seg["start"],
-                "end_time": seg["end"],
-                "start_timestamp": format_timestamp(seg["start"]),
-                "end_timestamp": format_timestamp(seg["end"]),
-                "duration": seg["end"] - seg["start"],
-                "text": text,
-            }
-        )
-
     if force_simplified and detected_language == "zh":
-        if HAS_OPENCC or HAS_ZHCONV:
+        if get_converter() is not None:
             print("✓ 已转换为简体中文")
         else:
             msg = "⚠ 未安装繁简转换库，建议安装: "
             msg += "pip install opencc-python-reimplemented"
             print(msg)
 
-    # 写入CSV文件
-    file_exists = os.path.exists(output_file)
-    mode = "a" if file_exists else "w"
-
-    with open(output_file, mode, encoding="utf-8-sig", newline="") as f:
-        fieldnames = [
-            "start_time",
-            "end_time",
-            "start_timestamp",
-            "end_timestamp",
-            "duration",
-            "text",
-        ]
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-
-        # 如果是新文件，写入表头
-        if not file_exists:
-            writer.writeheader()
-
-        # 写入所有新分段
-        for seg in processed_segments:
-            writer.writerow(seg)
-
     print(f"\n✓ 转录结果已保存到: {output_file}")
     print(f"✓ 新增记录: {len(processed_segments)} 条")
 
@@ -227,8 +568,8 @@ def transcribe_audio(
         text_preview = seg["text"][:50]
         if len(seg["text"]) > 50:
             text_preview += "..."
-        start_ts = seg["start_timestamp"]
-        end_ts = seg["end_timestamp"]
+        start_ts = format_timestamp(seg["start_time"])
+        end_ts = format_timestamp(seg["end_time"])
         print(f"[{start_ts} --> {end_ts}] {text_preview}")
     print("-" * 80)
 
@@ -250,6 +591,46 @@ def main():
 断点续传:
   如果输出文件已存在，会自动从上次转录的位置继续
   重复运行相同命令即可继续未完成的转录任务
+  断点位置记录在 <输出文件>.progress.json 中，续传时无需读取整个CSV
+
+流式输出（长音频推荐）:
+  python audio_to_text.py meeting.mp4 -m turbo -l zh --stream 600
+  每转录完 600 秒音频就追加写入CSV并更新断点，进程被中断时已完成的部分不会丢失
+
+并行分块转录（单个超长音频）:
+  python audio_to_text.py meeting.mp4 -m turbo -l zh --parallel 4
+  在静音处切成约 300 秒的重叠窗口，4 个进程并行转录后按时间拼接
+
+转录缓存（重复的录音只转录一次）:
+  python audio_to_text.py copy_of_audio.mp3 -m turbo -l zh --cache-dir D:\\transcript_cache
+  按解码后的音频内容 + 模型/语言/提示词/繁简选项查找缓存，命中时不加载模型直接写出CSV
+
+解码音频缓存（视频文件重复处理时省去 ffmpeg 解码）:
+  python audio_to_text.py movie.mkv -m turbo -l zh --audio-cache D:\\audio_cache
+  解码后的 16kHz PCM 保存为 .npy，与 audio_to_text_diarize.py 共用同一目录即可互相复用
+
+CPU 推理加速（CTranslate2 int8 引擎，需 pip install faster-whisper）:
+  python audio_to_text.py audio.mp3 -m turbo -l zh --engine ctranslate2
+  输出格式、断点续传和繁简转换与默认引擎完全一致
+
+CPU 动态 int8 量化（PyTorch 引擎）:
+  python audio_to_text.py audio.mp3 -m small -l zh --quantize
+  Linear 层权重量化为 int8，量化后的模型缓存在模型目录下，之后加载不再重新转换
+
+各阶段耗时统计:
+  python audio_to_text.py audio.mp3 -m turbo -l zh --metrics-out metrics.jsonl
+  每个文件追加一行 JSON：GPU检测/模型加载/解码/推理/繁简转换/CSV写入各阶段耗时与内存快照
+
+跳过静音（会议、讲座等静音较多的录音）:
+  python audio_to_text.py meeting.mp4 -m turbo -l zh --vad
+  python audio_to_text.py meeting.mp4 -m turbo -l zh --vad silero
+  推理前检测语音区间，只把语音部分拼接起来转录，时间戳映射回原始时间轴，并报告跳过的静音时长
+
+列式输出（Parquet / Arrow，需 pip install pyarrow）:
+  python audio_to_text.py audio.mp3 -m turbo -l zh --output-format parquet
+  python audio_to_text.py audio.mp3 -m turbo -l zh -o result.arrow
+  除下列各列外还包含 file / model / engine / language 元数据列，
+  时间戳列为整列换算的 duration[ms] 类型，可直接用 pandas / DuckDB 分析
   
 输出格式 (CSV):
   start_time      - 开始时间（秒）
@@ -300,6 +681,67 @@ def main():
     parser.add_argument(
         "--no-force-simplified", action="store_true", help="禁用繁简转换，保留原始输出"
     )
+    parser.add_argument(
+        "--stream",
+        type=float,
+        metavar="SECONDS",
+        help="流式输出：按该窗口长度（秒）逐段转录并立即写入CSV（例如 600）",
+    )
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        metavar="N",
+        help="并行分块转录：在静音处切分音频，用 N 个进程并行转录",
+    )
+    parser.add_argument(
+        "--chunk-seconds",
+        type=float,
+        default=300.0,
+        help="并行分块转录的目标窗口长度（秒，默认: 300）",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="转录缓存目录，内容相同的音频直接复用之前的转录结果",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        default=DEFAULT_CACHE_MAX_MB,
+        help=f"转录缓存容量上限（MB，默认: {DEFAULT_CACHE_MAX_MB}），超出时淘汰最久未使用的结果",
+    )
+    parser.add_argument(
+        "--audio-cache",
+        help="解码音频缓存目录，已解码的 PCM 以 .npy 保存并内存映射复用",
+    )
+    parser.add_argument(
+        "--vad",
+        nargs="?",
+        const="energy",
+        choices=VAD_METHODS,
+        help="推理前检测语音区间，只转录有语音的部分 (energy=按能量，无额外依赖；"
+        "silero=Silero VAD，需 faster-whisper；只写 --vad 时为 energy)",
+    )
+    parser.add_argument(
+        "--engine",
+        default="whisper",
+        choices=ENGINES,
+        help="推理引擎 (whisper=openai-whisper, ctranslate2=faster-whisper int8, 默认: whisper)",
+    )
+    parser.add_argument(
+        "--quantize",
+        action="store_true",
+        help="CPU 上对模型 Linear 层做动态 int8 量化（仅 whisper 引擎，结果缓存到模型目录）",
+    )
+    parser.add_argument(
+        "--metrics-out",
+        help="各阶段耗时统计输出文件（JSON Lines，每个文件追加一行）",
+    )
+    parser.add_argument(
+        "--output-format",
+        default="csv",
+        choices=OUTPUT_FORMATS,
+        help="输出格式 (csv, parquet, arrow, 默认: csv；-o 的扩展名为 .parquet/.arrow 时以扩展名为准)",
+    )
 
     args = parser.parse_args()
 
@@ -312,6 +754,17 @@ def main():
             output_file=args.output,
             model_dir=args.model_dir,
             force_simplified=not args.no_force_simplified,
+            stream_seconds=args.stream,
+            parallel_workers=args.parallel,
+            chunk_seconds=args.chunk_seconds,
+            cache_dir=args.cache_dir,
+            cache_max_mb=args.cache_max_mb,
+            audio_cache_dir=args.audio_cache,
+            metrics_out=args.metrics_out,
+            engine=args.engine,
+            quantize=args.quantize,
+            output_format=args.output_format,
+            vad=args.vad,
         )
         print("\n✓ 任务完成!")
 
@@ -17,32 +17,41 @@
 import argparse
 import csv
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
 from pathlib import Path
 
-# 尝试导入繁简转换库（可选）
-try:
-    from opencc import OpenCC
-
-    cc = OpenCC("t2s")
-    HAS_OPENCC = True
-except ImportError:
-    HAS_OPENCC = False
-    try:
-        import zhconv
-
-        HAS_ZHCONV = True
-    except ImportError:
-        HAS_ZHCONV = False
-
-
-def convert_to_simplified(text):
-    """将文本转换为简体中文"""
-    if HAS_OPENCC:
-        return cc.convert(text)
-    elif HAS_ZHCONV:
-        return zhconv.convert(text, "zh-cn")
-    return text
+from audio_cache import SAMPLE_RATE, load_audio
+from speaker_assign import assign_word_speakers
+from stage_artifacts import StageArtifacts, input_identity, stage_key
+from stage_metrics import StageTimer
+from text_convert import convert_texts, get_converter
+from transcript_columnar import (
+    OUTPUT_FORMATS,
+    OUTPUT_SUFFIXES,
+    open_segment_writer,
+    read_last_end_time,
+    recover_interrupted,
+    resolve_format,
+)
+from transcript_io import (
+    discard_output,
+    read_journal,
+    shift_segments,
+    trim_window,
+)
+
+# CSV 输出字段
+CSV_FIELDNAMES = [
+    "start_time",
+    "end_time",
+    "start_timestamp",
+    "end_timestamp",
+    "duration",
+    "speaker",
+    "text",
+]
 
 
 def format_timestamp(seconds):
@@ -57,7 +66,9 @@ def format_timestamp(seconds):
 
 
 def read_last_timestamp(csv_file):
-    """读取 CSV 文件中最后一条记录的结束时间"""
+    """读取 CSV 文件中最后一条记录的结束时间（Parquet / Arrow 文件读取 end_time 列）"""
+    if resolve_format(csv_file) != "csv":
+        return read_last_end_time(csv_file)
     if not os.path.exists(csv_file):
         return 0.0
     try:
@@ -86,6 +97,149 @@ def check_gpu():
     return False
 
 
+def build_rows(segments, detected_language, force_simplified=True, timestamps=True):
+    """
+    将 WhisperX 分段转换为 CSV 行（中文时按需繁简转换）
+
+    timestamps=False 时不生成字符串时间戳列（列式输出整列换算时间戳）
+    """
+    texts = [seg.get("text", "").strip() for seg in segments]
+    if force_simplified and detected_language == "zh":
+        texts = convert_texts(texts)
+
+    rows = []
+    for seg, text in zip(segments, texts):
+        row = {"start_time": seg["start"], "end_time": seg["end"]}
+        if timestamps:
+            row["start_timestamp"] = format_timestamp(seg["start"])
+            row["end_timestamp"] = format_timestamp(seg["end"])
+        row["duration"] = round(seg["end"] - seg["start"], 3)
+        row["speaker"] = seg.get("speaker", "UNKNOWN")
+        row["text"] = text
+        rows.append(row)
+    return rows
+
+
+# 已加载的模型缓存：批量处理目录时 ASR 模型、各语言的对齐模型
+# 和说话人分离管线在同一进程内只加载一次
+_ASR_MODELS = {}
+_ALIGN_MODELS = {}
+_DIARIZE_PIPELINES = {}
+# 说话人分离管线不保证线程安全：批量处理时上一个文件的后台分离线程
+# （例如转录失败后）可能仍在运行，同一时间只允许一个线程调用
+_DIARIZE_LOCK = threading.Lock()
+
+
+def load_asr_model(whisperx, model_name, device, compute_type, language, model_dir):
+    """加载 WhisperX 转录模型，同一进程内按 (模型, 设备, 精度, 语言, 目录) 缓存"""
+    key = (model_name, device, compute_type, language, model_dir)
+    if key not in _ASR_MODELS:
+        print(f"\n正在加载 WhisperX 模型: {model_name}...")
+        if model_dir:
+            print(f"模型目录: {model_dir}")
+        _ASR_MODELS[key] = whisperx.load_model(
+            model_name,
+            device,
+            compute_type=compute_type,
+            language=language,
+            download_root=model_dir,
+        )
+        print(f"✓ 模型加载成功! (运行在 {device.upper()} 上)")
+    return _ASR_MODELS[key]
+
+
+def load_align_model(whisperx, detected_language, device):
+    """加载时间戳对齐模型（按语言缓存），失败时返回 None"""
+    align_lang = detected_language if detected_language != "unknown" else "en"
+    key = (align_lang, device)
+    if key not in _ALIGN_MODELS:
+        try:
+            _ALIGN_MODELS[key] = whisperx.load_align_model(
+                language_code=align_lang, device=device
+            )
+        except Exception as e:
+            print(f"⚠ 时间戳对齐失败（将使用原始时间戳）: {e}")
+            # 失败结果同样缓存，批量处理时不再对每个文件重复尝试
+            _ALIGN_MODELS[key] = None
+    return _ALIGN_MODELS[key]
+
+
+def align_segments(whisperx, result, align_model, audio, device):
+    """对齐时间戳，失败时保留原始时间戳"""
+    if align_model is None:
+        return result
+    model_a, metadata = align_model
+    try:
+        return whisperx.align(
+            result["segments"],
+            model_a,
+            metadata,
+            audio,
+            device,
+            return_char_alignments=False,
+        )
+    except Exception as e:
+        print(f"⚠ 时间戳对齐失败（将使用原始时间戳）: {e}")
+        return result
+
+
+def run_diarization(whisperx, audio, hf_token, device, min_speakers, max_speakers):
+    """说话人分离，返回分离结果；未提供 Token 或失败时返回 None"""
+    if not hf_token:
+        print("\n⚠ 未提供 HuggingFace Token，跳过说话人分离")
+        print("  使用 -t YOUR_TOKEN 参数启用说话人识别")
+        return None
+
+    print("\n正在进行说话人分离...")
+    try:
+        diarize_kwargs = {"audio": audio}
+        if min_speakers:
+            diarize_kwargs["min_speakers"] = min_speakers
+        if max_speakers:
+            diarize_kwargs["max_speakers"] = max_speakers
+
+        key = (hf_token, device)
+        with _DIARIZE_LOCK:
+            if key not in _DIARIZE_PIPELINES:
+                _DIARIZE_PIPELINES[key] = whisperx.DiarizationPipeline(
+                    use_auth_token=hf_token, device=device
+                )
+            return _DIARIZE_PIPELINES[key](**diarize_kwargs)
+    except Exception as e:
+        print(f"⚠ 说话人分离失败: {e}")
+        print("  将继续保存转录结果，但不含说话人信息")
+        return None
+
+
+def load_or_run_diarization(
+    whisperx, artifacts, key, get_audio, hf_token, device, min_speakers, max_speakers
+):
+    """读取已保存的说话人分离结果，没有时运行说话人分离并保存（失败时不保存）"""
+    if not hf_token:
+        # 未提供 Token：打印跳过提示，无需加载音频
+        return run_diarization(
+            whisperx, None, hf_token, device, min_speakers, max_speakers
+        )
+
+    records = artifacts.load("diarize", key)
+    if records is not None:
+        import pandas as pd
+
+        return pd.DataFrame(records, columns=["start", "end", "speaker"])
+
+    diarize_segments = run_diarization(
+        whisperx, get_audio(), hf_token, device, min_speakers, max_speakers
+    )
+    if diarize_segments is not None:
+        # assign_word_speakers 只用到 start / end / speaker 三列
+        artifacts.save(
+            "diarize",
+            key,
+            diarize_segments[["start", "end", "speaker"]].to_dict("records"),
+        )
+    return diarize_segments
+
+
 def transcribe_with_diarization(
     audio_file,
     model_name="turbo",
@@ -96,6 +250,14 @@ def transcribe_with_diarization(
     min_speakers=None,
     max_speakers=None,
     force_simplified=True,
+    stream_seconds=None,
+    audio_cache_dir=None,
+    metrics_out=None,
+    stage_dir=None,
+    stage_cache=True,
+    diarize_device=None,
+    concurrent_diarize=True,
+    output_format="csv",
 ):
     """
     使用 WhisperX 转录音频并进行说话人识别
@@ -110,6 +272,15 @@ def transcribe_with_diarization(
         min_speakers:    最少说话人数（可选）
         max_speakers:    最多说话人数（可选）
         force_simplified: 强制转换为简体中文（默认: True）
+        stream_seconds:  流式输出窗口长度（秒），每处理完一个窗口立即写入 CSV（可选）
+        audio_cache_dir: 解码音频缓存目录（可选，与 audio_to_text.py 共用）
+        metrics_out:     各阶段耗时统计输出文件（可选，每个文件追加一行 JSON）
+        stage_dir:       阶段产物目录（可选，默认为音频所在目录下的 .diarize_stages）
+        stage_cache:     保存并复用转录/对齐/说话人分离的阶段产物（默认: True）
+        diarize_device:  说话人分离使用的设备（'cpu' / 'cuda'，默认与转录相同）
+        concurrent_diarize: 说话人分离在后台线程中与转录/对齐同时运行（默认: True）
+        output_format:   输出格式 ('csv'、'parquet' 或 'arrow'；输出文件扩展名为
+            .parquet / .arrow 时以扩展名为准）
     """
     try:
         import whisperx
@@ -119,13 +290,93 @@ def transcribe_with_diarization(
     if not os.path.exists(audio_file):
         raise FileNotFoundError(f"音频文件不存在: {audio_file}")
 
-    # 确定输出文件路径
+    # 各阶段耗时与内存统计（指定 metrics_out 时写出一条 JSON Lines 记录）
+    timer = StageTimer(audio_file, script="audio_to_text_diarize", model=model_name)
+    try:
+        return _transcribe_with_diarization(
+            timer,
+            whisperx,
+            audio_file,
+            model_name,
+            language,
+            output_file,
+            model_dir,
+            hf_token,
+            min_speakers,
+            max_speakers,
+            force_simplified,
+            stream_seconds,
+            audio_cache_dir,
+            stage_dir,
+            stage_cache,
+            diarize_device,
+            concurrent_diarize,
+            output_format,
+        )
+    except BaseException as e:
+        timer.fail(e)
+        raise
+    finally:
+        if metrics_out:
+            timer.write(metrics_out)
+
+
+def _transcribe_with_diarization(
+    timer,
+    whisperx,
+    audio_file,
+    model_name,
+    language,
+    output_file,
+    model_dir,
+    hf_token,
+    min_speakers,
+    max_speakers,
+    force_simplified,
+    stream_seconds,
+    audio_cache_dir,
+    stage_dir,
+    stage_cache,
+    diarize_device,
+    concurrent_diarize,
+    output_format,
+):
+    """transcribe_with_diarization 的实现，各阶段耗时记录到 timer"""
+    # 确定输出文件路径与格式
+    output_format = resolve_format(output_file, output_format)
     if output_file is None:
         audio_path = Path(audio_file)
-        output_file = audio_path.parent / f"{audio_path.stem}_diarize.csv"
-
-    # 断点续传检测
-    last_timestamp = read_last_timestamp(output_file)
+        suffix = OUTPUT_SUFFIXES[output_format]
+        output_file = audio_path.parent / f"{audio_path.stem}_diarize{suffix}"
+    columnar = output_format != "csv"
+
+    # 说话人分离的阶段键记录在输出的断点日志中：说话人数等参数变化后，
+    # 已写入的分段的说话人标签不再有效，需要从头重写（转录和对齐产物照常复用）
+    identity = input_identity(audio_file)
+    diarize_key = stage_key(
+        identity, stage="diarize", min_speakers=min_speakers, max_speakers=max_speakers
+    )
+    output_diarize_key = diarize_key if hf_token else None
+
+    # 断点续传检测：优先读取断点日志，不可用时再读取 CSV
+    # （列式输出上次写入被中断时先从恢复日志恢复）
+    if stream_seconds and output_format == "arrow":
+        raise ValueError("Arrow 输出不支持 --stream（无法逐批追加），请使用 parquet 或 csv")
+    if columnar:
+        recover_interrupted(output_file)
+    checkpoint = read_journal(output_file)
+    if (
+        checkpoint is not None
+        and "diarize_key" in checkpoint
+        and checkpoint["diarize_key"] != output_diarize_key
+    ):
+        print("\n⚠ 说话人分离参数与现有输出不同，从头重写输出文件")
+        discard_output(output_file)
+        checkpoint = None
+    if checkpoint is not None:
+        last_timestamp = checkpoint["end_time"]
+    else:
+        last_timestamp = read_last_timestamp(output_file)
     is_resume = last_timestamp > 0
 
     if is_resume:
@@ -135,137 +386,233 @@ def transcribe_with_diarization(
     else:
         print("\n✓ 开始新的转录任务")
 
-    has_gpu = check_gpu()
+    with timer.stage("gpu_check"):
+        has_gpu = check_gpu()
     device = "cuda" if has_gpu else "cpu"
     compute_type = "float16" if has_gpu else "int8"
-
-    # ── Step 1: 加载模型并转录 ──────────────────────────────────
-    print(f"\n正在加载 WhisperX 模型: {model_name}...")
-    if model_dir:
-        print(f"模型目录: {model_dir}")
+    if diarize_device in (None, "auto"):
+        diarize_device = device
 
     lang = None if language == "auto" else language
-    model = whisperx.load_model(
-        model_name,
-        device,
-        compute_type=compute_type,
-        language=lang,
-        download_root=model_dir,
-    )
-
-    print(f"✓ 模型加载成功! (运行在 {device.upper()} 上)")
-    print(f"\n正在加载音频: {audio_file}")
-    audio = whisperx.load_audio(audio_file)
-
-    print("正在转录，请稍候...")
     transcribe_options = {"batch_size": 16}
     if language == "zh":
         transcribe_options["initial_prompt"] = "以下是简体中文的转录内容："
 
-    result = model.transcribe(audio, **transcribe_options)
-    detected_language = result.get("language", language or "unknown")
-    print(f"✓ 转录完成! 检测语言: {detected_language}，共 {len(result['segments'])} 段")
-
-    # ── Step 2: 时间戳对齐 ─────────────────────────────────────
-    print("\n正在对齐时间戳...")
-    try:
-        align_lang = detected_language if detected_language != "unknown" else "en"
-        model_a, metadata = whisperx.load_align_model(
-            language_code=align_lang, device=device
-        )
-        result = whisperx.align(
-            result["segments"],
-            model_a,
-            metadata,
-            audio,
-            device,
-            return_char_alignments=False,
-        )
-        print("✓ 时间戳对齐完成")
-    except Exception as e:
-        print(f"⚠ 时间戳对齐失败（将使用原始时间戳）: {e}")
-
-    # ── Step 3: 说话人分离 ─────────────────────────────────────
-    if hf_token:
-        print("\n正在进行说话人分离...")
-        try:
-            diarize_kwargs = {"audio": audio}
-            if min_speakers:
-                diarize_kwargs["min_speakers"] = min_speakers
-            if max_speakers:
-                diarize_kwargs["max_speakers"] = max_speakers
-
-            diarize_model = whisperx.DiarizationPipeline(
-                use_auth_token=hf_token, device=device
+    # 阶段产物：转录、对齐、说话人分离的结果按输入文件和选项分别保存，
+    # 重新运行时从第一个缺失的阶段开始
+    artifacts = StageArtifacts(audio_file, stage_dir, enabled=stage_cache)
+    asr_key = stage_key(
+        identity,
+        stage="asr",
+        model=model_name,
+        model_dir=model_dir,
+        language=lang,
+        compute_type=compute_type,
+        **transcribe_options,
+    )
+    aligned_key = stage_key(asr_key, stage="aligned")
+    timer.meta["stages_reused"] = artifacts.reused
+
+    # 模型和音频在首次需要时才加载：各阶段都有产物时两者都不需要
+    # （音频可能同时被说话人分离线程请求，加锁保证只解码一次）
+    loaded = {}
+    audio_lock = threading.Lock()
+
+    def get_model():
+        if "model" not in loaded:
+            with timer.stage("model_load"):
+                loaded["model"] = load_asr_model(
+                    whisperx, model_name, device, compute_type, lang, model_dir
+                )
+        return loaded["model"]
+
+    def get_audio():
+        with audio_lock:
+            if "audio" not in loaded:
+                print(f"\n正在加载音频: {audio_file}")
+                with timer.stage("decode"):
+                    if audio_cache_dir:
+                        loaded["audio"] = load_audio(
+                            audio_file, cache_dir=audio_cache_dir
+                        )
+                    else:
+                        loaded["audio"] = whisperx.load_audio(audio_file)
+                timer.meta["audio_seconds"] = round(
+                    len(loaded["audio"]) / SAMPLE_RATE, 3
+                )
+        return loaded["audio"]
+
+    def diarize():
+        with timer.stage("diarize"):
+            return load_or_run_diarization(
+                whisperx,
+                artifacts,
+                diarize_key,
+                get_audio,
+                hf_token,
+                diarize_device,
+                min_speakers,
+                max_speakers,
             )
-            diarize_segments = diarize_model(**diarize_kwargs)
-            result = whisperx.assign_word_speakers(diarize_segments, result)
-            print("✓ 说话人分离完成")
-        except Exception as e:
-            print(f"⚠ 说话人分离失败: {e}")
-            print("  将继续保存转录结果，但不含说话人信息")
-    else:
-        print("\n⚠ 未提供 HuggingFace Token，跳过说话人分离")
-        print("  使用 -t YOUR_TOKEN 参数启用说话人识别")
 
-    # ── Step 4: 处理分段并写入 CSV ─────────────────────────────
-    segments = result.get("segments", [])
-    new_segments = [seg for seg in segments if seg["end"] > last_timestamp]
+    # 说话人分离只需要音频、不依赖转录结果：在后台线程中与转录/对齐同时运行，
+    # 在分配说话人之前汇合，每个文件的耗时约为两条分支中较长的一条
+    diarize_future = None
+    if concurrent_diarize and hf_token:
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="diarize")
+        diarize_future = executor.submit(diarize)
+        # 已提交的任务照常运行，线程在任务结束后退出
+        executor.shutdown(wait=False)
+
+    def join_diarization():
+        """等待后台说话人分离完成（未并行时在此处运行）"""
+        if diarize_future is None:
+            return diarize()
+        with timer.stage("diarize_wait"):
+            return diarize_future.result()
+
+    writer = open_segment_writer(
+        output_file,
+        CSV_FIELDNAMES,
+        output_format,
+        journal_fields={"diarize_key": output_diarize_key},
+        file=str(audio_file),
+        model=model_name,
+        engine="whisperx",
+    )
+    with writer:
+        if stream_seconds:
+            # 流式模式：说话人分离对整段音频进行，保证各窗口（以及续传前后）
+            # 说话人标签一致；从断点处逐窗口转录、对齐，分配说话人后立即写入
+            # （转录进度由 CSV 断点日志记录，只有说话人分离结果保存为阶段产物）
+            model = get_model()
+            audio = get_audio()
+            diarize_segments, diarize_joined = None, False
+
+            print(f"\n流式转录: 每处理 {stream_seconds:.0f} 秒音频写入一次")
+            total = len(audio) / SAMPLE_RATE
+            pos = last_timestamp
+            segments, processed = [], []
+            detected_language = language or "unknown"
+            align_model, align_loaded = None, False
+            while pos < total - 0.1:
+                end = min(total, pos + stream_seconds)
+                window = audio[int(pos * SAMPLE_RATE) : int(end * SAMPLE_RATE)]
+                with timer.stage("inference"):
+                    result = model.transcribe(window, **transcribe_options)
+                detected_language = result.get("language", detected_language)
+                result["segments"], next_pos = trim_window(
+                    result["segments"], pos, end, total
+                )
+
+                with timer.stage("align"):
+                    if not align_loaded:
+                        align_model = load_align_model(
+                            whisperx, detected_language, device
+                        )
+                        align_loaded = True
+                    result = align_segments(
+                        whisperx, result, align_model, window, device
+                    )
+                shift_segments(result["segments"], pos)
+                if not diarize_joined:
+                    diarize_segments = join_diarization()
+                    diarize_joined = True
+                if diarize_segments is not None:
+                    with timer.stage("assign_speakers"):
+                        result = assign_word_speakers(diarize_segments, result)
+
+                with timer.stage("convert"):
+                    rows = build_rows(
+                        [seg for seg in result["segments"] if seg["end"] > last_timestamp],
+                        detected_language,
+                        force_simplified,
+                        timestamps=not columnar,
+                    )
+                with timer.stage("csv_write"):
+                    writer.write(rows, language=detected_language)
+                segments.extend(result["segments"])
+                processed.extend(rows)
+                if rows:
+                    print(f"  ✓ 已写入至 {format_timestamp(rows[-1]['end_time'])}")
+                pos = next_pos
+
+            result = {"segments": segments, "language": detected_language}
+        else:
+            # ── Step 1: 转录（已有对齐或转录产物时跳过） ─────────────────
+            result = artifacts.load("aligned", aligned_key)
+            if result is None:
+                result = artifacts.load("asr", asr_key)
+                if result is None:
+                    model = get_model()
+                    audio = get_audio()
+                    print("正在转录，请稍候...")
+                    with timer.stage("inference"):
+                        result = model.transcribe(audio, **transcribe_options)
+                    artifacts.save("asr", asr_key, result)
+                detected_language = result.get("language", language or "unknown")
+                print(
+                    f"✓ 转录完成! 检测语言: {detected_language}，"
+                    f"共 {len(result['segments'])} 段"
+                )
+
+                # ── Step 2: 时间戳对齐 ─────────────────────────────────
+                print("\n正在对齐时间戳...")
+                with timer.stage("align"):
+                    align_model = load_align_model(whisperx, detected_language, device)
+                    aligned = (
+                        align_segments(whisperx, result, align_model, get_audio(), device)
+                        if align_model is not None
+                        else result
+                    )
+                if aligned is not result:
+                    print("✓ 时间戳对齐完成")
+                    # 对齐失败时不保存，下次运行重新尝试
+                    result = {
+                        "segments": aligned["segments"],
+                        "language": detected_language,
+                    }
+                    artifacts.save("aligned", aligned_key, result)
+            detected_language = result.get("language", language or "unknown")
+
+            # ── Step 3: 说话人分离（并行时在此等待后台线程） ──────────────
+            diarize_segments = join_diarization()
+            if diarize_segments is not None:
+                with timer.stage("assign_speakers"):
+                    result = assign_word_speakers(diarize_segments, result)
+                print("✓ 说话人分离完成")
+
+            # ── Step 4: 处理分段并写入 CSV ─────────────────────────────
+            segments = result.get("segments", [])
+            new_segments = [seg for seg in segments if seg["end"] > last_timestamp]
+            with timer.stage("convert"):
+                processed = build_rows(
+                    new_segments,
+                    detected_language,
+                    force_simplified,
+                    timestamps=not columnar,
+                )
+            with timer.stage("csv_write"):
+                writer.write(processed, language=detected_language)
+    timer.meta["segments"] = len(processed)
+    timer.meta["language"] = detected_language
 
     if is_resume:
-        skipped = len(segments) - len(new_segments)
-        print(f"\n已跳过分段: {skipped}，新增分段: {len(new_segments)}")
+        skipped = len(segments) - len(processed)
+        print(f"\n已跳过分段: {skipped}，新增分段: {len(processed)}")
 
-    if not new_segments:
+    if not processed:
         print("\n✓ 没有新内容需要转录")
         return result
 
-    processed = []
-    for seg in new_segments:
-        text = seg.get("text", "").strip()
-        if force_simplified and detected_language == "zh":
-            text = convert_to_simplified(text)
-
-        speaker = seg.get("speaker", "UNKNOWN")
-        processed.append(
-            {
-                "start_time": seg["start"],
-                "end_time": seg["end"],
-                "start_timestamp": format_timestamp(seg["start"]),
-                "end_timestamp": format_timestamp(seg["end"]),
-                "duration": round(seg["end"] - seg["start"], 3),
-                "speaker": speaker,
-                "text": text,
-            }
-        )
-
     if force_simplified and detected_language == "zh":
-        if HAS_OPENCC or HAS_ZHCONV:
+        if get_converter() is not None:
             print("✓ 已转换为简体中文")
         else:
             print(
                 "⚠ 未安装繁简转换库，建议安装: pip install opencc-python-reimplemented"
             )
 
-    file_exists = os.path.exists(output_file)
-    mode = "a" if file_exists else "w"
-
-    with open(output_file, mode, encoding="utf-8-sig", newline="") as f:
-        fieldnames = [
-            "start_time",
-            "end_time",
-            "start_timestamp",
-            "end_timestamp",
-            "duration",
-            "speaker",
-            "text",
-        ]
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        if not file_exists:
-            writer.writeheader()
-        for seg in processed:
-            writer.writerow(seg)
-
     print(f"\n✓ 结果已保存到: {output_file}")
     print(f"✓ 新增记录: {len(processed)} 条")
 
@@ -276,7 +623,7 @@ def transcribe_with_diarization(
         preview = seg["text"][:45] + ("..." if len(seg["text"]) > 45 else "")
         print(
             f"[{seg['speaker']}] "
-            f"{seg['start_timestamp']} --> {seg['end_timestamp']}  "
+            f"{format_timestamp(seg['start_time'])} --> {format_timestamp(seg['end_time'])}  "
             f"{preview}"
         )
     print("-" * 90)
@@ -284,6 +631,75 @@ def transcribe_with_diarization(
     return result
 
 
+def diarize_output_path(media_file, directory, output_dir=None, output_format="csv"):
+    """批量模式的输出路径：<音频文件名>_diarize.csv，指定输出目录时保持相对目录结构"""
+    media_file = Path(media_file)
+    name = f"{media_file.stem}_diarize{OUTPUT_SUFFIXES[output_format]}"
+    if output_dir is None:
+        return media_file.parent / name
+    relative = media_file.parent.relative_to(directory)
+    return Path(output_dir) / relative / name
+
+
+def transcribe_directory(
+    directory, recursive=False, skip_existing=False, output_dir=None, **options
+):
+    """
+    批量处理目录下所有音视频文件，返回 (成功列表, 失败列表)
+
+    ASR 模型、各语言的对齐模型和说话人分离管线只加载一次，所有文件共用；
+    skip_existing 时跳过已有输出 CSV 的文件，否则已有输出的文件从断点继续
+
+    Args:
+        directory:     要遍历的目录
+        recursive:     是否递归子目录
+        skip_existing: 跳过已有输出 CSV 的文件
+        output_dir:    输出目录（可选，默认与音频文件同目录）
+        **options:     传给 transcribe_with_diarization 的其余参数
+    """
+    from batch_transcribe import find_media_files
+
+    directory = Path(directory)
+    media_files = find_media_files(directory, recursive=recursive)
+    if not media_files:
+        print(f"⚠ 目录中未找到任何音视频文件: {directory}")
+        return [], []
+    print(f"✓ 找到 {len(media_files)} 个音视频文件")
+
+    output_format = options.get("output_format", "csv")
+
+    def output_path(media_file):
+        return diarize_output_path(media_file, directory, output_dir, output_format)
+
+    if skip_existing:
+        skipped = [f for f in media_files if output_path(f).exists()]
+        media_files = [f for f in media_files if f not in skipped]
+        if skipped:
+            print(f"⚠ 跳过 {len(skipped)} 个已有输出的文件:")
+            for f in skipped:
+                print(f"  - {f.name}")
+
+    success, failed = [], []
+    total = len(media_files)
+    for idx, media_file in enumerate(media_files, 1):
+        output_file = output_path(media_file)
+        output_file.parent.mkdir(parents=True, exist_ok=True)
+        print(f"\n{'='*70}")
+        print(f"[{idx}/{total}] ▶ 处理文件: {media_file.name}")
+        print(f"  输出到:   {output_file}")
+        print(f"{'='*70}")
+        try:
+            transcribe_with_diarization(
+                audio_file=str(media_file), output_file=str(output_file), **options
+            )
+            success.append(media_file)
+        except Exception as e:
+            failed.append(media_file)
+            print(f"  ✗ 处理失败 ({e}): {media_file.name}")
+
+    return success, failed
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="WhisperX 音频转文字（含说话人识别），输出带时间轴的 CSV",
@@ -304,6 +720,42 @@ def main():
 
 断点续传:
   输出文件已存在时，自动从上次位置继续，重复运行相同命令即可
+  断点位置记录在 <输出文件>.progress.json 中，续传时无需读取整个 CSV
+
+流式输出（长音频推荐）:
+  python audio_to_text_diarize.py meeting.mp4 -m turbo -l zh -t hf_xxxx --stream 600
+  先完成说话人分离，再每转录 600 秒音频写入一次 CSV，中断后已完成的部分不会丢失
+
+批量处理目录（模型只加载一次，所有文件共用）:
+  python audio_to_text_diarize.py D:\\meetings -m turbo -l zh -t hf_xxxx -r
+  python audio_to_text_diarize.py D:\\meetings -m turbo -l zh -t hf_xxxx --skip-existing -o D:\\results
+  输出为 <音频文件名>_diarize.csv；已有输出的文件从断点继续，--skip-existing 时直接跳过
+
+解码音频缓存（与 audio_to_text.py 共用）:
+  python audio_to_text_diarize.py movie.mkv -m turbo -l zh -t hf_xxxx --audio-cache D:\\audio_cache
+
+阶段产物（中断或修改参数后从第一个缺失的阶段继续）:
+  转录、对齐、说话人分离的结果分别保存在音频所在目录的 .diarize_stages/ 下，
+  以输入文件和影响该阶段的选项为键；例如只修改 --min-speakers 时，
+  重新运行只会重做说话人分离和说话人分配，并用已保存的转录/对齐结果从头重写输出
+  python audio_to_text_diarize.py audio.mp3 -m turbo -l zh -t hf_xxxx --min-speakers 3
+
+列式输出（Parquet / Arrow，需 pip install pyarrow）:
+  python audio_to_text_diarize.py audio.mp3 -m turbo -l zh -t hf_xxxx --output-format parquet
+  python audio_to_text_diarize.py D:\\meetings -m turbo -l zh -t hf_xxxx --output-format arrow
+  除 CSV 各列外还包含 file / model / engine / language 元数据列，
+  说话人列字典编码，时间戳列为整列换算的 duration[ms] 类型
+  python audio_to_text_diarize.py audio.mp3 -m turbo -l zh -t hf_xxxx --stage-dir D:\\stages
+  python audio_to_text_diarize.py audio.mp3 -m turbo -l zh -t hf_xxxx --no-stage-cache
+
+说话人分离与转录并行:
+  说话人分离默认在后台线程中与转录/对齐同时运行，在分配说话人前汇合
+  python audio_to_text_diarize.py audio.mp3 -m turbo -l zh -t hf_xxxx --diarize-device cpu   # 显存不足时放到 CPU
+  python audio_to_text_diarize.py audio.mp3 -m turbo -l zh -t hf_xxxx --sequential-diarize   # 依次运行
+
+各阶段耗时统计:
+  python audio_to_text_diarize.py audio.mp3 -m turbo -l zh -t hf_xxxx --metrics-out metrics.jsonl
+  每个文件追加一行 JSON：模型加载/解码/推理/对齐/说话人分离/CSV写入各阶段耗时与内存快照
 
 输出 CSV 字段:
   start_time      开始时间（秒）
@@ -321,7 +773,7 @@ def main():
         """,
     )
 
-    parser.add_argument("audio_file", help="音频文件路径")
+    parser.add_argument("audio_file", help="音频文件路径，或要批量处理的目录")
     parser.add_argument(
         "-m",
         "--model",
@@ -344,7 +796,7 @@ def main():
     parser.add_argument(
         "-o",
         "--output",
-        help="输出 CSV 文件路径 (默认: 音频文件名_diarize.csv)",
+        help="输出 CSV 文件路径 (默认: 音频文件名_diarize.csv)；批量模式下为输出目录",
     )
     parser.add_argument(
         "-d",
@@ -368,20 +820,108 @@ def main():
         action="store_true",
         help="禁用繁简转换，保留原始输出",
     )
+    parser.add_argument(
+        "--stream",
+        type=float,
+        metavar="SECONDS",
+        help="流式输出：按该窗口长度（秒）逐段转录并立即写入 CSV（例如 600）",
+    )
+    parser.add_argument(
+        "--audio-cache",
+        help="解码音频缓存目录，已解码的 PCM 以 .npy 保存并内存映射复用",
+    )
+    parser.add_argument(
+        "--metrics-out",
+        help="各阶段耗时统计输出文件（JSON Lines，每个文件追加一行）",
+    )
+    parser.add_argument(
+        "--stage-dir",
+        help="阶段产物目录 (默认: 音频所在目录下的 .diarize_stages)",
+    )
+    parser.add_argument(
+        "--no-stage-cache",
+        action="store_true",
+        help="不保存也不复用转录/对齐/说话人分离的阶段产物",
+    )
+    parser.add_argument(
+        "--diarize-device",
+        default="auto",
+        choices=["auto", "cpu", "cuda"],
+        help="说话人分离使用的设备 (默认: auto，与转录相同)",
+    )
+    parser.add_argument(
+        "--sequential-diarize",
+        action="store_true",
+        help="转录、对齐完成后再进行说话人分离（默认两者并行）",
+    )
+    parser.add_argument(
+        "-r",
+        "--recursive",
+        action="store_true",
+        help="批量模式下递归遍历子目录",
+    )
+    parser.add_argument(
+        "--skip-existing",
+        action="store_true",
+        help="批量模式下跳过已存在输出 CSV 的文件",
+    )
+    parser.add_argument(
+        "--output-format",
+        default="csv",
+        choices=OUTPUT_FORMATS,
+        help="输出格式 (csv, parquet, arrow, 默认: csv；-o 的扩展名为 .parquet/.arrow 时以扩展名为准)",
+    )
 
     args = parser.parse_args()
 
+    options = {
+        "model_name": args.model,
+        "language": args.language,
+        "model_dir": args.model_dir,
+        "hf_token": args.token,
+        "min_speakers": args.min_speakers,
+        "max_speakers": args.max_speakers,
+        "force_simplified": not args.no_force_simplified,
+        "stream_seconds": args.stream,
+        "audio_cache_dir": args.audio_cache,
+        "metrics_out": args.metrics_out,
+        "stage_dir": args.stage_dir,
+        "stage_cache": not args.no_stage_cache,
+        "diarize_device": args.diarize_device,
+        "concurrent_diarize": not args.sequential_diarize,
+        "output_format": args.output_format,
+    }
+
     try:
+        if os.path.isdir(args.audio_file):
+            import time
+
+            run_started = time.time()
+            success, failed = transcribe_directory(
+                args.audio_file,
+                recursive=args.recursive,
+                skip_existing=args.skip_existing,
+                output_dir=args.output,
+                **options,
+            )
+            print(f"\n{'='*70}")
+            print("批量转录完成")
+            print(f"  成功: {len(success)} 个")
+            print(f"  失败: {len(failed)} 个")
+            if args.metrics_out:
+                from batch_transcribe import report_metrics
+
+                report_metrics(args.metrics_out, run_started)
+            if failed:
+                print("\n失败文件列表:")
+                for f in failed:
+                    print(f"  ✗ {f.name}")
+                return 1
+            print("=" * 70)
+            return 0
+
         transcribe_with_diarization(
-            audio_file=args.audio_file,
-            model_name=args.model,
-            language=args.language,
-            output_file=args.output,
-            model_dir=args.model_dir,
-            hf_token=args.token,
-            min_speakers=args.min_speakers,
-            max_speakers=args.max_speakers,
-            force_simplified=not args.no_force_simplified,
+            audio_file=args.audio_file, output_file=args.output, **options
         )
         print("\n✓ 任务完成!")
 
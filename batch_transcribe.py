@@ -1,14 +1,48 @@
 """
 批量音频/视频转文字工具
 遍历指定目录下所有音视频文件，逐个调用 audio_to_text.py 进行转录
+使用 --in-process 时在当前进程内转录，模型只加载一次
+使用 --workers N 时启动 N 个常驻工作进程并行转录（每个进程持有一份模型）
+使用 --batch-size N 时把 30 秒以内的短音频跨文件分批，编码器/解码器按批次运行
+使用 --dataset DIR 时把整个目录的转录结果汇总为一个按模型/语言分区的 Parquet 数据集
+使用 --index DB 时转录结束后增量更新全文检索索引（见 transcript_index.py）
+使用 --manifest DB 时边扫描边处理，并把每个文件的状态持久化，重复运行只处理新增或修改过的文件
+使用 --watch 时常驻运行，模型只加载一次，新文件复制完成后立即转录
+开始前并行探测媒体时长，按 --order 排序（多进程时默认最长的先处理），
+按滚动估计的实时率打印预计剩余时间，并记录每次运行的吞吐量
+进程内和批量解码模式下，转录当前文件的同时在后台提前解码后面的文件（--prefetch）
 """
 
 import argparse
+import multiprocessing
 import os
+import queue
 import subprocess
 import sys
+import threading
+import time
 from pathlib import Path
 
+from audio_prefetch import DEFAULT_PREFETCH_FILES, DEFAULT_PREFETCH_MB, AudioPrefetcher
+from job_manifest import DEFAULT_MAX_ATTEMPTS, JobManifest, ScanFeed
+from media_probe import format_duration, probe_durations
+from throughput import (
+    DEFAULT_HISTORY,
+    EtaEstimator,
+    append_history,
+    load_history,
+    prior_rtf,
+)
+from watch_folder import (
+    DEFAULT_POLL_INTERVAL,
+    DEFAULT_QUEUE_SIZE,
+    DEFAULT_SETTLE_SECONDS,
+    FolderWatcher,
+)
+from transcript_columnar import OUTPUT_FORMATS, OUTPUT_SUFFIXES
+from transcript_io import read_journal
+from vad import VAD_METHODS
+
 # 支持的音视频扩展名
 AUDIO_VIDEO_EXTENSIONS = {
     ".mp3",
@@ -34,29 +68,189 @@ SCRIPT_DIR = Path(__file__).parent
 TRANSCRIBE_SCRIPT = SCRIPT_DIR / "audio_to_text.py"
 
 
-def find_media_files(directory, recursive=False):
-    """遍历目录，返回所有音视频文件路径列表"""
+def iter_media_files(directory, recursive=False):
+    """
+    用 os.scandir 流式遍历目录，逐个产出 (音视频文件路径, os.stat_result)
+
+    只对扩展名匹配的文件取 stat，目录按名称顺序深度优先遍历（不跟随目录符号链接）；
+    每个目录读完后立即关闭，边遍历边处理时不会长时间占用目录句柄
+    """
     directory = Path(directory)
     if not directory.exists():
         raise FileNotFoundError(f"目录不存在: {directory}")
     if not directory.is_dir():
         raise NotADirectoryError(f"路径不是目录: {directory}")
+    return _walk_media_files(str(directory), recursive)
 
-    pattern = "**/*" if recursive else "*"
-    files = [
-        f
-        for f in directory.glob(pattern)
-        if f.is_file() and f.suffix.lower() in AUDIO_VIDEO_EXTENSIONS
-    ]
-    return sorted(files)
+
+def _walk_media_files(directory, recursive):
+    """iter_media_files 的遍历部分（目录已检查）"""
+    stack = [directory]
+    while stack:
+        current = stack.pop()
+        files, subdirs = [], []
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive:
+                                subdirs.append(entry.path)
+                        elif os.path.splitext(entry.name)[1].lower() in (
+                            AUDIO_VIDEO_EXTENSIONS
+                        ) and entry.is_file():
+                            files.append((entry.name, entry))
+                    except OSError:
+                        continue
+        except OSError as e:
+            print(f"⚠ 无法读取目录 ({e}): {current}")
+            continue
+
+        for _, entry in sorted(files, key=lambda item: item[0]):
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            yield Path(entry.path), st
+        stack.extend(sorted(subdirs, reverse=True))
+
+
+def find_media_files(directory, recursive=False):
+    """遍历目录，返回所有音视频文件路径列表"""
+    return sorted(path for path, _ in iter_media_files(directory, recursive=recursive))
+
+
+def output_path(media_file, output_format="csv"):
+    """输出文件与音频文件同目录，扩展名改为输出格式对应的扩展名（.csv / .parquet / .arrow）"""
+    return media_file.with_suffix(OUTPUT_SUFFIXES[output_format])
+
+
+def is_transcribed(media_file, output_format="csv"):
+    """输出文件的断点日志已标记转录完成（audio_to_text.py 会直接跳过，不必排队和探测时长）"""
+    journal = read_journal(output_path(media_file, output_format))
+    return bool(journal and journal.get("complete"))
+
+
+def total_label(media_files):
+    """进度显示的总数（边扫描边处理时由 ScanFeed / FolderWatcher 给出）"""
+    if hasattr(media_files, "total_label"):
+        return media_files.total_label()
+    return str(len(media_files))
 
 
-def run_transcribe(audio_file, model, language, model_dir, extra_args):
+def record_start(args, media_file):
+    """使用任务清单时记录开始处理"""
+    if args.job_manifest is not None:
+        args.job_manifest.start(media_file)
+
+
+def record_finish(args, media_file, error=None):
+    """
+    记录处理结果：打印进度和预计剩余时间，使用任务清单时更新清单
+
+    成功时使用转录结果的时长（断点日志中记录的），进度估计、吞吐量历史和清单
+    保持一致；没有时使用探测的时长
+    """
+    duration = None
+    if error is None:
+        journal = read_journal(output_path(media_file, args.output_format))
+        duration = journal.get("duration") if journal else None
+    if duration is None and args.durations:
+        duration = args.durations.get(media_file)
+    if args.progress is not None:
+        print(f"  ⏱ {args.progress.complete(media_file, error, duration)}")
+    if args.job_manifest is not None:
+        args.job_manifest.finish(media_file, error, duration)
+
+
+def run_config(args):
+    """影响吞吐量的运行配置（历史记录按此匹配）"""
+    if args.workers:
+        mode = "pool"
+    elif args.batch_size:
+        mode = "batched"
+    elif args.in_process:
+        mode = "in_process"
+    else:
+        mode = "subprocess"
+    return {
+        "model": args.model,
+        "engine": args.engine,
+        "quantize": args.quantize,
+        "mode": mode,
+        "workers": args.workers or 1,
+        "vad": args.vad,
+    }
+
+
+def resolve_order(args):
+    """处理顺序：auto 在多个工作进程时最长的先处理（避免最后只剩一个长文件），否则按文件名"""
+    if args.order != "auto":
+        return args.order
+    return "longest" if args.workers and args.workers > 1 else "name"
+
+
+def schedule(media_files, args, known=None):
+    """
+    并行探测时长并按处理顺序排序，设置进度估计，返回排好序的文件列表
+
+    Args:
+        known: 已知时长 {路径字符串: 秒}（任务清单中记录的），这些文件不再探测
+    """
+    order = resolve_order(args)
+    if args.no_probe:
+        if order != "name":
+            print("⚠ 未探测时长（--no-probe），按文件名顺序处理")
+        return media_files
+
+    print(f"▶ 并行探测 {len(media_files)} 个文件的时长...")
+    durations = probe_durations(media_files, known=known)
+    if order == "longest":
+        # 时长未知的文件放在最后
+        media_files = sorted(media_files, key=lambda f: -(durations[f] or 0.0))
+    elif order == "shortest":
+        media_files = sorted(
+            media_files, key=lambda f: (durations[f] is None, durations[f] or 0.0)
+        )
+
+    config = run_config(args)
+    prior = None
+    if args.history:
+        prior = prior_rtf(load_history(args.history), **config)
+    args.durations = durations
+    args.progress = EtaEstimator(durations, prior)
+
+    unknown = sum(1 for d in durations.values() if d is None)
+    line = f"✓ 音频总时长 {format_duration(args.progress.total)}"
+    if unknown:
+        line += f"（{unknown} 个文件无法读取时长，按平均时长估计）"
+    print(line)
+    if prior is not None:
+        print(
+            f"✓ 预计耗时 {format_duration(args.progress.total * prior)}"
+            f"（历史实时率 {prior:.3f}，{config['model']} / {config['engine']}）"
+        )
+    order_names = {"name": "文件名", "longest": "最长优先", "shortest": "最短优先"}
+    print(f"▶ 处理顺序: {order_names[order]}")
+    return media_files
+
+
+def print_file_header(audio_file, output_file):
+    """打印单个文件的处理信息"""
+    print(f"\n{'='*70}")
+    print(f"▶ 处理文件: {audio_file.name}")
+    print(f"  输出到:   {output_file.name}")
+    print(f"{'='*70}")
+
+
+def run_transcribe(
+    audio_file, model, language, model_dir, extra_args, output_format="csv"
+):
     """
     调用 audio_to_text.py 对单个文件进行转录
-    输出文件与音频文件同目录，扩展名改为 .csv
+    输出文件与音频文件同目录，扩展名改为 .csv（列式输出为 .parquet / .arrow）
     """
-    output_file = audio_file.with_suffix(".csv")
+    output_file = output_path(audio_file, output_format)
 
     cmd = [
         sys.executable,
@@ -75,16 +269,515 @@ def run_transcribe(audio_file, model, language, model_dir, extra_args):
     if extra_args:
         cmd += extra_args
 
-    print(f"\n{'='*70}")
-    print(f"▶ 处理文件: {audio_file.name}")
-    print(f"  输出到:   {output_file.name}")
-    print(f"{'='*70}")
+    print_file_header(audio_file, output_file)
 
     result = subprocess.run(cmd)
     return result.returncode
 
 
-def main():
+def transcribe_with_subprocess(media_files, args):
+    """每个文件启动一个 audio_to_text.py 子进程，返回 (成功列表, 失败列表)"""
+    # 组装传递给子脚本的额外参数
+    extra_args = []
+    if args.no_force_simplified:
+        extra_args.append("--no-force-simplified")
+    if args.cache_dir:
+        extra_args += ["--cache-dir", args.cache_dir]
+    if args.audio_cache:
+        extra_args += ["--audio-cache", args.audio_cache]
+    if args.metrics_out:
+        extra_args += ["--metrics-out", args.metrics_out]
+    if args.engine != "whisper":
+        extra_args += ["--engine", args.engine]
+    if args.quantize:
+        extra_args.append("--quantize")
+    if args.vad:
+        extra_args += ["--vad", args.vad]
+
+    success, failed = [], []
+
+    for idx, media_file in enumerate(media_files, 1):
+        print(f"\n[{idx}/{total_label(media_files)}] 开始处理...")
+        record_start(args, media_file)
+        code = run_transcribe(
+            audio_file=media_file,
+            model=args.model,
+            language=args.language,
+            model_dir=args.model_dir,
+            extra_args=extra_args,
+            output_format=args.output_format,
+        )
+        record_finish(args, media_file, None if code == 0 else f"exit code {code}")
+        if code == 0:
+            success.append(media_file)
+        else:
+            failed.append(media_file)
+            print(f"  ✗ 处理失败 (exit code {code}): {media_file.name}")
+
+    return success, failed
+
+
+def prefetch_loader(args):
+    """预取的默认解码函数：解码整个文件（使用 --audio-cache 时读取解码缓存），已有输出的文件返回 None"""
+    from audio_cache import load_audio
+
+    def load(media_file):
+        if output_path(media_file, args.output_format).exists():
+            return None
+        return load_audio(str(media_file), cache_dir=args.audio_cache)
+
+    return load
+
+
+def prefetched(media_files, args, load=None):
+    """
+    产出 (文件, 音频, 错误)
+
+    --prefetch 大于 0 时由后台线程提前解码后面的文件（预取内存受 --prefetch-mb 限制）；
+    否则在取到文件时才调用 load 解码，未指定 load 时音频为 None（由转录时自行解码）
+
+    Args:
+        load: 解码函数 load(文件) -> 音频，返回 None 表示不需要解码
+              （默认解码整个文件，使用 --audio-cache 时读取解码缓存；已有输出的文件
+              不预取，由转录时从断点处跳转解码或直接跳过已完成的文件）
+    """
+    if args.prefetch:
+        if load is None:
+            load = prefetch_loader(args)
+        return AudioPrefetcher(
+            media_files,
+            load,
+            lookahead=args.prefetch,
+            max_mb=args.prefetch_mb,
+            duration=args.durations.get if args.durations else None,
+        )
+    return _load_inline(media_files, load)
+
+
+def _load_inline(media_files, load):
+    for media_file in media_files:
+        audio, error = None, None
+        if load is not None:
+            try:
+                audio = load(media_file)
+            except Exception as e:
+                error = e
+        yield media_file, audio, error
+
+
+def _decoded_loader(args, decoded):
+    """优先使用已解码的音频（取出后释放），其余文件按预取设置处理"""
+    fallback = prefetch_loader(args) if args.prefetch else None
+
+    def load(media_file):
+        if media_file in decoded:
+            return decoded.pop(media_file)
+        return fallback(media_file) if fallback is not None else None
+
+    return load
+
+
+def transcribe_in_process(media_files, args, decoded=None):
+    """
+    在当前进程内逐个转录，模型只加载一次，返回 (成功列表, 失败列表)
+    输出文件与子进程模式相同（音频同目录，扩展名按输出格式修改）
+
+    Args:
+        decoded: 已解码的音频 {文件: 音频}（例如批量解码回退的短音频），这些文件不再解码
+    """
+    # 延迟导入：只有进程内模式才需要 whisper / torch
+    import audio_to_text
+
+    success, failed = [], []
+    load = _decoded_loader(args, decoded) if decoded else None
+
+    for idx, (media_file, audio, error) in enumerate(prefetched(media_files, args, load), 1):
+        print(f"\n[{idx}/{total_label(media_files)}] 开始处理...")
+        output_file = output_path(media_file, args.output_format)
+        print_file_header(media_file, output_file)
+        record_start(args, media_file)
+        try:
+            if error is not None:
+                raise error
+            audio_to_text.transcribe_audio(
+                audio_file=str(media_file),
+                model_name=args.model,
+                language=args.language,
+                output_file=str(output_file),
+                model_dir=args.model_dir,
+                force_simplified=not args.no_force_simplified,
+                cache_dir=args.cache_dir,
+                audio_cache_dir=args.audio_cache,
+                metrics_out=args.metrics_out,
+                engine=args.engine,
+                quantize=args.quantize,
+                output_format=args.output_format,
+                audio=audio,
+                vad=args.vad,
+            )
+            record_finish(args, media_file)
+            success.append(media_file)
+        except Exception as e:
+            record_finish(args, media_file, e)
+            failed.append(media_file)
+            print(f"  ✗ 处理失败 ({e}): {media_file.name}")
+
+    return success, failed
+
+
+def transcribe_batched(media_files, args):
+    """
+    跨文件批量解码，返回 (成功列表, 失败列表)
+
+    不超过 30 秒的短音频按 --batch-size 分批，补齐为 30 秒 mel 频谱后一次性
+    送入编码器和解码器；较长的文件、已有部分转录结果（续传）的文件，以及
+    批量解码质量不达标的短音频，改为逐个进程内转录。
+    指定 --cache-dir 时与逐个转录共用转录缓存：命中的文件不进入批次
+    """
+    import audio_to_text
+    import batched_decode
+    from transcript_cache import TranscriptCache
+    from transcript_columnar import open_segment_writer
+    from transcript_io import mark_complete
+
+    if args.engine != "whisper":
+        print(f"⚠ 批量解码仅支持 whisper 引擎，{args.engine} 引擎改为逐个进程内转录")
+        return transcribe_in_process(media_files, args)
+
+    model = audio_to_text.load_model(
+        args.model, args.model_dir, quantize=args.quantize
+    ).model
+    language = None if args.language == "auto" else args.language
+    initial_prompt = "以下是简体中文的转录内容：" if args.language == "zh" else None
+    cache = TranscriptCache(args.cache_dir) if args.cache_dir else None
+
+    success, failed = [], []
+    single = []  # 需要逐个转录的文件
+    decoded = {}  # 批量解码质量不达标的短音频：逐个转录时直接使用，不再解码
+    batch = []  # (文件, 音频, 缓存键)
+    max_seconds = batched_decode.MAX_CLIP_SECONDS
+
+    def write_result(media_file, audio, result):
+        record_start(args, media_file)
+        rows = audio_to_text.build_rows(
+            result["segments"],
+            result["language"],
+            not args.no_force_simplified,
+            timestamps=args.output_format == "csv",
+        )
+        try:
+            with open_segment_writer(
+                output_path(media_file, args.output_format),
+                audio_to_text.CSV_FIELDNAMES,
+                args.output_format,
+                file=str(media_file),
+                model=args.model,
+                engine=args.engine,
+            ) as writer:
+                writer.write(rows, language=result["language"])
+            mark_complete(
+                output_path(media_file, args.output_format),
+                rows[-1]["end_time"] if rows else 0.0,
+                len(audio) / audio_to_text.SAMPLE_RATE,
+            )
+            record_finish(args, media_file)
+            success.append(media_file)
+            print(f"  ✓ {media_file.name} ({len(rows)} 段)")
+        except OSError as e:
+            record_finish(args, media_file, e)
+            failed.append(media_file)
+            print(f"  ✗ 写入失败 ({e}): {media_file.name}")
+
+    def flush():
+        print(f"\n▶ 批量解码 {len(batch)} 个短音频...")
+        try:
+            results = batched_decode.decode_batch(
+                model, [audio for _, audio, _ in batch], language, initial_prompt
+            )
+        except Exception as e:
+            print(f"  ⚠ 批量解码失败 ({e})，改为逐个转录")
+            results = [None] * len(batch)
+
+        for (media_file, audio, key), result in zip(batch, results):
+            if result is None:
+                single.append(media_file)
+                decoded[media_file] = audio
+                continue
+            write_result(media_file, audio, result)
+            if cache is not None:
+                cache.put(key, audio_to_text.cache_entry(result["segments"], result["language"]))
+        batch.clear()
+
+    def load(media_file):
+        # 已有输出的文件（续传）和探测时长超过批量上限的文件逐个转录，不需要在这里解码
+        if output_path(media_file, args.output_format).exists():
+            return None
+        duration = args.durations.get(media_file) if args.durations else None
+        if duration and duration > max_seconds:
+            return None
+        return audio_to_text.load_audio(str(media_file), cache_dir=args.audio_cache)
+
+    hits = 0
+    try:
+        for media_file, audio, error in prefetched(media_files, args, load):
+            if error is not None:
+                record_start(args, media_file)
+                record_finish(args, media_file, error)
+                failed.append(media_file)
+                print(f"  ✗ 解码失败 ({error}): {media_file.name}")
+                continue
+            if audio is None or len(audio) > max_seconds * audio_to_text.SAMPLE_RATE:
+                single.append(media_file)
+                continue
+            key = None
+            if cache is not None:
+                # 批量解码不使用 VAD，缓存键与不带 --vad 的逐个转录相同
+                key = audio_to_text.transcript_cache_key(
+                    audio,
+                    args.model,
+                    args.engine,
+                    args.quantize,
+                    args.language,
+                    initial_prompt,
+                    not args.no_force_simplified,
+                )
+                cached = cache.get(key)
+                if cached is not None:
+                    hits += 1
+                    write_result(media_file, audio, cached)
+                    continue
+            batch.append((media_file, audio, key))
+            if len(batch) >= args.batch_size:
+                flush()
+        if batch:
+            flush()
+    finally:
+        if cache is not None:
+            cache.close()
+    if hits:
+        print(f"\n✓ 命中转录缓存: {hits} 个文件")
+
+    if single:
+        print(f"\n▶ 逐个转录 {len(single)} 个文件（较长、续传或批量解码质量不达标）")
+        single_success, single_failed = transcribe_in_process(single, args, decoded)
+        success += single_success
+        failed += single_failed
+
+    return success, failed
+
+
+def _pool_worker(worker_id, task_queue, result_queue, options, num_threads):
+    """
+    常驻工作进程：固定推理线程数，加载一次模型后不断从队列取文件转录
+    队列中取到 None 时退出
+    """
+    # 必须在导入 torch / CTranslate2 之前设置（ctranslate2 引擎不导入 torch）
+    from engines import set_worker_threads
+
+    set_worker_threads(options["engine"], num_threads)
+
+    import audio_to_text
+
+    while True:
+        item = task_queue.get()
+        if item is None:
+            break
+
+        result_queue.put(("start", worker_id, item, None))
+        media_file = Path(item)
+        try:
+            audio_to_text.transcribe_audio(
+                audio_file=str(media_file),
+                output_file=str(output_path(media_file, options["output_format"])),
+                **options,
+            )
+            result_queue.put(("done", worker_id, item, None))
+        except Exception as e:
+            result_queue.put(("done", worker_id, item, str(e)))
+
+
+def transcribe_with_pool(media_files, args):
+    """
+    使用常驻工作进程池并行转录，返回 (成功列表, 失败列表)
+
+    文件通过共享队列分发；某个工作进程崩溃时，其正在处理的文件记为失败，
+    并启动新的工作进程接替，批量任务不会中断。media_files 为 ScanFeed 时
+    由分发线程边扫描边放入队列，扫描未完成时工作进程即可开始转录
+    """
+    num_workers = max(1, args.workers)
+    num_threads = args.threads_per_worker or max(1, (os.cpu_count() or 1) // num_workers)
+    options = {
+        "model_name": args.model,
+        "language": args.language,
+        "model_dir": args.model_dir,
+        "force_simplified": not args.no_force_simplified,
+        "cache_dir": args.cache_dir,
+        "audio_cache_dir": args.audio_cache,
+        "metrics_out": args.metrics_out,
+        "engine": args.engine,
+        "quantize": args.quantize,
+        "output_format": args.output_format,
+        "vad": args.vad,
+    }
+
+    # spawn 启动：子进程不继承父进程的 torch/CUDA 状态
+    ctx = multiprocessing.get_context("spawn")
+    task_queue = ctx.Queue()
+    result_queue = ctx.Queue()
+    pending = {}
+    fed = threading.Event()
+
+    def feed():
+        for media_file in media_files:
+            pending[str(media_file)] = media_file
+            task_queue.put(str(media_file))
+        for _ in range(num_workers):
+            task_queue.put(None)
+        fed.set()
+
+    threading.Thread(target=feed, name="feed", daemon=True).start()
+
+    def start_worker(worker_id):
+        proc = ctx.Process(
+            target=_pool_worker,
+            args=(worker_id, task_queue, result_queue, options, num_threads),
+            daemon=True,
+        )
+        proc.start()
+        return proc
+
+    print(f"▶ 启动 {num_workers} 个工作进程，每个进程 {num_threads} 个线程")
+    workers = {wid: start_worker(wid) for wid in range(num_workers)}
+    current = {wid: None for wid in workers}
+    next_worker_id = num_workers
+    # 限制重启次数（不超过已分发的文件数 + 进程数），避免启动即崩溃时无限重启
+    restarts = 0
+
+    success, failed = [], []
+    started = 0
+
+    while pending or not fed.is_set():
+        try:
+            kind, wid, item, error = result_queue.get(timeout=1.0)
+        except queue.Empty:
+            kind = None
+
+        if kind == "start":
+            current[wid] = item
+            started += 1
+            record_start(args, item)
+            print(
+                f"\n[{started}/{total_label(media_files)}] "
+                f"工作进程 #{wid} 开始处理: {Path(item).name}"
+            )
+        elif kind == "done":
+            current[wid] = None
+            media_file = pending.pop(item, None)
+            if media_file is None:
+                continue
+            record_finish(args, media_file, error)
+            if error is None:
+                success.append(media_file)
+                print(f"  ✓ 工作进程 #{wid} 完成: {media_file.name}")
+            else:
+                failed.append(media_file)
+                print(f"  ✗ 处理失败 ({error}): {media_file.name}")
+            continue
+
+        # 检查崩溃的工作进程
+        for wid, proc in list(workers.items()):
+            if proc.is_alive():
+                continue
+            del workers[wid]
+            item = current.pop(wid, None)
+            if proc.exitcode == 0:
+                continue
+
+            print(f"  ✗ 工作进程 #{wid} 异常退出 (exit code {proc.exitcode})")
+            media_file = pending.pop(item, None) if item else None
+            if media_file is not None:
+                failed.append(media_file)
+                record_finish(args, media_file, "工作进程崩溃")
+                print(f"  ✗ 处理失败 (工作进程崩溃): {media_file.name}")
+            fed_total = len(success) + len(failed) + len(pending)
+            if (pending or not fed.is_set()) and restarts < fed_total + num_workers:
+                restarts += 1
+                workers[next_worker_id] = start_worker(next_worker_id)
+                current[next_worker_id] = None
+                next_worker_id += 1
+
+        if not workers and (pending or not fed.is_set()):
+            print("✗ 所有工作进程均已退出，剩余文件记为失败")
+            failed.extend(list(pending.values()))
+            pending.clear()
+            break
+
+    for proc in workers.values():
+        proc.join(timeout=5)
+        if proc.is_alive():
+            proc.terminate()
+
+    return success, failed
+
+
+def report_metrics(metrics_out, since):
+    """汇总本次运行写入的各阶段耗时记录，打印并保存到 <metrics_out>.summary.json"""
+    import json
+
+    import stage_metrics
+
+    records = stage_metrics.load_records(metrics_out, since=since)
+    if not records:
+        print(f"⚠ 未找到本次运行的耗时记录: {metrics_out}")
+        return
+
+    summary = stage_metrics.summarize(records)
+    stage_metrics.print_summary(summary)
+    summary_file = f"{metrics_out}.summary.json"
+    with open(summary_file, "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    print(f"  汇总已保存到: {summary_file}")
+
+
+def write_dataset(media_files, output_format, dataset_dir):
+    """
+    把各文件的列式转录结果写入一个 hive 分区的 Parquet 数据集
+    （dataset_dir/model=.../language=.../），重复运行时覆盖对应文件的分片
+    """
+    from transcript_columnar import (
+        dataset_fragments,
+        read_table,
+        write_dataset_fragment,
+    )
+
+    print(f"\n▶ 写入分区数据集: {dataset_dir}")
+    rows, written = 0, 0
+    # 已有分片只遍历一次，不必每个文件遍历整个数据集目录树
+    fragments = dataset_fragments(dataset_dir)
+    for media_file in media_files:
+        try:
+            table = read_table(output_path(media_file, output_format))
+            write_dataset_fragment(table, dataset_dir, media_file, fragments)
+        except Exception as e:
+            print(f"  ⚠ 写入数据集失败 ({e}): {media_file.name}")
+            continue
+        rows += table.num_rows
+        written += 1
+    print(f"  ✓ {written} 个文件，共 {rows} 条分段")
+
+
+def update_transcript_index(args):
+    """转录结束后增量更新全文检索索引（只导入新增或修改过的转录文件）"""
+    from transcript_index import update_index
+
+    try:
+        update_index(args.index, args.directory, recursive=args.recursive)
+    except Exception as e:
+        print(f"  ⚠ 更新检索索引失败: {e}")
+
+
+def build_parser():
+    """构建命令行参数解析器"""
     parser = argparse.ArgumentParser(
         description="批量遍历目录，对所有音视频文件调用 audio_to_text.py 转录",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -108,6 +801,49 @@ def main():
   # 跳过已存在 CSV 的文件（断点续传模式）
   python batch_transcribe.py D:\\recordings --skip-existing
 
+  # 进程内转录，模型只加载一次（大量短音频时明显更快）
+  python batch_transcribe.py D:\\recordings --in-process
+
+  # 4 个工作进程并行，每个进程 8 个线程（32 核 CPU）
+  python batch_transcribe.py D:\\recordings --workers 4 --threads-per-worker 8
+
+  # 大量语音消息/短视频：30 秒以内的短音频每 16 个一批同时解码
+  python batch_transcribe.py D:\\voice_messages --batch-size 16
+
+  # 启用转录缓存：被复制/改名/重新封装的相同录音不再重复转录
+  python batch_transcribe.py D:\\recordings --in-process --cache-dir D:\\transcript_cache
+
+  # CPU 节点使用 CTranslate2 int8 引擎（需 pip install faster-whisper）
+  python batch_transcribe.py D:\\recordings --workers 4 --engine ctranslate2
+
+  # 记录每个文件各阶段耗时，结束时汇总各阶段 p50/p90/p99
+  python batch_transcribe.py D:\\recordings --workers 4 --metrics-out metrics.jsonl
+
+  # 每个文件输出 Parquet，并把整个目录汇总为按模型/语言分区的数据集（需 pip install pyarrow）
+  python batch_transcribe.py D:\\recordings --workers 4 --output-format parquet --dataset D:\\transcripts
+
+  # 4 个工作进程，最长的文件先处理（默认），显示预计剩余时间；或最短优先尽早得到结果
+  python batch_transcribe.py D:\\recordings --workers 4
+  python batch_transcribe.py D:\\recordings --in-process --order shortest
+
+  # 会议录音：跳过静音部分，只转录检测到的语音
+  python batch_transcribe.py D:\\meetings --in-process --vad
+
+  # 视频较多的目录：转录当前文件时提前解码后面 4 个文件，预取内存不超过 2GB
+  python batch_transcribe.py D:\\videos --in-process --prefetch 4 --prefetch-mb 2048
+
+  # 超大目录树（NAS）：任务清单记录每个文件的大小/修改时间/状态，边扫描边转录，
+  # 重复运行时只处理新增、修改过或失败待重试的文件
+  python batch_transcribe.py \\\\nas\\media -r --workers 4 --manifest D:\\jobs.sqlite3
+
+  # 常驻监视目录：模型只加载一次，新文件复制完成（5 秒内大小不再变化）后立即转录
+  # 有 watchdog 时使用文件事件（pip install watchdog），否则定期扫描；网络共享上加 --poll
+  python batch_transcribe.py D:\\inbox -r --watch
+  python batch_transcribe.py \\\\nas\\inbox -r --watch --poll --workers 2 --manifest D:\\jobs.sqlite3
+
+  # 转录结束后更新全文检索索引，再用 transcript_index.py search 查找短语
+  python batch_transcribe.py D:\\recordings -r --in-process --index D:\\transcripts.sqlite3
+
 支持的格式:
   音频: mp3 wav m4a flac ogg webm aac wma
   视频: mp4 mkv avi mov wmv flv ts m4v
@@ -143,21 +879,190 @@ def main():
     parser.add_argument(
         "--skip-existing",
         action="store_true",
-        help="跳过已存在对应 CSV 文件的音视频（断点续传）",
+        help="跳过已存在对应输出文件的音视频（断点续传）",
     )
     parser.add_argument(
         "--no-force-simplified",
         action="store_true",
         help="禁用繁简转换，保留原始输出",
     )
+    parser.add_argument(
+        "--in-process",
+        action="store_true",
+        help="在当前进程内转录，模型只加载一次（默认每个文件启动一个子进程）",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="常驻工作进程数，每个进程持有一份模型并行转录",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="30 秒以内的短音频跨文件批量解码的批大小（进程内运行，仅 whisper 引擎）",
+    )
+    parser.add_argument(
+        "--threads-per-worker",
+        type=int,
+        default=None,
+        help="每个工作进程的 torch 线程数 (默认: CPU 核心数 / 进程数)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        help="转录缓存目录，内容相同的音频直接复用之前的转录结果",
+    )
+    parser.add_argument(
+        "--audio-cache",
+        help="解码音频缓存目录，已解码的 PCM 以 .npy 保存并内存映射复用",
+    )
+    parser.add_argument(
+        "--engine",
+        default="whisper",
+        choices=["whisper", "ctranslate2"],
+        help="推理引擎 (whisper=openai-whisper, ctranslate2=faster-whisper int8, 默认: whisper)",
+    )
+    parser.add_argument(
+        "--quantize",
+        action="store_true",
+        help="CPU 上使用动态 int8 量化模型（仅 whisper 引擎，量化结果缓存到模型目录）",
+    )
+    parser.add_argument(
+        "--metrics-out",
+        help="各阶段耗时统计输出文件（JSON Lines），结束时汇总到 <文件>.summary.json",
+    )
+    parser.add_argument(
+        "--output-format",
+        default="csv",
+        choices=OUTPUT_FORMATS,
+        help="每个文件的输出格式 (csv, parquet, arrow, 默认: csv)",
+    )
+    parser.add_argument(
+        "--dataset",
+        metavar="DIR",
+        help="把所有文件的转录结果汇总为按模型/语言分区的 Parquet 数据集（需要列式输出）",
+    )
+    parser.add_argument(
+        "--vad",
+        nargs="?",
+        const="energy",
+        choices=VAD_METHODS,
+        help="推理前检测语音区间，只转录有语音的部分 (energy 或 silero，只写 --vad 时为 energy；"
+        "--batch-size 分批解码的短音频不做检测)",
+    )
+    parser.add_argument(
+        "--prefetch",
+        type=int,
+        default=DEFAULT_PREFETCH_FILES,
+        metavar="N",
+        help=f"进程内/批量解码模式下提前解码的文件数，0 为不预取 (默认: {DEFAULT_PREFETCH_FILES})",
+    )
+    parser.add_argument(
+        "--prefetch-mb",
+        type=int,
+        default=DEFAULT_PREFETCH_MB,
+        help=f"预取音频的内存上限（MB，16kHz 音频每小时约 220MB，默认: {DEFAULT_PREFETCH_MB}）",
+    )
+    parser.add_argument(
+        "--order",
+        default="auto",
+        choices=["auto", "name", "longest", "shortest"],
+        help="处理顺序 (auto=多个工作进程时最长优先，否则按文件名；shortest=最短优先，尽早得到结果)",
+    )
+    parser.add_argument(
+        "--no-probe",
+        action="store_true",
+        help="不探测媒体时长（不排序、不估计剩余时间）",
+    )
+    parser.add_argument(
+        "--history",
+        default=str(DEFAULT_HISTORY),
+        help=f"吞吐量历史记录文件（JSON Lines，用于预计耗时，默认: {DEFAULT_HISTORY}）",
+    )
+    parser.add_argument(
+        "--no-history",
+        dest="history",
+        action="store_const",
+        const=None,
+        help="不读取也不写入吞吐量历史记录",
+    )
+    parser.add_argument(
+        "--manifest",
+        metavar="DB",
+        help="任务清单（SQLite）：边扫描边处理，重复运行时只处理新增、修改过或失败待重试的文件",
+    )
+    parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=DEFAULT_MAX_ATTEMPTS,
+        help=f"使用任务清单时失败文件的最大尝试次数 (默认: {DEFAULT_MAX_ATTEMPTS})",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="常驻监视目录：模型只加载一次，新文件复制完成后立即转录（Ctrl+C 退出）",
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="监视模式下定期扫描目录，不使用文件事件（网络共享上推荐）",
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=DEFAULT_POLL_INTERVAL,
+        help=f"监视模式定期扫描的间隔（秒，默认: {DEFAULT_POLL_INTERVAL:g}）",
+    )
+    parser.add_argument(
+        "--settle-seconds",
+        type=float,
+        default=DEFAULT_SETTLE_SECONDS,
+        help=f"文件大小和修改时间保持不变多少秒后才开始转录（默认: {DEFAULT_SETTLE_SECONDS:g}）",
+    )
+    parser.add_argument(
+        "--queue-size",
+        type=int,
+        default=DEFAULT_QUEUE_SIZE,
+        help=f"监视模式工作队列容量（默认: {DEFAULT_QUEUE_SIZE}）",
+    )
+    parser.add_argument(
+        "--index",
+        metavar="DB",
+        help="转录结束后增量更新该全文检索索引（SQLite FTS5，见 transcript_index.py）",
+    )
+
+    return parser
+
+
+def prepare_run_state(args):
+    """
+    初始化运行状态（任务清单、探测的时长、进度估计），返回 args
 
-    args = parser.parse_args()
+    直接调用 run_batch / transcribe_* 的代码（例如基准测试）在解析参数后也需要调用
+    """
+    args.job_manifest = None
+    args.durations = None
+    args.progress = None
+    return args
+
+
+def main():
+    args = prepare_run_state(build_parser().parse_args())
+    if args.dataset and args.output_format == "csv":
+        print("⚠ --dataset 需要列式输出，每个文件改为输出 Parquet")
+        args.output_format = "parquet"
 
     # 检查 audio_to_text.py 是否存在
     if not TRANSCRIBE_SCRIPT.exists():
         print(f"✗ 找不到转录脚本: {TRANSCRIBE_SCRIPT}")
         return 1
 
+    if args.watch:
+        return run_watch(args)
+    if args.manifest:
+        return run_with_manifest(args)
+
     # 查找所有音视频文件
     try:
         media_files = find_media_files(args.directory, recursive=args.recursive)
@@ -171,53 +1076,202 @@ def main():
 
     print(f"✓ 找到 {len(media_files)} 个音视频文件")
 
-    # 过滤已有 CSV 的文件
+    # 过滤已有输出的文件（已转录的文件仍然写入数据集）
+    all_media_files = media_files
     if args.skip_existing:
-        skipped = [f for f in media_files if f.with_suffix(".csv").exists()]
-        media_files = [f for f in media_files if not f.with_suffix(".csv").exists()]
+        skipped = [f for f in media_files if output_path(f, args.output_format).exists()]
+        media_files = [f for f in media_files if f not in skipped]
         if skipped:
-            print(f"⚠ 跳过 {len(skipped)} 个已有 CSV 的文件:")
+            print(f"⚠ 跳过 {len(skipped)} 个已有输出的文件:")
             for f in skipped:
                 print(f"  - {f.name}")
+    finished = [f for f in media_files if is_transcribed(f, args.output_format)]
+    if finished:
+        media_files = [f for f in media_files if f not in finished]
+        print(f"✓ 跳过 {len(finished)} 个已转录完成的文件")
 
     if not media_files:
         print("\n✓ 所有文件均已转录完毕，无需重新处理")
+        if args.dataset:
+            write_dataset(all_media_files, args.output_format, args.dataset)
+        if args.index:
+            update_transcript_index(args)
         return 0
 
+    media_files = schedule(media_files, args)
     print(f"▶ 待处理: {len(media_files)} 个文件\n")
     for i, f in enumerate(media_files, 1):
-        print(f"  {i:>3}. {f.name}")
-
-    # 组装传递给子脚本的额外参数
-    extra_args = []
-    if args.no_force_simplified:
-        extra_args.append("--no-force-simplified")
+        duration = args.durations.get(f) if args.durations else None
+        suffix = f"  ({format_duration(duration)})" if duration else ""
+        print(f"  {i:>3}. {f.name}{suffix}")
 
     # 逐个处理
-    success, failed = [], []
-    total = len(media_files)
+    run_started = time.time()
+    success, failed = run_batch(media_files, args)
+    return finish_batch(args, success, failed, run_started, all_media_files)
 
-    for idx, media_file in enumerate(media_files, 1):
-        print(f"\n[{idx}/{total}] 开始处理...")
-        code = run_transcribe(
-            audio_file=media_file,
-            model=args.model,
-            language=args.language,
-            model_dir=args.model_dir,
-            extra_args=extra_args,
+
+def run_batch(media_files, args):
+    """按命令行选择的方式转录，返回 (成功列表, 失败列表)"""
+    if args.workers:
+        return transcribe_with_pool(media_files, args)
+    if args.batch_size:
+        return transcribe_batched(media_files, args)
+    if args.in_process:
+        return transcribe_in_process(media_files, args)
+    return transcribe_with_subprocess(media_files, args)
+
+
+def run_with_manifest(args):
+    """
+    使用任务清单：后台线程流式扫描目录，只有新增、修改过或需要重试的文件
+    进入处理队列，扫描未完成时即开始转录
+    """
+    directory = os.path.abspath(args.directory)
+    try:
+        entries = iter_media_files(directory, recursive=args.recursive)
+    except (FileNotFoundError, NotADirectoryError) as e:
+        print(f"✗ {e}")
+        return 1
+
+    with JobManifest(args.manifest, max_attempts=args.max_attempts) as manifest:
+        args.job_manifest = manifest
+
+        def has_output(media_file):
+            return output_path(media_file, args.output_format).exists()
+
+        print(f"▶ 边扫描边处理（任务清单: {args.manifest}）")
+
+        run_started = time.time()
+        feed = ScanFeed(entries, manifest, skip=has_output if args.skip_existing else None)
+        if resolve_order(args) in ("longest", "shortest"):
+            # 按时长排序需要先完成扫描；只探测排队的文件，时长已记录在清单中的不再探测
+            media_files = schedule(list(feed), args, known=manifest.durations())
+            if args.durations:
+                manifest.record_durations(args.durations)
+            success, failed = run_batch(media_files, args)
+        else:
+            success, failed = run_batch(feed, args)
+
+        print(f"\n✓ 扫描 {feed.scanned} 个音视频文件，处理 {feed.queued} 个", end="")
+        print(f"，跳过已有输出 {feed.skipped} 个" if feed.skipped else "")
+        counts = manifest.counts()
+        print(
+            "✓ 任务清单: "
+            + ", ".join(f"{status} {counts[status]}" for status in sorted(counts))
         )
-        if code == 0:
-            success.append(media_file)
+        done_files = [
+            Path(path)
+            for path in manifest.paths(status="done")
+            if path.startswith(os.path.join(directory, ""))
+        ]
+        return finish_batch(args, success, failed, run_started, done_files)
+
+
+def run_watch(args):
+    """
+    常驻监视目录：已有但未转录的文件先排队，之后新文件大小稳定后立即转录。
+    进程内转录（或 --workers 常驻工作进程池），模型只加载一次；Ctrl+C 退出
+    """
+    directory = os.path.abspath(args.directory)
+    if not os.path.isdir(directory):
+        print(f"✗ 路径不是目录: {directory}")
+        return 1
+    if args.batch_size:
+        print("⚠ 监视模式不支持 --batch-size，改为逐个进程内转录")
+    elif not (args.workers or args.in_process):
+        print("▶ 监视模式在当前进程内转录，模型只加载一次")
+
+    manifest = None
+    if args.manifest:
+        manifest = JobManifest(args.manifest, max_attempts=args.max_attempts)
+        args.job_manifest = manifest
+
+    def accept(media_file, st):
+        # 有任务清单时按清单判断，否则跳过已有输出文件的音视频
+        if manifest is not None:
+            return manifest.observe(media_file, st.st_size, st.st_mtime_ns)
+        return not output_path(media_file, args.output_format).exists()
+
+    watcher = FolderWatcher(
+        directory,
+        recursive=args.recursive,
+        accept=accept,
+        settle_seconds=args.settle_seconds,
+        poll_interval=args.poll_interval,
+        queue_size=args.queue_size,
+        poll=args.poll,
+        extensions=AUDIO_VIDEO_EXTENSIONS,
+        scan=iter_media_files,
+    )
+
+    if not args.workers:
+        # 先加载模型，第一个文件到达时只需推理
+        import audio_to_text
+
+        audio_to_text.load_model(
+            args.model, args.model_dir, engine=args.engine, quantize=args.quantize
+        )
+
+    watcher.start()
+    mode = "文件事件" if watcher.mode == "watchdog" else f"每 {args.poll_interval:g} 秒扫描"
+    print(
+        f"▶ 正在监视: {directory}（{mode}，文件 {args.settle_seconds:g} 秒内不再变化后开始转录，"
+        "Ctrl+C 退出）"
+    )
+    try:
+        if args.workers:
+            transcribe_with_pool(watcher, args)
         else:
-            failed.append(media_file)
-            print(f"  ✗ 处理失败 (exit code {code}): {media_file.name}")
+            transcribe_in_process(watcher, args)
+    except KeyboardInterrupt:
+        print("\n⚠ 已停止监视")
+    finally:
+        watcher.stop()
+        if manifest is not None:
+            manifest.close()
+    return 0
 
-    # 汇总报告
+
+def finish_batch(args, success, failed, run_started, all_media_files):
+    """打印汇总，写出耗时统计、数据集和检索索引，返回退出码"""
     print(f"\n{'='*70}")
     print(f"批量转录完成")
     print(f"  成功: {len(success)} 个")
     print(f"  失败: {len(failed)} 个")
 
+    if args.progress is not None and args.progress.success_audio > 0:
+        wall = time.time() - run_started
+        record = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            **run_config(args),
+            "files": len(success),
+            "failed": len(failed),
+            "audio_seconds": round(args.progress.success_audio, 3),
+            "wall_seconds": round(wall, 3),
+            "rtf": round(wall / args.progress.success_audio, 4),
+        }
+        print(
+            f"  音频: {format_duration(record['audio_seconds'])}，"
+            f"耗时: {format_duration(wall)}，实时率 {record['rtf']:.3f}"
+        )
+        if args.history:
+            append_history(args.history, record)
+
+    if args.metrics_out:
+        report_metrics(args.metrics_out, run_started)
+
+    if args.dataset:
+        done = [
+            f
+            for f in all_media_files
+            if f not in failed and output_path(f, args.output_format).exists()
+        ]
+        write_dataset(done, args.output_format, args.dataset)
+
+    if args.index:
+        update_transcript_index(args)
+
     if failed:
         print("\n失败文件列表:")
         for f in failed:
@@ -0,0 +1,130 @@
+"""
+跨文件批量解码 - 大量短音频（语音消息、短视频片段）一次性转录
+每个短音频补齐到 30 秒窗口后计算 mel 频谱，多个文件堆叠成一个批次，
+编码器和解码器按批次运行（whisper.decode），再从带时间戳的 token
+序列中切分出各文件的分段。结果字典与 model.transcribe 的结构相同
+"""
+
+import numpy as np
+
+from audio_cache import SAMPLE_RATE
+
+# 可以批量解码的最长音频（秒）：Whisper 单个窗口的长度
+MAX_CLIP_SECONDS = 30.0
+
+# 时间戳 token 的精度（秒）
+TIME_PRECISION = 0.02
+
+# 与 whisper.transcribe 相同的质量阈值：超出时改用逐个转录（带温度回退）
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+
+def tokens_to_segments(tokens, tokenizer, duration):
+    """
+    把带时间戳的 token 序列切分为分段
+
+    解码结果形如 <|0.00|> 文本 <|2.40|><|2.40|> 文本 <|5.00|>，
+    最后一段缺少结束时间戳时以音频时长作为结束时间；
+    完全没有时间戳时整段作为一个分段
+    """
+    segments = []
+    start, text_tokens = None, []
+
+    def close(end):
+        text = tokenizer.decode(text_tokens)
+        if text.strip():
+            seg_start = start if start is not None else 0.0
+            segments.append(
+                {
+                    "id": len(segments),
+                    "start": round(min(seg_start, duration), 3),
+                    "end": round(min(max(end, seg_start), duration), 3),
+                    "text": text,
+                    "tokens": list(text_tokens),
+                }
+            )
+
+    for token in tokens:
+        if token >= tokenizer.timestamp_begin:
+            t = (token - tokenizer.timestamp_begin) * TIME_PRECISION
+            if text_tokens:
+                close(t)
+                text_tokens = []
+            # 结束时间戳同时作为下一段的默认起点（其后紧跟的起始时间戳会覆盖它）
+            start = t
+        elif token < tokenizer.eot:
+            text_tokens.append(token)
+
+    if text_tokens:
+        close(duration)
+    return segments
+
+
+def decode_batch(model, audios, language=None, initial_prompt=None):
+    """
+    批量转录多个不超过 30 秒的音频
+
+    Args:
+        model: openai-whisper 模型（whisper.model.Whisper，可为动态量化后的模型）
+        audios: 16kHz 单声道 float32 音频列表
+        language: 语言代码，None 时每个音频分别检测
+        initial_prompt: 提示词（可选）
+
+    Returns:
+        list: 与 audios 一一对应的结果字典（text / segments / language）；
+        质量不达标（重复、低置信度）需要逐个重新转录的位置为 None
+    """
+    import torch
+    import whisper
+
+    fp16 = model.device.type == "cuda"
+    mels = torch.stack(
+        [
+            whisper.log_mel_spectrogram(
+                whisper.pad_or_trim(np.asarray(audio, dtype=np.float32)),
+                n_mels=model.dims.n_mels,
+            )
+            for audio in audios
+        ]
+    ).to(model.device)
+
+    options = whisper.DecodingOptions(
+        language=language, prompt=initial_prompt, fp16=fp16, without_timestamps=False
+    )
+    decoded = whisper.decode(model, mels, options)
+
+    results = []
+    for audio, result in zip(audios, decoded):
+        silent = (
+            result.no_speech_prob > NO_SPEECH_THRESHOLD
+            and result.avg_logprob < LOGPROB_THRESHOLD
+        )
+        if silent:
+            results.append({"text": "", "segments": [], "language": result.language})
+            continue
+        if (
+            result.compression_ratio > COMPRESSION_RATIO_THRESHOLD
+            or result.avg_logprob < LOGPROB_THRESHOLD
+        ):
+            results.append(None)
+            continue
+
+        tokenizer = whisper.tokenizer.get_tokenizer(
+            model.is_multilingual,
+            num_languages=model.num_languages,
+            language=result.language,
+            task="transcribe",
+        )
+        segments = tokens_to_segments(
+            result.tokens, tokenizer, len(audio) / SAMPLE_RATE
+        )
+        results.append(
+            {
+                "text": "".join(seg["text"] for seg in segments),
+                "segments": segments,
+                "language": result.language,
+            }
+        )
+    return results
@@ -0,0 +1,89 @@
+"""
+短音频跨文件批量解码吞吐量基准测试
+合成一批确定性的短音频（默认 64 个 5-25 秒的片段），分别以不同批大小调用
+batched_decode.decode_batch，记录每秒处理的文件数和音频小时/墙钟小时；
+批大小 1 相当于逐个文件运行编码器和解码器
+
+使用方法:
+    python benchmarks/bench_batched.py -m tiny
+    python benchmarks/bench_batched.py -m base --clips 128 --batch-sizes 1 8 16 32
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+import numpy as np  # noqa: E402
+
+import audio_to_text  # noqa: E402
+import batched_decode  # noqa: E402
+from fixtures import synthesize  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="短音频跨文件批量解码吞吐量基准测试")
+    parser.add_argument("-m", "--model", default="tiny", help="Whisper 模型大小 (默认: tiny)")
+    parser.add_argument("-d", "--model-dir", help="模型存储目录")
+    parser.add_argument("-l", "--language", default="zh", help="语言代码 (默认: zh)")
+    parser.add_argument("--clips", type=int, default=64, help="短音频数量 (默认: 64)")
+    parser.add_argument(
+        "--batch-sizes", type=int, nargs="+", default=[1, 4, 8, 16], help="要测试的批大小"
+    )
+    parser.add_argument("--quantize", action="store_true", help="使用动态 int8 量化模型")
+    parser.add_argument("--json", help="将结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    clips = [synthesize(rng.uniform(5, 25), seed=i) for i in range(args.clips)]
+    audio_hours = sum(len(c) for c in clips) / audio_to_text.SAMPLE_RATE / 3600
+    print(f"✓ 合成 {len(clips)} 个短音频，共 {audio_hours * 60:.1f} 分钟")
+
+    model = audio_to_text.load_model(
+        args.model, args.model_dir, quantize=args.quantize
+    ).model
+    language = None if args.language == "auto" else args.language
+
+    # 预热一次，排除首次运行的初始化开销
+    batched_decode.decode_batch(model, clips[:1], language)
+
+    results = []
+    for batch_size in args.batch_sizes:
+        fallbacks = 0
+        start = time.perf_counter()
+        for i in range(0, len(clips), batch_size):
+            decoded = batched_decode.decode_batch(model, clips[i : i + batch_size], language)
+            fallbacks += sum(1 for r in decoded if r is None)
+        wall = time.perf_counter() - start
+
+        result = {
+            "batch_size": batch_size,
+            "wall_seconds": round(wall, 2),
+            "files_per_second": round(len(clips) / wall, 3),
+            "audio_hours_per_wall_hour": round(audio_hours / (wall / 3600), 2),
+            "fallbacks": fallbacks,
+        }
+        results.append(result)
+        print(
+            f"  批大小 {batch_size:>3}: {wall:7.1f} 秒  {result['files_per_second']:.2f} 文件/秒  "
+            f"吞吐 {result['audio_hours_per_wall_hour']:.1f}x  需回退 {fallbacks} 个"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(
+                {"model": args.model, "clips": args.clips, "results": results},
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+        print(f"✓ 结果已保存到: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,126 @@
+"""
+单文件并行分块转录基准测试
+对同一个长音频分别运行顺序转录和 N 进程并行分块转录，
+比较耗时（加速比）以及以顺序结果为参考的词/字错误率差异
+
+使用方法:
+    python benchmarks/bench_chunked.py meeting.mp4 -m base -l zh
+    python benchmarks/bench_chunked.py meeting.mp4 --workers 2 4 8 --chunk-seconds 300 --json result.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import audio_to_text  # noqa: E402
+import chunked_transcribe  # noqa: E402
+from bench_utils import error_rate  # noqa: E402
+
+
+def build_options(language):
+    """与 audio_to_text.transcribe_audio 相同的转录选项"""
+    options = {"verbose": False}
+    if language != "auto":
+        options["language"] = language
+    if language == "zh":
+        options["initial_prompt"] = "以下是简体中文的转录内容："
+    return options
+
+
+def joined_text(result):
+    return " ".join(seg["text"].strip() for seg in result["segments"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="并行分块转录基准测试")
+    parser.add_argument("audio_file", help="基准测试用的长音频")
+    parser.add_argument("-m", "--model", default="base", help="Whisper 模型 (默认: base)")
+    parser.add_argument("-l", "--language", default="zh", help="语言代码 (默认: zh)")
+    parser.add_argument("-d", "--model-dir", help="模型存储目录")
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=[2, 4], help="并行进程数 (默认: 2 4)"
+    )
+    parser.add_argument(
+        "--chunk-seconds", type=float, default=300.0, help="目标窗口长度（秒，默认: 300）"
+    )
+    parser.add_argument("--json", help="将结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    audio = audio_to_text.load_audio(args.audio_file)
+    audio_seconds = len(audio) / audio_to_text.SAMPLE_RATE
+    options = build_options(args.language)
+    print(f"✓ 音频时长: {audio_seconds / 60:.1f} 分钟")
+
+    # 顺序转录（参考结果），与并行模式一样把模型加载排除在计时之外
+    model = audio_to_text.load_model(args.model, args.model_dir)
+    start = time.perf_counter()
+    reference = model.transcribe(audio, **options)
+    sequential_seconds = time.perf_counter() - start
+    reference_text = joined_text(reference)
+    print(f"✓ 顺序转录耗时: {sequential_seconds:.1f} 秒")
+
+    results = [
+        {
+            "mode": "sequential",
+            "workers": 1,
+            "wall_seconds": round(sequential_seconds, 2),
+            "speedup": 1.0,
+            "error_rate_vs_sequential": 0.0,
+            "segments": len(reference["segments"]),
+        }
+    ]
+    for workers in args.workers:
+        start = time.perf_counter()
+        result = chunked_transcribe.transcribe_parallel(
+            audio,
+            options,
+            args.model,
+            args.model_dir,
+            workers=workers,
+            chunk_seconds=args.chunk_seconds,
+        )
+        # 包含工作进程启动和模型加载时间，反映实际使用时的收益
+        elapsed = time.perf_counter() - start
+        results.append(
+            {
+                "mode": "parallel",
+                "workers": workers,
+                "wall_seconds": round(elapsed, 2),
+                "speedup": round(sequential_seconds / elapsed, 2),
+                "error_rate_vs_sequential": round(
+                    error_rate(reference_text, joined_text(result)), 4
+                ),
+                "segments": len(result["segments"]),
+            }
+        )
+
+    print(f"\n{'模式':<12}{'进程数':>6}{'耗时(秒)':>10}{'加速比':>8}{'错误率差异':>12}")
+    for r in results:
+        print(
+            f"{r['mode']:<12}{r['workers']:>6}{r['wall_seconds']:>10.1f}"
+            f"{r['speedup']:>8.2f}{r['error_rate_vs_sequential']:>12.2%}"
+        )
+
+    if args.json:
+        report = {
+            "audio_file": os.path.basename(args.audio_file),
+            "audio_seconds": round(audio_seconds, 2),
+            "model": args.model,
+            "language": args.language,
+            "chunk_seconds": args.chunk_seconds,
+            "results": results,
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n✓ 结果已保存到: {args.json}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
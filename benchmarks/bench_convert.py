@@ -0,0 +1,130 @@
+"""
+繁体转简体转换基准测试
+合成确定性的大型转录（默认 50000 个分段：繁简混排的句子、词典中的词组，
+约 20% 为“嗯”“謝謝”之类的重复短句），比较原来的逐段 OpenCC("t2s").convert
+与 text_convert.convert_texts（预编译词典 + 批量 + 重复句子只转换一次）的耗时，
+并检查两者输出完全一致
+
+需要安装 opencc-python-reimplemented
+
+使用方法:
+    python benchmarks/bench_convert.py
+    python benchmarks/bench_convert.py --segments 200000 --repeat-ratio 0.4
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+import numpy as np  # noqa: E402
+
+import text_convert  # noqa: E402
+
+# 常见的简体字（不需要转换的部分）与重复短句
+_COMMON = "的一是不了人我在有他这个们中来上大为和国地到以说时要就出会可也你对生能而子那得于着下自之年过发后作里"
+_FILLERS = ["嗯", "謝謝", "好的", "對", "是的", "謝謝大家", "然後呢", "我們繼續"]
+_PUNCTUATION = "，。？！、 "
+
+
+def synthesize_transcript(segments, repeat_ratio=0.2, seed=0):
+    """合成分段文本列表"""
+    import opencc
+
+    dictionary_dir = Path(opencc.__file__).parent / "dictionary"
+    characters = [
+        line.split("\t")[0]
+        for line in open(dictionary_dir / "TSCharacters.txt", encoding="utf-8")
+    ]
+    phrases = [
+        line.split("\t")[0]
+        for line in open(dictionary_dir / "TSPhrases.txt", encoding="utf-8")
+    ]
+
+    rng = np.random.default_rng(seed)
+    texts = []
+    for _ in range(segments):
+        if rng.random() < repeat_ratio:
+            texts.append(_FILLERS[rng.integers(len(_FILLERS))])
+            continue
+        parts = []
+        for _ in range(rng.integers(8, 40)):
+            roll = rng.random()
+            if roll < 0.55:
+                parts.append(_COMMON[rng.integers(len(_COMMON))])
+            elif roll < 0.9:
+                parts.append(characters[rng.integers(len(characters))])
+            elif roll < 0.93:
+                parts.append(phrases[rng.integers(len(phrases))])
+            else:
+                parts.append(_PUNCTUATION[rng.integers(len(_PUNCTUATION))])
+        texts.append("".join(parts))
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="繁体转简体转换基准测试")
+    parser.add_argument("--segments", type=int, default=50000, help="分段数 (默认: 50000)")
+    parser.add_argument(
+        "--repeat-ratio", type=float, default=0.2, help="重复短句的比例 (默认: 0.2)"
+    )
+    parser.add_argument("--json", help="将结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    try:
+        from opencc import OpenCC
+    except ImportError:
+        print("✗ 未安装 opencc-python-reimplemented: pip install opencc-python-reimplemented")
+        return 1
+
+    texts = synthesize_transcript(args.segments, args.repeat_ratio)
+    chars = sum(len(t) for t in texts)
+    print(f"✓ 合成 {len(texts)} 个分段，共 {chars} 字，其中 {len(set(texts))} 个不重复")
+
+    # 原来的路径：逐段调用 OpenCC("t2s").convert
+    start = time.perf_counter()
+    converter = OpenCC("t2s")
+    baseline = [converter.convert(text) for text in texts]
+    baseline_seconds = time.perf_counter() - start
+
+    # 新路径：首次调用包含词典编译
+    start = time.perf_counter()
+    compiled = text_convert.convert_texts(texts)
+    cold_seconds = time.perf_counter() - start
+
+    # 词典已编译、结果缓存为空（例如批量处理中的下一个文件）
+    text_convert.get_converter().cache_clear()
+    start = time.perf_counter()
+    text_convert.convert_texts(texts)
+    warm_seconds = time.perf_counter() - start
+
+    identical = compiled == baseline
+    result = {
+        "segments": len(texts),
+        "chars": chars,
+        "unique_segments": len(set(texts)),
+        "per_segment_opencc_seconds": round(baseline_seconds, 3),
+        "batch_cold_seconds": round(cold_seconds, 3),
+        "batch_warm_seconds": round(warm_seconds, 3),
+        "speedup_cold": round(baseline_seconds / max(cold_seconds, 1e-9), 1),
+        "speedup_warm": round(baseline_seconds / max(warm_seconds, 1e-9), 1),
+        "identical": identical,
+    }
+    print(f"  逐段 OpenCC:        {baseline_seconds:8.3f} 秒")
+    print(f"  批量（含词典编译）: {cold_seconds:8.3f} 秒  加速 {result['speedup_cold']}x")
+    print(f"  批量（词典已编译）: {warm_seconds:8.3f} 秒  加速 {result['speedup_warm']}x")
+    print("  ✓ 输出一致" if identical else "  ✗ 输出不一致")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"✓ 结果已保存到: {args.json}")
+    return 0 if identical else 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,157 @@
+"""
+推理引擎对比基准测试
+在相同的确定性素材上分别用 openai-whisper 与 CTranslate2（faster-whisper）
+引擎转录，比较模型加载时间、实时率、峰值内存，以及与 whisper 引擎输出的
+字/词错误率差异
+
+每个 (引擎, 模型, 素材) 组合在独立子进程中运行（禁用 GPU），峰值内存互不影响
+
+使用方法:
+    python benchmarks/bench_engines.py -m tiny base
+    python benchmarks/bench_engines.py -m small --fixtures speech_2min --threads 8
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from bench_utils import error_rate  # noqa: E402
+from fixtures import DEFAULT_FIXTURES, ensure_fixtures  # noqa: E402
+
+DEFAULT_FIXTURE_DIR = BENCH_DIR / ".fixtures"
+
+
+def run_case(spec):
+    """在子进程中运行单个测试用例，返回指标字典"""
+    import audio_to_text
+    from stage_metrics import peak_rss_mb
+
+    # 转录过程的输出全部转到 stderr，stdout 只留给结果 JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        audio = audio_to_text.load_audio(spec["audio_file"])
+
+        start = time.perf_counter()
+        model = audio_to_text.load_model(spec["model"], engine=spec["engine"])
+        load_seconds = time.perf_counter() - start
+
+        options = {"verbose": False, "language": spec["language"]}
+        if spec["language"] == "zh":
+            options["initial_prompt"] = "以下是简体中文的转录内容："
+        start = time.perf_counter()
+        result = model.transcribe(audio, **options)
+        run_seconds = time.perf_counter() - start
+
+    return {
+        "load_seconds": round(load_seconds, 3),
+        "transcribe_seconds": round(run_seconds, 3),
+        "rtf": round(run_seconds / spec["audio_seconds"], 4),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "segments": len(result["segments"]),
+        "text": "".join(seg["text"] for seg in result["segments"]),
+    }
+
+
+def run_isolated(spec, threads):
+    """启动子进程（禁用 GPU、固定线程数）运行测试用例"""
+    env = dict(os.environ, CUDA_VISIBLE_DEVICES="")
+    if threads:
+        env["OMP_NUM_THREADS"] = str(threads)
+        env["MKL_NUM_THREADS"] = str(threads)
+    cmd = [sys.executable, str(Path(__file__).resolve()), "--worker", json.dumps(spec)]
+    proc = subprocess.run(cmd, capture_output=True, text=True, env=env)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "未知错误")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="推理引擎对比基准测试")
+    parser.add_argument("-m", "--models", nargs="+", default=["tiny", "base"], help="模型大小列表")
+    parser.add_argument(
+        "--engines",
+        nargs="+",
+        default=["whisper", "ctranslate2"],
+        choices=["whisper", "ctranslate2"],
+        help="要比较的引擎（第一个作为准确率参考）",
+    )
+    parser.add_argument("-l", "--language", default="zh", help="语言代码 (默认: zh)")
+    parser.add_argument(
+        "--fixtures",
+        nargs="+",
+        default=["speech_30s", "speech_2min"],
+        choices=list(DEFAULT_FIXTURES),
+        help="要运行的素材",
+    )
+    parser.add_argument("--threads", type=int, help="每个用例的线程数 (默认: 全部核心)")
+    parser.add_argument("--fixture-dir", default=str(DEFAULT_FIXTURE_DIR), help="素材缓存目录")
+    parser.add_argument("-o", "--output", default="engines_report.json", help="报告输出路径")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_case(json.loads(args.worker)), ensure_ascii=False))
+        return 0
+
+    fixtures = ensure_fixtures(
+        args.fixture_dir, {name: DEFAULT_FIXTURES[name] for name in args.fixtures}
+    )
+
+    results = []
+    for model in args.models:
+        for name, (path, seconds) in fixtures.items():
+            reference = None
+            for engine in args.engines:
+                print(f"▶ {engine} / {model} / {name} ...", flush=True)
+                spec = {
+                    "engine": engine,
+                    "model": model,
+                    "language": args.language,
+                    "audio_file": str(path),
+                    "audio_seconds": seconds,
+                }
+                try:
+                    metrics = run_isolated(spec, args.threads)
+                except Exception as e:
+                    print(f"  ✗ 失败: {e}")
+                    continue
+
+                text = metrics.pop("text")
+                if reference is None:
+                    reference = text
+                metrics["error_rate_vs_reference"] = round(error_rate(reference, text), 4)
+                results.append({"engine": engine, "model": model, "fixture": name, **metrics})
+                print(
+                    f"  加载 {metrics['load_seconds']:.1f}s  RTF {metrics['rtf']:.3f}  "
+                    f"峰值内存 {metrics['peak_rss_mb']:.0f} MB  "
+                    f"与参考差异 {metrics['error_rate_vs_reference']:.1%}"
+                )
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "threads": args.threads,
+            "language": args.language,
+            "reference_engine": args.engines[0],
+            "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n✓ 报告已保存到: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,113 @@
+"""
+音频预取基准测试
+用 ffmpeg 合成若干个带视频轨的 mp4（解码耗时接近实际视频文件），
+推理用按音频时长 sleep 的模拟模型代替（--rtf 为模拟的实时率），
+比较不预取（解码和推理串行）与 audio_prefetch.AudioPrefetcher 预取时的总耗时
+
+使用方法:
+    python benchmarks/bench_prefetch.py
+    python benchmarks/bench_prefetch.py --files 12 --seconds 120 --rtf 0.05 --prefetch 1 2 4
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from audio_cache import SAMPLE_RATE, decode_audio  # noqa: E402
+from audio_prefetch import AudioPrefetcher  # noqa: E402
+
+
+def synthesize_videos(directory, files, seconds):
+    """生成 files 个 seconds 秒的 mp4（320x240 测试画面 + 正弦波音轨）"""
+    paths = []
+    for i in range(files):
+        path = Path(directory) / f"clip{i:03d}.mp4"
+        subprocess.run(
+            [
+                "ffmpeg",
+                "-nostdin",
+                "-loglevel",
+                "error",
+                "-f",
+                "lavfi",
+                "-i",
+                f"testsrc=size=320x240:rate=25:duration={seconds}",
+                "-f",
+                "lavfi",
+                "-i",
+                f"sine=frequency={220 + 20 * i}:duration={seconds}",
+                "-shortest",
+                "-y",
+                str(path),
+            ],
+            check=True,
+        )
+        paths.append(path)
+    return paths
+
+
+def run(paths, rtf, prefetch):
+    """解码并“转录”全部文件，返回总耗时（秒）"""
+    start = time.perf_counter()
+    if prefetch:
+        items = AudioPrefetcher(paths, decode_audio, lookahead=prefetch)
+    else:
+        items = ((path, decode_audio(path), None) for path in paths)
+    for _, audio, error in items:
+        if error is not None:
+            raise error
+        time.sleep(len(audio) / SAMPLE_RATE * rtf)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="音频预取基准测试")
+    parser.add_argument("--files", type=int, default=8, help="文件数 (默认: 8)")
+    parser.add_argument("--seconds", type=int, default=60, help="每个文件时长 (默认: 60)")
+    parser.add_argument(
+        "--rtf", type=float, default=0.05, help="模拟推理的实时率 (默认: 0.05)"
+    )
+    parser.add_argument(
+        "--prefetch", type=int, nargs="+", default=[1, 2, 4], help="预取文件数"
+    )
+    parser.add_argument("--json", help="将结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = synthesize_videos(tmp, args.files, args.seconds)
+        print(f"✓ 合成 {args.files} 个 {args.seconds} 秒的视频")
+
+        baseline = run(paths, args.rtf, 0)
+        print(f"  不预取:     {baseline:8.2f} 秒")
+        result = {
+            "files": args.files,
+            "seconds": args.seconds,
+            "rtf": args.rtf,
+            "baseline_seconds": round(baseline, 3),
+            "prefetch": {},
+        }
+        for prefetch in args.prefetch:
+            elapsed = run(paths, args.rtf, prefetch)
+            speedup = baseline / max(elapsed, 1e-9)
+            result["prefetch"][prefetch] = {
+                "seconds": round(elapsed, 3),
+                "speedup": round(speedup, 2),
+            }
+            print(f"  预取 {prefetch} 个:  {elapsed:8.2f} 秒  加速 {speedup:.2f}x")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"✓ 结果已保存到: {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,201 @@
+"""
+动态 int8 量化的速度/准确率对比
+对每个模型大小分别用 fp32 与动态 int8 量化（--quantize）在 CPU 上转录相同的素材，
+比较加载时间、实时率、峰值内存和相对 fp32 输出的字/词错误率，
+并按给定阈值给出该模型大小是否值得开启量化的结论
+
+每个 (模型, 模式, 素材) 组合在独立子进程中运行（禁用 GPU）
+
+使用方法:
+    python benchmarks/bench_quantize.py -m tiny base small
+    python benchmarks/bench_quantize.py -m small medium --min-speedup 1.3 --max-error-rate 0.03
+    python benchmarks/bench_quantize.py -m base --reference reference.txt   # 同时与人工参考文本比较
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from bench_utils import error_rate  # noqa: E402
+from fixtures import DEFAULT_FIXTURES, ensure_fixtures  # noqa: E402
+
+DEFAULT_FIXTURE_DIR = BENCH_DIR / ".fixtures"
+
+
+def run_case(spec):
+    """在子进程中运行单个测试用例，返回指标字典"""
+    import audio_to_text
+    import engines
+    from stage_metrics import peak_rss_mb
+
+    with contextlib.redirect_stdout(sys.stderr):
+        audio = audio_to_text.load_audio(spec["audio_file"])
+        cached = engines.quantized_cache_path(spec["model"], spec["model_dir"]).exists()
+
+        start = time.perf_counter()
+        model = audio_to_text.load_model(
+            spec["model"], spec["model_dir"], quantize=spec["quantize"]
+        )
+        load_seconds = time.perf_counter() - start
+
+        options = {"verbose": False, "language": spec["language"]}
+        if spec["language"] == "zh":
+            options["initial_prompt"] = "以下是简体中文的转录内容："
+        start = time.perf_counter()
+        result = model.transcribe(audio, **options)
+        run_seconds = time.perf_counter() - start
+
+    return {
+        "load_seconds": round(load_seconds, 3),
+        "quantized_cache_hit": cached if spec["quantize"] else None,
+        "transcribe_seconds": round(run_seconds, 3),
+        "rtf": round(run_seconds / spec["audio_seconds"], 4),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "text": "".join(seg["text"] for seg in result["segments"]),
+    }
+
+
+def run_isolated(spec, threads):
+    """启动子进程（禁用 GPU、固定线程数）运行测试用例"""
+    env = dict(os.environ, CUDA_VISIBLE_DEVICES="")
+    if threads:
+        env["OMP_NUM_THREADS"] = str(threads)
+        env["MKL_NUM_THREADS"] = str(threads)
+    cmd = [sys.executable, str(Path(__file__).resolve()), "--worker", json.dumps(spec)]
+    proc = subprocess.run(cmd, capture_output=True, text=True, env=env)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "未知错误")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="动态 int8 量化速度/准确率对比")
+    parser.add_argument("-m", "--models", nargs="+", default=["tiny", "base"], help="模型大小列表")
+    parser.add_argument("-d", "--model-dir", help="模型目录（量化模型缓存也保存在这里）")
+    parser.add_argument("-l", "--language", default="zh", help="语言代码 (默认: zh)")
+    parser.add_argument(
+        "--fixtures",
+        nargs="+",
+        default=["speech_30s", "speech_2min"],
+        choices=list(DEFAULT_FIXTURES),
+        help="要运行的素材",
+    )
+    parser.add_argument(
+        "--reference", help="人工参考文本文件（可选，用于计算 fp32/int8 各自的绝对错误率）"
+    )
+    parser.add_argument("--threads", type=int, help="每个用例的线程数 (默认: 全部核心)")
+    parser.add_argument(
+        "--min-speedup", type=float, default=1.2, help="认为值得量化的最小加速比 (默认: 1.2)"
+    )
+    parser.add_argument(
+        "--max-error-rate",
+        type=float,
+        default=0.05,
+        help="int8 相对 fp32 输出允许的最大错误率 (默认: 0.05)",
+    )
+    parser.add_argument("--fixture-dir", default=str(DEFAULT_FIXTURE_DIR), help="素材缓存目录")
+    parser.add_argument("-o", "--output", default="quantize_report.json", help="报告输出路径")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_case(json.loads(args.worker)), ensure_ascii=False))
+        return 0
+
+    reference_text = None
+    if args.reference:
+        with open(args.reference, "r", encoding="utf-8") as f:
+            reference_text = f.read()
+
+    fixtures = ensure_fixtures(
+        args.fixture_dir, {name: DEFAULT_FIXTURES[name] for name in args.fixtures}
+    )
+
+    results, verdicts = [], {}
+    for model in args.models:
+        speedups, divergences = [], []
+        for name, (path, seconds) in fixtures.items():
+            pair = {}
+            for mode, quantize in (("fp32", False), ("int8", True)):
+                print(f"▶ {model} / {mode} / {name} ...", flush=True)
+                spec = {
+                    "model": model,
+                    "model_dir": args.model_dir,
+                    "quantize": quantize,
+                    "language": args.language,
+                    "audio_file": str(path),
+                    "audio_seconds": seconds,
+                }
+                try:
+                    pair[mode] = run_isolated(spec, args.threads)
+                except Exception as e:
+                    print(f"  ✗ 失败: {e}")
+            if len(pair) < 2:
+                continue
+
+            fp32, int8 = pair["fp32"], pair["int8"]
+            speedup = fp32["transcribe_seconds"] / max(int8["transcribe_seconds"], 1e-9)
+            divergence = error_rate(fp32["text"], int8["text"])
+            speedups.append(speedup)
+            divergences.append(divergence)
+            for mode, metrics in pair.items():
+                text = metrics.pop("text")
+                if reference_text is not None:
+                    metrics["error_rate_vs_reference"] = round(
+                        error_rate(reference_text, text), 4
+                    )
+                results.append({"model": model, "mode": mode, "fixture": name, **metrics})
+            print(
+                f"  加速比 {speedup:.2f}x  与 fp32 差异 {divergence:.1%}  "
+                f"内存 {fp32['peak_rss_mb']:.0f} -> {int8['peak_rss_mb']:.0f} MB"
+            )
+
+        if speedups:
+            mean_speedup = sum(speedups) / len(speedups)
+            max_divergence = max(divergences)
+            verdicts[model] = {
+                "mean_speedup": round(mean_speedup, 3),
+                "max_error_rate_vs_fp32": round(max_divergence, 4),
+                "recommended": mean_speedup >= args.min_speedup
+                and max_divergence <= args.max_error_rate,
+            }
+
+    print("\n结论:")
+    for model, verdict in verdicts.items():
+        mark = "✓ 建议开启 --quantize" if verdict["recommended"] else "✗ 不建议"
+        print(
+            f"  {model:<8} 平均加速 {verdict['mean_speedup']:.2f}x  "
+            f"最大差异 {verdict['max_error_rate_vs_fp32']:.1%}  {mark}"
+        )
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "threads": args.threads,
+            "language": args.language,
+            "min_speedup": args.min_speedup,
+            "max_error_rate": args.max_error_rate,
+            "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "results": results,
+        "verdicts": verdicts,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n✓ 报告已保存到: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,224 @@
+"""
+离线转录实时率（RTF）基准测试
+在 CPU 上对不同时长的确定性素材运行 audio_to_text.transcribe_audio
+和说话人识别流水线，记录实时率、峰值内存、模型加载时间和每秒分段数，
+写入 JSON 报告并与保存的基线比较，性能回退时以非零状态退出
+
+每个 (流水线, 模型, 素材) 组合在独立子进程中运行，峰值内存互不影响
+
+使用方法:
+    python benchmarks/bench_rtf.py -m tiny base
+    python benchmarks/bench_rtf.py -m tiny --fixtures speech_30s --pipelines plain diarize
+    python benchmarks/bench_rtf.py -m tiny base --update-baseline
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+from fixtures import DEFAULT_FIXTURES, ensure_fixtures  # noqa: E402
+
+DEFAULT_FIXTURE_DIR = BENCH_DIR / ".fixtures"
+DEFAULT_BASELINE = BENCH_DIR / "rtf_baseline.json"
+
+
+def peak_rss_mb():
+    """当前进程的峰值常驻内存（MB）"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def run_case(spec):
+    """在子进程中运行单个测试用例，返回指标字典"""
+    audio_file = spec["audio_file"]
+    output_file = os.path.join(spec["tmp_dir"], "out.csv")
+
+    # 转录过程的输出全部转到 stderr，stdout 只留给结果 JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        if spec["pipeline"] == "plain":
+            import audio_to_text
+
+            start = time.perf_counter()
+            audio_to_text.load_model(spec["model"])
+            load_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            result = audio_to_text.transcribe_audio(
+                audio_file,
+                model_name=spec["model"],
+                language=spec["language"],
+                output_file=output_file,
+            )
+            run_seconds = time.perf_counter() - start
+        else:
+            import audio_to_text_diarize
+
+            # 说话人识别流水线内部加载模型，加载时间包含在总耗时中
+            load_seconds = None
+            start = time.perf_counter()
+            result = audio_to_text_diarize.transcribe_with_diarization(
+                audio_file,
+                model_name=spec["model"],
+                language=spec["language"],
+                output_file=output_file,
+                hf_token=os.environ.get("HF_TOKEN"),
+            )
+            run_seconds = time.perf_counter() - start
+
+    segments = len(result.get("segments", []))
+    return {
+        "load_seconds": round(load_seconds, 3) if load_seconds is not None else None,
+        "transcribe_seconds": round(run_seconds, 3),
+        "rtf": round(run_seconds / spec["audio_seconds"], 4),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "segments": segments,
+        "segments_per_sec": round(segments / run_seconds, 3) if run_seconds else 0.0,
+    }
+
+
+def run_isolated(spec):
+    """启动子进程（禁用 GPU）运行测试用例"""
+    env = dict(os.environ, CUDA_VISIBLE_DEVICES="")
+    cmd = [sys.executable, str(Path(__file__).resolve()), "--worker", json.dumps(spec)]
+    proc = subprocess.run(cmd, capture_output=True, text=True, env=env)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "未知错误")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def case_key(result):
+    return (result["pipeline"], result["model"], result["fixture"])
+
+
+def compare(results, baseline, tolerance):
+    """与基线比较，返回回退项描述列表"""
+    base = {case_key(r): r for r in baseline.get("results", [])}
+    regressions = []
+    for r in results:
+        old = base.get(case_key(r))
+        if old is None:
+            continue
+        for metric in ("rtf", "peak_rss_mb"):
+            if old.get(metric) and r[metric] > old[metric] * (1 + tolerance):
+                change = r[metric] / old[metric] - 1
+                regressions.append(
+                    f"{'/'.join(case_key(r))} {metric}: "
+                    f"{old[metric]} -> {r[metric]} (+{change:.0%})"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线转录实时率基准测试")
+    parser.add_argument("-m", "--models", nargs="+", default=["tiny", "base"], help="模型大小列表")
+    parser.add_argument("-l", "--language", default="zh", help="语言代码 (默认: zh)")
+    parser.add_argument(
+        "--fixtures",
+        nargs="+",
+        default=list(DEFAULT_FIXTURES),
+        choices=list(DEFAULT_FIXTURES),
+        help="要运行的素材",
+    )
+    parser.add_argument(
+        "--pipelines",
+        nargs="+",
+        default=["plain"],
+        choices=["plain", "diarize"],
+        help="要测试的流水线 (diarize 需要安装 whisperx，说话人分离需 HF_TOKEN)",
+    )
+    parser.add_argument("--fixture-dir", default=str(DEFAULT_FIXTURE_DIR), help="素材缓存目录")
+    parser.add_argument("-o", "--output", default="rtf_report.json", help="报告输出路径")
+    parser.add_argument("--baseline", default=str(DEFAULT_BASELINE), help="基线文件路径")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.15, help="允许的回退比例 (默认: 0.15)"
+    )
+    parser.add_argument("--update-baseline", action="store_true", help="用本次结果覆盖基线")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_case(json.loads(args.worker))))
+        return 0
+
+    fixtures = ensure_fixtures(
+        args.fixture_dir, {name: DEFAULT_FIXTURES[name] for name in args.fixtures}
+    )
+
+    results = []
+    for pipeline in args.pipelines:
+        for model in args.models:
+            for name, (path, seconds) in fixtures.items():
+                print(f"▶ {pipeline} / {model} / {name} ...", flush=True)
+                with tempfile.TemporaryDirectory(prefix="bench_rtf_") as tmp:
+                    spec = {
+                        "pipeline": pipeline,
+                        "model": model,
+                        "language": args.language,
+                        "audio_file": str(path),
+                        "audio_seconds": seconds,
+                        "tmp_dir": tmp,
+                    }
+                    try:
+                        metrics = run_isolated(spec)
+                    except Exception as e:
+                        print(f"  ✗ 失败: {e}")
+                        continue
+                results.append(
+                    {"pipeline": pipeline, "model": model, "fixture": name, **metrics}
+                )
+                print(
+                    f"  RTF {metrics['rtf']:.3f}  峰值内存 {metrics['peak_rss_mb']:.0f} MB  "
+                    f"分段/秒 {metrics['segments_per_sec']:.2f}"
+                )
+
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "language": args.language,
+            "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n✓ 报告已保存到: {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"✓ 基线已更新: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("⚠ 未找到基线文件，跳过回退检查（使用 --update-baseline 生成）")
+        return 0
+
+    with open(args.baseline, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n✗ 发现 {len(regressions)} 项性能回退:")
+        for line in regressions:
+            print(f"  - {line}")
+        return 1
+
+    print("✓ 与基线相比无性能回退")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,118 @@
+"""
+目录扫描基准测试
+在临时目录中合成确定性的大型目录树（默认 100000 个文件，其中约 20% 为音视频，
+其余为转录结果、图片等），比较原来的 Path.glob("**/*") + is_file() 扫描与
+batch_transcribe.iter_media_files（os.scandir 流式遍历）的耗时，
+以及使用任务清单时首次运行和重复运行（全部已完成）的扫描耗时
+
+使用方法:
+    python benchmarks/bench_scan.py
+    python benchmarks/bench_scan.py --files 300000 --fanout 50
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+import numpy as np  # noqa: E402
+
+import batch_transcribe  # noqa: E402
+from job_manifest import JobManifest, ScanFeed  # noqa: E402
+
+_MEDIA = [".mp3", ".wav", ".mp4", ".m4a"]
+_OTHER = [".csv", ".jpg", ".txt", ".json", ".nfo"]
+
+
+def synthesize_tree(root, files, fanout=30, seed=0):
+    """在 root 下生成 files 个空文件，分布在两层目录中"""
+    rng = np.random.default_rng(seed)
+    for i in range(files):
+        top, sub = rng.integers(fanout), rng.integers(fanout)
+        directory = Path(root) / f"d{top:03d}" / f"s{sub:03d}"
+        directory.mkdir(parents=True, exist_ok=True)
+        suffixes = _MEDIA if rng.random() < 0.2 else _OTHER
+        (directory / f"f{i:07d}{suffixes[rng.integers(len(suffixes))]}").touch()
+
+
+def glob_scan(directory):
+    """原来的扫描方式"""
+    return sorted(
+        f
+        for f in Path(directory).glob("**/*")
+        if f.is_file() and f.suffix.lower() in batch_transcribe.AUDIO_VIDEO_EXTENSIONS
+    )
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def manifest_scan(directory, db_path):
+    """使用任务清单扫描，返回需要处理的文件数"""
+    with JobManifest(db_path) as manifest:
+        feed = ScanFeed(batch_transcribe.iter_media_files(directory, True), manifest)
+        queued = list(feed)
+        for path in queued:
+            manifest.start(path)
+            manifest.finish(path)
+    return len(queued)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="目录扫描基准测试")
+    parser.add_argument("--files", type=int, default=100000, help="文件数 (默认: 100000)")
+    parser.add_argument("--fanout", type=int, default=30, help="每层目录数 (默认: 30)")
+    parser.add_argument("--json", help="将结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, "tree")
+        synthesize_tree(root, args.files, args.fanout)
+        print(f"✓ 合成 {args.files} 个文件")
+
+        glob_seconds, globbed = timed(glob_scan, root)
+        scandir_seconds, scanned = timed(
+            batch_transcribe.find_media_files, root, True
+        )
+        identical = globbed == scanned
+
+        db_path = os.path.join(tmp, "jobs.sqlite3")
+        first_seconds, first_queued = timed(manifest_scan, root, db_path)
+        rerun_seconds, rerun_queued = timed(manifest_scan, root, db_path)
+
+    result = {
+        "files": args.files,
+        "media_files": len(scanned),
+        "glob_seconds": round(glob_seconds, 3),
+        "scandir_seconds": round(scandir_seconds, 3),
+        "speedup": round(glob_seconds / max(scandir_seconds, 1e-9), 1),
+        "manifest_first_seconds": round(first_seconds, 3),
+        "manifest_first_queued": first_queued,
+        "manifest_rerun_seconds": round(rerun_seconds, 3),
+        "manifest_rerun_queued": rerun_queued,
+        "identical": identical,
+    }
+    print(f"  Path.glob:           {glob_seconds:8.3f} 秒  ({len(globbed)} 个音视频)")
+    print(f"  os.scandir:          {scandir_seconds:8.3f} 秒  加速 {result['speedup']}x")
+    print(f"  任务清单（首次）:    {first_seconds:8.3f} 秒  排队 {first_queued} 个")
+    print(f"  任务清单（重复运行）:{rerun_seconds:8.3f} 秒  排队 {rerun_queued} 个")
+    print("  ✓ 文件列表一致" if identical else "  ✗ 文件列表不一致")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"✓ 结果已保存到: {args.json}")
+    return 0 if identical and rerun_queued == 0 else 1
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,226 @@
+"""
+说话人分配基准测试
+合成确定性的长会议数据（默认 3 小时：数千个说话人段落，含重叠发言；
+数万个词），比较 speaker_assign.assign_word_speakers 与
+whisperx.assign_word_speakers 的耗时，并检查两者输出完全一致。
+未安装 whisperx 时与参考实现（照搬 whisperx 的 pandas groupby 逻辑）比较。
+重叠发言中完整落在两个段落重叠部分的词，两个说话人的重叠时长相同（并列），
+另外用一个手工构造的并列例子单独检查并列时的选择
+
+使用方法:
+    python benchmarks/bench_speaker_assign.py
+    python benchmarks/bench_speaker_assign.py --hours 1 3 6 --speakers 6
+"""
+
+import argparse
+import copy
+import json
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+
+import numpy as np  # noqa: E402
+
+import speaker_assign  # noqa: E402
+
+
+def synthesize_meeting(hours, speakers=4, seed=0):
+    """
+    合成说话人段落和对齐后的转录结果
+
+    说话人段落 0.5-15 秒，约 10% 与上一段重叠（插话，重叠 0.2-2 秒，插话者的
+    标签随机，可能排在被打断者之前或之后；完整落在重叠部分内的词即为并列）；
+    转录分段 2-10 秒，分段内每个词 0.15-0.5 秒，少数词没有时间戳
+    """
+    rng = np.random.default_rng(seed)
+    total = hours * 3600
+
+    turns, t = [], 0.0
+    while t < total:
+        length = float(rng.uniform(0.5, 15))
+        start = t - float(rng.uniform(0.2, 2)) if turns and rng.random() < 0.1 else t
+        turns.append(
+            {
+                "start": round(max(start, 0.0), 3),
+                "end": round(min(t + length, total), 3),
+                "speaker": f"SPEAKER_{int(rng.integers(speakers)):02d}",
+            }
+        )
+        t += length + float(rng.uniform(0, 0.8))
+
+    segments, t = [], 0.0
+    while t < total:
+        seg_end = min(t + float(rng.uniform(2, 10)), total)
+        words, w = [], t
+        while w < seg_end - 0.1:
+            w_end = min(w + float(rng.uniform(0.15, 0.5)), seg_end)
+            word = {"word": "字"}
+            if rng.random() > 0.02:
+                word.update(start=round(w, 3), end=round(w_end, 3))
+            words.append(word)
+            w = w_end + float(rng.uniform(0, 0.1))
+        segments.append(
+            {"start": round(t, 3), "end": round(seg_end, 3), "text": "", "words": words}
+        )
+        t = seg_end + float(rng.uniform(0, 1.5))
+
+    return turns, {"segments": segments}
+
+
+# 手工构造的并列例子：词 [1.5, 2.5] 与两个说话人各重叠 1 秒，
+# whisperx 取标签排序靠前的 SPEAKER_00（而不是先开始的 SPEAKER_01）
+TIE_TURNS = [
+    {"start": 0.0, "end": 3.0, "speaker": "SPEAKER_01"},
+    {"start": 1.0, "end": 4.0, "speaker": "SPEAKER_00"},
+]
+TIE_RESULT = {
+    "segments": [
+        {
+            "start": 1.5,
+            "end": 2.5,
+            "text": "",
+            "words": [{"word": "字", "start": 1.5, "end": 2.5}],
+        }
+    ]
+}
+
+
+def reference_assign(turns, result):
+    """
+    参考实现：照搬 whisperx.assign_word_speakers 的 pandas 逻辑，
+    每个分段/词与全部说话人段落比较（O(n·m)）
+    """
+    import pandas as pd
+
+    diarize_df = turns if hasattr(turns, "columns") else pd.DataFrame(turns)
+
+    def best(start, end):
+        diarize_df["intersection"] = np.minimum(diarize_df["end"], end) - np.maximum(
+            diarize_df["start"], start
+        )
+        intersected = diarize_df[diarize_df["intersection"] > 0]
+        if len(intersected) == 0:
+            return None
+        return (
+            intersected.groupby("speaker")["intersection"]
+            .sum()
+            .sort_values(ascending=False)
+            .index[0]
+        )
+
+    for seg in result["segments"]:
+        speaker = best(seg.get("start", 0.0), seg.get("end", 0.0))
+        if speaker is not None:
+            seg["speaker"] = speaker
+        for word in seg.get("words", []):
+            if "start" in word:
+                speaker = best(word["start"], word.get("end", word["start"]))
+                if speaker is not None:
+                    word["speaker"] = speaker
+    return result
+
+
+def baseline():
+    """返回 (名称, 分配函数)：优先使用已安装的 whisperx"""
+    try:
+        from whisperx.diarize import assign_word_speakers
+    except ImportError:
+        print("⚠ 未安装 whisperx，与照搬其 pandas 逻辑的参考实现比较")
+        return "reference", reference_assign
+    return "whisperx", assign_word_speakers
+
+
+def labels(result):
+    """提取分段和词的说话人标签，用于比较输出"""
+    return [
+        (seg.get("speaker"), [word.get("speaker") for word in seg.get("words", [])])
+        for seg in result["segments"]
+    ]
+
+
+def timed(func, diarize_segments, result):
+    """在结果副本上运行分配函数，返回 (耗时, 结果)"""
+    result = copy.deepcopy(result)
+    # 参考实现会给 DataFrame 添加列，每次使用副本
+    if hasattr(diarize_segments, "copy"):
+        diarize_segments = diarize_segments.copy()
+    start = time.perf_counter()
+    func(diarize_segments, result)
+    return time.perf_counter() - start, result
+
+
+def check_tie(baseline_func):
+    """并列例子：两种实现都应选 SPEAKER_00"""
+    import pandas as pd
+
+    _, fast = timed(speaker_assign.assign_word_speakers, pd.DataFrame(TIE_TURNS), TIE_RESULT)
+    _, base = timed(baseline_func, pd.DataFrame(TIE_TURNS), TIE_RESULT)
+    identical = labels(fast) == labels(base)
+    print(
+        f"{'✓' if identical else '✗'} 并列例子: 扫描 {labels(fast)[0][1]}，"
+        f"基准 {labels(base)[0][1]}"
+    )
+    return identical
+
+
+def main():
+    parser = argparse.ArgumentParser(description="说话人分配基准测试")
+    parser.add_argument(
+        "--hours", type=float, nargs="+", default=[3], help="合成会议时长（小时）"
+    )
+    parser.add_argument("--speakers", type=int, default=4, help="说话人数 (默认: 4)")
+    parser.add_argument("--json", help="将结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    baseline_name, baseline_func = baseline()
+    tie_ok = check_tie(baseline_func)
+    results = []
+    for hours in args.hours:
+        turns, result = synthesize_meeting(hours, args.speakers)
+        words = sum(len(seg["words"]) for seg in result["segments"])
+        print(
+            f"▶ {hours:g} 小时: {len(turns)} 个说话人段落, "
+            f"{len(result['segments'])} 个分段, {words} 个词"
+        )
+
+        # 两个函数都使用与实际流程相同的 DataFrame 输入
+        import pandas as pd
+
+        diarize_segments = pd.DataFrame(turns)
+
+        fast_seconds, fast = timed(
+            speaker_assign.assign_word_speakers, diarize_segments, result
+        )
+        base_seconds, base = timed(baseline_func, diarize_segments, result)
+        identical = labels(fast) == labels(base)
+
+        row = {
+            "hours": hours,
+            "turns": len(turns),
+            "segments": len(result["segments"]),
+            "words": words,
+            "baseline": baseline_name,
+            "baseline_seconds": round(base_seconds, 4),
+            "sweep_seconds": round(fast_seconds, 4),
+            "speedup": round(base_seconds / max(fast_seconds, 1e-9), 1),
+            "identical": identical,
+        }
+        results.append(row)
+        mark = "✓ 输出一致" if identical else "✗ 输出不一致"
+        print(
+            f"  {baseline_name}: {base_seconds:.3f} 秒  扫描: {fast_seconds:.3f} 秒  "
+            f"加速 {row['speedup']}x  {mark}"
+        )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"✓ 结果已保存到: {args.json}")
+    return 0 if tie_ok and all(row["identical"] for row in results) else 1
+
+
+if __name__ == "__main__":
+    exit(main())
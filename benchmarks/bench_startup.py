@@ -0,0 +1,174 @@
+"""
+命令行启动耗时基准测试
+在全新的子进程中测量 --help、模块导入以及不需要模型的路径（命中转录缓存、
+续传时没有新内容）的墙钟时间，并用 -X importtime 列出导入最慢的模块；
+--help 与不加载模型的路径超出时间预算时以非零状态退出
+
+使用方法:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --repeat 10 --budget 0.5
+    python benchmarks/bench_startup.py --model-paths -m tiny
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+REPO_DIR = BENCH_DIR.parent
+sys.path.insert(0, str(REPO_DIR))
+
+from fixtures import ensure_fixtures  # noqa: E402
+
+DEFAULT_FIXTURE_DIR = BENCH_DIR / ".fixtures"
+
+
+def time_command(cmd, repeat):
+    """重复运行命令，返回每次的墙钟时间（秒）"""
+    env = dict(os.environ, CUDA_VISIBLE_DEVICES="")
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run(cmd, capture_output=True, cwd=REPO_DIR, env=env)
+        timings.append(time.perf_counter() - start)
+        if proc.returncode != 0:
+            stderr = proc.stderr.decode(errors="ignore").strip().splitlines()
+            raise RuntimeError(stderr[-1] if stderr else f"exit code {proc.returncode}")
+    return timings
+
+
+def import_profile(module, top=10):
+    """用 -X importtime 统计导入 module 时累计耗时最长的模块（毫秒）"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        cwd=REPO_DIR,
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = re.match(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)", line)
+        if match:
+            rows.append((int(match.group(2)) / 1000, match.group(4).strip()))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="命令行启动耗时基准测试")
+    parser.add_argument("--repeat", type=int, default=5, help="每项重复次数 (默认: 5)")
+    parser.add_argument(
+        "--budget", type=float, default=1.0, help="--help 与不加载模型路径的时间预算（秒）"
+    )
+    parser.add_argument(
+        "--model-paths",
+        action="store_true",
+        help="同时测试命中转录缓存与续传无新内容的路径（首次运行需加载模型生成缓存）",
+    )
+    parser.add_argument("-m", "--model", default="tiny", help="--model-paths 使用的模型")
+    parser.add_argument("--fixture-dir", default=str(DEFAULT_FIXTURE_DIR), help="素材缓存目录")
+    parser.add_argument("-o", "--output", default="startup_report.json", help="报告输出路径")
+    args = parser.parse_args()
+
+    py = sys.executable
+    # (名称, 命令, 是否受时间预算约束)
+    cases = [
+        ("audio_to_text --help", [py, "audio_to_text.py", "--help"], True),
+        ("audio_to_text_diarize --help", [py, "audio_to_text_diarize.py", "--help"], True),
+        ("batch_transcribe --help", [py, "batch_transcribe.py", "--help"], True),
+        ("import audio_to_text", [py, "-c", "import audio_to_text"], True),
+        ("import torch", [py, "-c", "import torch"], False),
+        ("import whisper", [py, "-c", "import whisper"], False),
+    ]
+
+    tmp = tempfile.TemporaryDirectory(prefix="bench_startup_")
+    if args.model_paths:
+        fixtures = ensure_fixtures(args.fixture_dir, {"speech_30s": 30})
+        audio_file = str(fixtures["speech_30s"][0])
+        cache_dir = os.path.join(tmp.name, "cache")
+        primed_csv = os.path.join(tmp.name, "primed.csv")
+        base_cmd = [py, "audio_to_text.py", audio_file, "-m", args.model, "-l", "zh"]
+
+        print("▶ 预热：转录一次以生成转录缓存 ...", flush=True)
+        time_command(base_cmd + ["-o", primed_csv, "--cache-dir", cache_dir], 1)
+
+        # 每次使用新的输出文件，保证走的是缓存命中路径而不是续传路径
+        cache_hit_cmd = [
+            py,
+            "-c",
+            "import os, sys, tempfile, audio_to_text; "
+            "out = tempfile.mktemp(suffix='.csv'); "
+            "audio_to_text.transcribe_audio(sys.argv[1], model_name=sys.argv[2], "
+            "language='zh', output_file=out, cache_dir=sys.argv[3]); os.remove(out)",
+            audio_file,
+            args.model,
+            cache_dir,
+        ]
+        cases += [
+            ("缓存命中", cache_hit_cmd, True),
+            ("续传无新内容", base_cmd + ["-o", primed_csv], True),
+        ]
+
+    results = []
+    for name, cmd, budgeted in cases:
+        print(f"▶ {name} ...", flush=True)
+        try:
+            timings = time_command(cmd, args.repeat)
+        except Exception as e:
+            print(f"  ✗ 失败: {e}")
+            continue
+        result = {
+            "case": name,
+            "median_seconds": round(statistics.median(timings), 3),
+            "min_seconds": round(min(timings), 3),
+            "max_seconds": round(max(timings), 3),
+            "budgeted": budgeted,
+        }
+        results.append(result)
+        mark = "✗" if budgeted and result["median_seconds"] > args.budget else "✓"
+        print(
+            f"  {mark} 中位数 {result['median_seconds']:.3f}s  "
+            f"最短 {result['min_seconds']:.3f}s  最长 {result['max_seconds']:.3f}s"
+        )
+    tmp.cleanup()
+
+    profile = import_profile("audio_to_text")
+    print("\nimport audio_to_text 耗时最长的模块（累计，毫秒）:")
+    for ms, module in profile:
+        print(f"  {ms:>9.1f}  {module}")
+
+    report = {
+        "meta": {
+            "python": sys.version.split()[0],
+            "budget_seconds": args.budget,
+            "repeat": args.repeat,
+            "created_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "results": results,
+        "import_profile_ms": [{"module": m, "cumulative_ms": ms} for ms, m in profile],
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n✓ 报告已保存到: {args.output}")
+
+    over = [
+        r for r in results if r["budgeted"] and r["median_seconds"] > args.budget
+    ]
+    if over:
+        print(f"✗ {len(over)} 项超出时间预算 {args.budget:.2f}s:")
+        for r in over:
+            print(f"  - {r['case']}: {r['median_seconds']:.3f}s")
+        return 1
+    print(f"✓ 所有受约束的路径均在 {args.budget:.2f}s 内完成")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,62 @@
+"""
+基准测试公共工具
+"""
+
+import shutil
+import subprocess
+
+
+def probe_duration(media_file):
+    """获取媒体时长（秒）：优先用 ffprobe，不可用时解码后计算"""
+    if shutil.which("ffprobe"):
+        cmd = [
+            "ffprobe",
+            "-v",
+            "error",
+            "-show_entries",
+            "format=duration",
+            "-of",
+            "default=noprint_wrappers=1:nokey=1",
+            str(media_file),
+        ]
+        out = subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+        return float(out.strip())
+
+    import audio_to_text
+
+    return len(audio_to_text.load_audio(media_file)) / audio_to_text.SAMPLE_RATE
+
+
+def tokenize(text, unit="auto"):
+    """
+    按评测单位切分文本
+
+    unit: 'word' 按空白切词；'char' 按字符（中文等无空格语言）；
+          'auto' 文本中含中日韩字符时按字符，否则按词
+    """
+    if unit == "auto":
+        has_cjk = any("一" <= ch <= "鿿" or "぀" <= ch <= "ヿ" for ch in text)
+        unit = "char" if has_cjk else "word"
+    if unit == "char":
+        return [ch for ch in text if not ch.isspace()]
+    return text.lower().split()
+
+
+def edit_distance(ref, hyp):
+    """两个序列的编辑距离（替换/插入/删除代价均为 1）"""
+    prev = list(range(len(hyp) + 1))
+    for i, r in enumerate(ref, 1):
+        cur = [i] + [0] * len(hyp)
+        for j, h in enumerate(hyp, 1):
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (r != h))
+        prev = cur
+    return prev[-1]
+
+
+def error_rate(reference, hypothesis, unit="auto"):
+    """词错误率（英文等）或字错误率（中文等），以 reference 为参考"""
+    ref = tokenize(reference, unit)
+    hyp = tokenize(hypothesis, unit)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    return edit_distance(ref, hyp) / len(ref)
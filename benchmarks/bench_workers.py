@@ -0,0 +1,130 @@
+"""
+批量转录多进程吞吐基准测试
+对同一批音视频文件分别用 1/2/4/8 个工作进程运行 batch_transcribe 的进程池模式，
+比较吞吐量（每墙钟小时处理的音频小时数）
+
+使用方法:
+    python benchmarks/bench_workers.py D:\\bench_clips -m base -l zh
+    python benchmarks/bench_workers.py D:\\bench_clips --workers 1 2 4 8 --json result.json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import batch_transcribe  # noqa: E402
+from bench_utils import probe_duration  # noqa: E402
+
+
+def run_once(media_files, num_workers, args):
+    """在临时目录中（通过链接/复制原文件）运行一次，返回墙钟耗时（秒）"""
+    with tempfile.TemporaryDirectory(prefix="bench_workers_") as tmp:
+        staged = []
+        for i, f in enumerate(media_files):
+            target = Path(tmp) / f"{i:05d}{f.suffix.lower()}"
+            try:
+                os.symlink(f.resolve(), target)
+            except OSError:
+                shutil.copy2(f, target)
+            staged.append(target)
+
+        cli = [
+            tmp,
+            "-m",
+            args.model,
+            "-l",
+            args.language,
+            "--workers",
+            str(num_workers),
+            "--threads-per-worker",
+            str(max(1, args.cores // num_workers)),
+        ]
+        if args.model_dir:
+            cli += ["-d", args.model_dir]
+        run_args = batch_transcribe.prepare_run_state(
+            batch_transcribe.build_parser().parse_args(cli)
+        )
+        start = time.perf_counter()
+        success, failed = batch_transcribe.transcribe_with_pool(staged, run_args)
+        elapsed = time.perf_counter() - start
+
+    if failed:
+        print(f"⚠ {num_workers} 个进程时有 {len(failed)} 个文件失败")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="batch_transcribe 多进程吞吐基准测试")
+    parser.add_argument("directory", help="基准测试用的音视频目录")
+    parser.add_argument("-m", "--model", default="base", help="Whisper 模型 (默认: base)")
+    parser.add_argument("-l", "--language", default="zh", help="语言代码 (默认: zh)")
+    parser.add_argument("-d", "--model-dir", help="模型存储目录")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=[1, 2, 4, 8],
+        help="要比较的工作进程数 (默认: 1 2 4 8)",
+    )
+    parser.add_argument(
+        "--cores",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="总线程预算，按进程数平分 (默认: CPU 核心数)",
+    )
+    parser.add_argument("--json", help="将结果写入 JSON 文件")
+    args = parser.parse_args()
+
+    media_files = batch_transcribe.find_media_files(args.directory, recursive=True)
+    if not media_files:
+        print(f"✗ 目录中未找到任何音视频文件: {args.directory}")
+        return 1
+
+    audio_seconds = sum(probe_duration(f) for f in media_files)
+    print(f"✓ {len(media_files)} 个文件，总时长 {audio_seconds / 3600:.3f} 小时")
+
+    results = []
+    for num_workers in args.workers:
+        print(f"\n{'='*70}\n▶ 工作进程数: {num_workers}\n{'='*70}")
+        elapsed = run_once(media_files, num_workers, args)
+        results.append(
+            {
+                "workers": num_workers,
+                "threads_per_worker": max(1, args.cores // num_workers),
+                "wall_seconds": round(elapsed, 2),
+                "audio_hours_per_wall_hour": round(audio_seconds / elapsed, 2),
+            }
+        )
+
+    print(f"\n{'='*70}")
+    print(f"{'进程数':>6} {'线程/进程':>10} {'耗时(秒)':>10} {'音频小时/墙钟小时':>18}")
+    for r in results:
+        print(
+            f"{r['workers']:>6} {r['threads_per_worker']:>10} "
+            f"{r['wall_seconds']:>10.1f} {r['audio_hours_per_wall_hour']:>18.2f}"
+        )
+
+    if args.json:
+        report = {
+            "model": args.model,
+            "language": args.language,
+            "files": len(media_files),
+            "audio_seconds": round(audio_seconds, 2),
+            "results": results,
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n✓ 结果已保存到: {args.json}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,85 @@
+"""
+确定性的基准测试音频素材
+用固定随机种子合成“类语音”信号（带共振峰的谐波音节 + 停顿 + 底噪），
+同样的参数在任何机器上生成完全相同的 WAV 文件
+"""
+
+import wave
+from pathlib import Path
+
+import numpy as np
+
+SAMPLE_RATE = 16000
+
+# 默认素材：名称 -> 时长（秒）
+DEFAULT_FIXTURES = {
+    "speech_30s": 30,
+    "speech_2min": 120,
+    "speech_10min": 600,
+}
+
+# 元音共振峰 (F1, F2)，用于合成音节
+_FORMANTS = [(730, 1090), (270, 2290), (300, 870), (530, 1840), (570, 840)]
+
+
+def _syllable(rng, seconds):
+    """合成一个音节：随机基频的谐波叠加，按共振峰加权，带起落包络"""
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    f0 = rng.uniform(100, 220) * (1 + 0.05 * np.sin(2 * np.pi * 3 * t))
+    f1, f2 = _FORMANTS[rng.integers(len(_FORMANTS))]
+    phase = 2 * np.pi * np.cumsum(f0) / SAMPLE_RATE
+    signal = np.zeros_like(t)
+    for k in range(1, 25):
+        freq = k * f0.mean()
+        gain = np.exp(-(((freq - f1) / 150) ** 2)) + 0.6 * np.exp(-(((freq - f2) / 200) ** 2))
+        signal += (gain + 0.02) * np.sin(k * phase)
+    envelope = np.sin(np.pi * np.linspace(0, 1, len(t))) ** 0.5
+    return signal * envelope
+
+
+def synthesize(seconds, seed=0):
+    """合成指定时长的类语音音频（float32，[-1, 1]）"""
+    rng = np.random.default_rng(seed)
+    total = int(seconds * SAMPLE_RATE)
+    parts, length = [], 0
+    while length < total:
+        # 一个“短语”：3-8 个音节，之后停顿 0.2-1.2 秒
+        for _ in range(rng.integers(3, 9)):
+            parts.append(_syllable(rng, rng.uniform(0.12, 0.35)))
+        parts.append(np.zeros(int(rng.uniform(0.2, 1.2) * SAMPLE_RATE)))
+        length = sum(len(p) for p in parts)
+
+    audio = np.concatenate(parts)[:total]
+    audio = audio / (np.abs(audio).max() + 1e-9) * 0.5
+    audio += 0.003 * rng.standard_normal(total)
+    return audio.astype(np.float32)
+
+
+def write_wav(path, audio):
+    """写入 16 位单声道 WAV"""
+    pcm = (np.clip(audio, -1, 1) * 32767).astype(np.int16)
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(SAMPLE_RATE)
+        f.writeframes(pcm.tobytes())
+
+
+def ensure_fixtures(fixture_dir, fixtures=None, seed=0):
+    """
+    生成（或复用已生成的）素材文件
+
+    Returns:
+        dict: 名称 -> (WAV 路径, 时长秒)
+    """
+    fixtures = fixtures or DEFAULT_FIXTURES
+    fixture_dir = Path(fixture_dir)
+    fixture_dir.mkdir(parents=True, exist_ok=True)
+
+    paths = {}
+    for name, seconds in fixtures.items():
+        path = fixture_dir / f"{name}_seed{seed}.wav"
+        if not path.exists():
+            write_wav(path, synthesize(seconds, seed=seed))
+        paths[name] = (path, float(seconds))
+    return paths
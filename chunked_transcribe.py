@@ -0,0 +1,206 @@
+"""
+单个长音频的并行分块转录
+在静音处把解码后的音频切成带重叠的窗口，用进程池并行转录各窗口，
+再按时间顺序拼接：时间戳映射回原始时间轴，重叠区域的重复文本去重
+"""
+
+import difflib
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from audio_cache import SAMPLE_RATE
+from transcript_io import shift_segments
+
+# 静音检测的帧长（秒）与平滑窗口（秒）
+FRAME_SECONDS = 0.03
+SMOOTH_SECONDS = 0.3
+
+
+def frame_energy_db(audio, frame_seconds=FRAME_SECONDS):
+    """计算每帧的能量（dB）"""
+    frame_len = int(frame_seconds * SAMPLE_RATE)
+    n_frames = len(audio) // frame_len
+    if n_frames == 0:
+        return np.zeros(0, dtype=np.float32)
+    frames = np.asarray(audio[: n_frames * frame_len], dtype=np.float32)
+    power = np.mean(frames.reshape(n_frames, frame_len) ** 2, axis=1)
+    return 10.0 * np.log10(power + 1e-10)
+
+
+def find_split_points(audio, chunk_seconds, search_seconds=30.0):
+    """
+    在每个目标切分位置附近 ±search_seconds 内寻找最安静的位置作为切分点
+
+    Returns:
+        list: 切分点（秒），不含音频起点和终点
+    """
+    total = len(audio) / SAMPLE_RATE
+    if total <= chunk_seconds:
+        return []
+
+    energy = frame_energy_db(audio)
+    # 平滑后取最小值，避免落在语音中间的短暂停顿上
+    smooth = max(1, int(SMOOTH_SECONDS / FRAME_SECONDS))
+    energy = np.convolve(energy, np.ones(smooth) / smooth, mode="same")
+
+    # 搜索范围不超过半个窗口，保证切分点单调向后推进
+    search_seconds = min(search_seconds, chunk_seconds / 2)
+    points = []
+    target = chunk_seconds
+    while target < total - chunk_seconds / 4:
+        lo = int(max(0.0, target - search_seconds) / FRAME_SECONDS)
+        hi = int(min(total, target + search_seconds) / FRAME_SECONDS)
+        if hi > lo:
+            point = (lo + int(np.argmin(energy[lo:hi]))) * FRAME_SECONDS
+        else:
+            point = target
+        if points and point <= points[-1] + 1.0:
+            point = target
+        points.append(point)
+        target = point + chunk_seconds
+    return points
+
+
+def plan_windows(audio, chunk_seconds, overlap_seconds):
+    """
+    规划转录窗口
+
+    Returns:
+        list of (窗口起点, 窗口终点, 保留区间起点, 保留区间终点)，单位秒；
+        相邻窗口在切分点两侧各重叠 overlap_seconds，保留区间以切分点为界
+    """
+    total = len(audio) / SAMPLE_RATE
+    bounds = [0.0] + find_split_points(audio, chunk_seconds) + [total]
+    windows = []
+    for keep_start, keep_end in zip(bounds[:-1], bounds[1:]):
+        start = max(0.0, keep_start - overlap_seconds)
+        end = min(total, keep_end + overlap_seconds)
+        windows.append((start, end, keep_start, keep_end))
+    return windows
+
+
+def _normalize(text):
+    return "".join(ch for ch in text.lower() if ch.isalnum())
+
+
+def stitch_segments(window_results, similarity=0.8):
+    """
+    拼接各窗口的分段（时间戳已在原始时间轴上）
+
+    每个窗口只保留中点落在其保留区间内的分段；相邻窗口交界处若前后两段
+    时间重叠且文本相似，视为重叠区域重复识别，只保留前一段
+    """
+    stitched = []
+    for keep_start, keep_end, segments in window_results:
+        for seg in segments:
+            mid = (seg["start"] + seg["end"]) / 2
+            if not keep_start <= mid < keep_end:
+                continue
+            if stitched:
+                prev = stitched[-1]
+                overlaps = seg["start"] < prev["end"]
+                ratio = difflib.SequenceMatcher(
+                    None, _normalize(prev["text"]), _normalize(seg["text"])
+                ).ratio()
+                if overlaps and ratio >= similarity:
+                    continue
+            stitched.append(seg)
+
+    for idx, seg in enumerate(stitched):
+        seg["id"] = idx
+    return stitched
+
+
+def _init_worker(model_name, model_dir, num_threads, engine, quantize):
+    """工作进程初始化：固定线程数并加载一次模型"""
+    from engines import set_worker_threads
+
+    set_worker_threads(engine, num_threads)
+
+    import audio_to_text
+
+    audio_to_text.load_model(model_name, model_dir, engine=engine, quantize=quantize)
+
+
+def _transcribe_window(model_name, model_dir, engine, quantize, window, options):
+    """在工作进程中转录一个窗口（时间戳相对窗口起点）"""
+    import audio_to_text
+
+    model = audio_to_text.load_model(
+        model_name, model_dir, engine=engine, quantize=quantize
+    )
+    result = model.transcribe(window, **options)
+    return result["segments"], result.get("language", "未知")
+
+
+def transcribe_parallel(
+    audio,
+    options,
+    model_name,
+    model_dir=None,
+    workers=2,
+    chunk_seconds=300.0,
+    overlap_seconds=5.0,
+    engine="whisper",
+    quantize=False,
+):
+    """
+    并行分块转录一段音频
+
+    Args:
+        audio: 16kHz 单声道 float32 音频
+        options: 传给 model.transcribe 的选项（fp16 由各工作进程的引擎按设备决定）
+        model_name, model_dir: 模型名称与目录
+        workers: 工作进程数
+        chunk_seconds: 目标窗口长度（秒）
+        overlap_seconds: 相邻窗口的重叠长度（秒）
+        engine: 推理引擎 ('whisper' 或 'ctranslate2')
+        quantize: 工作进程使用动态 int8 量化模型（CPU，仅 whisper 引擎）
+
+    Returns:
+        与 model.transcribe 相同结构的结果字典（时间戳相对 audio 起点）
+    """
+    windows = plan_windows(audio, chunk_seconds, overlap_seconds)
+    num_threads = max(1, (os.cpu_count() or 1) // workers)
+    print(f"▶ 并行分块转录: {len(windows)} 个窗口，{workers} 个工作进程")
+
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=ctx,
+        initializer=_init_worker,
+        initargs=(model_name, model_dir, num_threads, engine, quantize),
+    ) as pool:
+        futures = [
+            pool.submit(
+                _transcribe_window,
+                model_name,
+                model_dir,
+                engine,
+                quantize,
+                audio[int(start * SAMPLE_RATE) : int(end * SAMPLE_RATE)],
+                options,
+            )
+            for start, end, _, _ in windows
+        ]
+
+        window_results = []
+        languages = []
+        for (start, _, keep_start, keep_end), future in zip(windows, futures):
+            segments, language = future.result()
+            shift_segments(segments, start)
+            window_results.append((keep_start, keep_end, segments))
+            languages.append(language)
+            print(f"  ✓ 窗口 {len(window_results)}/{len(windows)} 完成")
+
+    segments = stitch_segments(window_results)
+    # 各窗口独立检测语言，取出现次数最多的
+    language = max(set(languages), key=languages.count) if languages else "未知"
+    return {
+        "text": "".join(seg["text"] for seg in segments),
+        "segments": segments,
+        "language": language,
+    }
@@ -0,0 +1,260 @@
+"""
+推理引擎层 - audio_to_text.py 与 chunked_transcribe.py 共用
+同一接口封装不同的 Whisper 推理后端：
+    whisper      openai-whisper（PyTorch），GPU 上使用 fp16，CPU 上可选动态 int8 量化
+    ctranslate2  faster-whisper（CTranslate2），CPU 上使用 int8，GPU 上使用 float16
+transcribe() 返回与 openai-whisper 相同结构的结果字典
+（text / segments / language，分段含 id、start、end、text 等字段），
+CSV 写入、断点续传和繁简转换无需区分引擎
+"""
+
+import os
+from pathlib import Path
+
+import numpy as np
+
+# 可选的推理引擎
+ENGINES = ("whisper", "ctranslate2")
+
+# 动态量化模型的磁盘缓存文件名后缀
+QUANTIZED_SUFFIX = "int8-dynamic"
+
+# openai-whisper 的 transcribe 选项中，faster-whisper 同样支持的部分
+# （openai-whisper 选项名 -> faster-whisper 参数名）
+_CT2_OPTIONS = {
+    "language": "language",
+    "task": "task",
+    "initial_prompt": "initial_prompt",
+    "temperature": "temperature",
+    "beam_size": "beam_size",
+    "best_of": "best_of",
+    "patience": "patience",
+    "condition_on_previous_text": "condition_on_previous_text",
+    "compression_ratio_threshold": "compression_ratio_threshold",
+    "logprob_threshold": "log_prob_threshold",
+    "no_speech_threshold": "no_speech_threshold",
+    "word_timestamps": "word_timestamps",
+}
+
+
+# 工作进程的 CPU 线程数（set_worker_threads 设置），ctranslate2 引擎未指定线程数时使用
+_worker_cpu_threads = 0
+
+
+def set_worker_threads(engine, num_threads):
+    """
+    固定工作进程的推理线程数（并行分块转录、批量工作进程池在加载模型前调用）
+
+    whisper 引擎设置 torch 线程数；ctranslate2 引擎不导入 torch（只安装
+    faster-whisper 时同样可用），线程数通过 WhisperModel 的 cpu_threads 传入
+    """
+    global _worker_cpu_threads
+
+    # 必须在导入 torch / CTranslate2 之前设置，否则 OpenMP 线程池已按全部核心初始化
+    os.environ["OMP_NUM_THREADS"] = str(num_threads)
+    os.environ["MKL_NUM_THREADS"] = str(num_threads)
+    if engine == "ctranslate2":
+        _worker_cpu_threads = num_threads
+        return
+
+    import torch
+
+    torch.set_num_threads(num_threads)
+
+
+def quantize_linear_int8(model):
+    """
+    对模型中所有 Linear 层做动态 int8 量化（仅 CPU），权重量化为 int8，
+    激活在推理时按批动态量化
+
+    whisper 的 Linear 是 nn.Linear 的子类（forward 中把权重转换为输入精度），
+    quantize_dynamic 按精确类型匹配，先还原为 nn.Linear 才会被替换
+    """
+    import warnings
+
+    import torch
+    import whisper.model
+
+    for module in model.modules():
+        if type(module) is whisper.model.Linear:
+            module.__class__ = torch.nn.Linear
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        return torch.ao.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+
+
+def quantized_cache_path(model_name, model_dir=None):
+    """
+    量化模型缓存路径：与原模型同目录，文件名包含 openai-whisper 和 torch 的版本
+    （模型结构和量化参数的序列化格式随版本变化，升级后重新量化）
+    """
+    import torch
+    import whisper
+
+    root = model_dir or os.path.join(
+        os.getenv("XDG_CACHE_HOME", os.path.expanduser("~/.cache")), "whisper"
+    )
+    torch_version = torch.__version__.split("+")[0]
+    name = Path(model_name).stem
+    return Path(root) / (
+        f"{name}-{QUANTIZED_SUFFIX}-whisper{whisper.__version__}-torch{torch_version}.pt"
+    )
+
+
+def load_quantized_whisper(model_name, model_dir=None):
+    """
+    加载动态 int8 量化的 Whisper 模型（CPU）
+
+    首次加载时从原模型量化，把模型维度和量化后的 state_dict 保存到磁盘；
+    之后按维度重建模型结构并量化（随机初始化的权重），再载入保存的 state_dict，
+    跳过 fp32 权重加载。缓存只含张量，以 weights_only=True 读取，不会执行
+    模型目录中被篡改的 pickle 代码
+    """
+    import dataclasses
+    import warnings
+
+    import torch
+    import whisper
+    from whisper.model import ModelDimensions, Whisper
+
+    path = quantized_cache_path(model_name, model_dir)
+    if path.exists():
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                checkpoint = torch.load(path, map_location="cpu", weights_only=True)
+                model = quantize_linear_int8(
+                    Whisper(ModelDimensions(**checkpoint["dims"]))
+                )
+                model.load_state_dict(checkpoint["state_dict"])
+            # 对齐头（逐词时间戳使用）不在 state_dict 中，与 whisper.load_model 一样设置
+            if model_name in whisper._ALIGNMENT_HEADS:
+                model.set_alignment_heads(whisper._ALIGNMENT_HEADS[model_name])
+            print(f"✓ 已读取量化模型缓存: {path}")
+            return model
+        except Exception as e:
+            print(f"⚠ 量化模型缓存不可用，将重新量化: {e}")
+
+    model = quantize_linear_int8(
+        whisper.load_model(model_name, device="cpu", download_root=model_dir)
+    )
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        torch.save(
+            {"dims": dataclasses.asdict(model.dims), "state_dict": model.state_dict()},
+            tmp_path,
+        )
+        os.replace(tmp_path, path)
+        print(f"✓ 量化模型已缓存: {path}")
+    except OSError as e:
+        print(f"⚠ 保存量化模型缓存失败: {e}")
+    return model
+
+
+class WhisperEngine:
+    """openai-whisper（PyTorch）推理引擎，CPU 上可选动态 int8 量化"""
+
+    name = "whisper"
+
+    def __init__(self, model_name, device, model_dir=None, quantize=False):
+        import whisper
+
+        self.device = device
+        if quantize and device == "cpu":
+            self.model = load_quantized_whisper(model_name, model_dir)
+        else:
+            if quantize:
+                print("⚠ 动态量化仅用于 CPU，GPU 上使用 fp16")
+            self.model = whisper.load_model(
+                model_name, device=device, download_root=model_dir
+            )
+
+    def transcribe(self, audio, **options):
+        # GPU 时使用半精度加速
+        options.setdefault("fp16", self.device == "cuda")
+        return self.model.transcribe(audio, **options)
+
+
+class CTranslate2Engine:
+    """faster-whisper（CTranslate2）推理引擎"""
+
+    name = "ctranslate2"
+
+    def __init__(
+        self, model_name, device, model_dir=None, compute_type=None, cpu_threads=None
+    ):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError:
+            raise ImportError("未安装 faster-whisper，请运行: pip install faster-whisper")
+
+        self.device = device
+        self.compute_type = compute_type or ("float16" if device == "cuda" else "int8")
+        # 线程数未指定时使用工作进程的线程预算（set_worker_threads），否则为 CTranslate2 默认值
+        if cpu_threads is None:
+            cpu_threads = _worker_cpu_threads
+        self.model = WhisperModel(
+            model_name,
+            device=device,
+            compute_type=self.compute_type,
+            cpu_threads=cpu_threads,
+            download_root=model_dir,
+        )
+
+    def transcribe(self, audio, **options):
+        kwargs = {
+            ct2_name: options[name]
+            for name, ct2_name in _CT2_OPTIONS.items()
+            if options.get(name) is not None
+        }
+        # 与 openai-whisper 的默认解码方式（贪心搜索）保持一致
+        kwargs.setdefault("beam_size", 1)
+
+        segments, info = self.model.transcribe(
+            np.asarray(audio, dtype=np.float32), **kwargs
+        )
+        segments = [_segment_dict(idx, seg) for idx, seg in enumerate(segments)]
+        return {
+            "text": "".join(seg["text"] for seg in segments),
+            "segments": segments,
+            "language": info.language,
+        }
+
+
+def _segment_dict(idx, seg):
+    """faster-whisper 的 Segment 转为 openai-whisper 的分段字典"""
+    result = {
+        "id": idx,
+        "seek": seg.seek,
+        "start": seg.start,
+        "end": seg.end,
+        "text": seg.text,
+        "tokens": list(seg.tokens),
+        "temperature": seg.temperature,
+        "avg_logprob": seg.avg_logprob,
+        "compression_ratio": seg.compression_ratio,
+        "no_speech_prob": seg.no_speech_prob,
+    }
+    if seg.words:
+        result["words"] = [
+            {
+                "word": word.word,
+                "start": word.start,
+                "end": word.end,
+                "probability": word.probability,
+            }
+            for word in seg.words
+        ]
+    return result
+
+
+def create_engine(engine, model_name, device, model_dir=None, quantize=False):
+    """按名称创建推理引擎（quantize 仅对 whisper 引擎生效，ctranslate2 在 CPU 上本身即为 int8）"""
+    if engine == "whisper":
+        return WhisperEngine(model_name, device, model_dir, quantize=quantize)
+    if engine == "ctranslate2":
+        return CTranslate2Engine(model_name, device, model_dir)
+    raise ValueError(f"未知的推理引擎: {engine}（可选: {', '.join(ENGINES)}）")
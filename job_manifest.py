@@ -0,0 +1,220 @@
+"""
+批量转录任务清单 - batch_transcribe.py --manifest 使用
+把目录扫描结果持久化到 SQLite：路径、大小、修改时间、时长、状态和尝试次数。
+重复运行时未变化且已完成的文件直接跳过（不再检查输出文件是否存在），
+新增或修改过的文件重新排队，失败的文件在达到最大尝试次数之前自动重试。
+
+ScanFeed 在后台线程中扫描目录并与清单比对，需要处理的文件边扫描边产出，
+超大目录树不必等全部扫描完成就可以开始转录
+"""
+
+import queue
+import sqlite3
+import threading
+import time
+
+# 失败文件的默认最大尝试次数（超过后重复运行不再重试，文件修改后重新计数）
+DEFAULT_MAX_ATTEMPTS = 3
+
+# 任务状态
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+
+class JobManifest:
+    """
+    批量转录任务清单（SQLite）
+
+    扫描线程与处理线程共用一个连接，所有读写都在锁内进行
+
+    用法:
+        with JobManifest("jobs.sqlite3") as manifest:
+            if manifest.observe(path, size, mtime_ns):
+                manifest.start(path)
+                ...
+                manifest.finish(path, error=None)
+    """
+
+    def __init__(self, db_path, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        self.db_path = str(db_path)
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                path       TEXT PRIMARY KEY,
+                size       INTEGER NOT NULL,
+                mtime_ns   INTEGER NOT NULL,
+                duration   REAL,
+                status     TEXT NOT NULL,
+                attempts   INTEGER NOT NULL DEFAULT 0,
+                error      TEXT,
+                updated_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)")
+        self._conn.commit()
+        self._known = None
+
+    def _snapshot(self):
+        """本次运行开始时的清单快照：扫描时在内存中比对，不必逐个文件查询"""
+        if self._known is None:
+            self._known = {
+                path: (size, mtime_ns, status, attempts)
+                for path, size, mtime_ns, status, attempts in self._conn.execute(
+                    "SELECT path, size, mtime_ns, status, attempts FROM jobs"
+                )
+            }
+        return self._known
+
+    def observe(self, path, size, mtime_ns):
+        """
+        记录扫描到的文件，返回是否需要处理
+
+        新文件和大小/修改时间变化的文件重置为 pending；已完成的文件跳过；
+        失败或上次运行中断（仍为 running）的文件在尝试次数未达上限时重试
+        """
+        path = str(path)
+        with self._lock:
+            previous = self._snapshot().get(path)
+            if previous is None or previous[:2] != (size, mtime_ns):
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO jobs "
+                        "(path, size, mtime_ns, duration, status, attempts, error, updated_at) "
+                        "VALUES (?, ?, ?, NULL, ?, 0, NULL, ?)",
+                        (path, size, mtime_ns, PENDING, time.time()),
+                    )
+                return True
+        status, attempts = previous[2], previous[3]
+        if status == DONE:
+            return False
+        if status == PENDING:
+            return True
+        return attempts < self.max_attempts
+
+    def _update(self, sql, params):
+        with self._lock, self._conn:
+            self._conn.execute(sql, params)
+
+    def start(self, path):
+        """标记为处理中，尝试次数加一"""
+        self._update(
+            "UPDATE jobs SET status = ?, attempts = attempts + 1, updated_at = ? "
+            "WHERE path = ?",
+            (RUNNING, time.time(), str(path)),
+        )
+
+    def finish(self, path, error=None, duration=None):
+        """标记为完成（error 为 None）或失败，并记录错误信息和时长（可选）"""
+        self._update(
+            "UPDATE jobs SET status = ?, error = ?, "
+            "duration = COALESCE(?, duration), updated_at = ? WHERE path = ?",
+            (
+                DONE if error is None else FAILED,
+                None if error is None else str(error),
+                duration,
+                time.time(),
+                str(path),
+            ),
+        )
+
+    def record_durations(self, durations):
+        """记录探测到的时长 {路径: 秒或 None}（中断后重新运行时不必再探测）"""
+        rows = [
+            (duration, str(path)) for path, duration in durations.items() if duration
+        ]
+        with self._lock, self._conn:
+            self._conn.executemany("UPDATE jobs SET duration = ? WHERE path = ?", rows)
+
+    def paths(self, status=DONE):
+        """某个状态的全部文件路径"""
+        with self._lock:
+            return [
+                path
+                for (path,) in self._conn.execute(
+                    "SELECT path FROM jobs WHERE status = ? ORDER BY path", (status,)
+                )
+            ]
+
+    def durations(self):
+        """已记录时长的文件 {路径: 秒}"""
+        with self._lock:
+            return dict(
+                self._conn.execute(
+                    "SELECT path, duration FROM jobs WHERE duration IS NOT NULL"
+                )
+            )
+
+    def counts(self):
+        """各状态的文件数"""
+        with self._lock:
+            return dict(
+                self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+            )
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+class ScanFeed:
+    """
+    后台线程扫描目录并与清单比对，按发现顺序逐个产出需要处理的文件
+
+    Args:
+        entries:  (路径, os.stat_result) 的迭代器（例如 batch_transcribe.iter_media_files）
+        manifest: JobManifest
+        skip:     可选的判断函数，返回 True 的文件直接标记为完成（例如已有输出文件）
+    """
+
+    def __init__(self, entries, manifest, skip=None):
+        self.manifest = manifest
+        self.skip = skip
+        self.scanned = 0
+        self.queued = 0
+        self.skipped = 0
+        self.done = False
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._scan, args=(entries,), name="scan", daemon=True
+        )
+        self._thread.start()
+
+    def _scan(self, entries):
+        try:
+            for path, st in entries:
+                self.scanned += 1
+                if not self.manifest.observe(path, st.st_size, st.st_mtime_ns):
+                    continue
+                if self.skip is not None and self.skip(path):
+                    self.manifest.finish(path)
+                    self.skipped += 1
+                    continue
+                self.queued += 1
+                self._queue.put(path)
+        except Exception as e:
+            print(f"⚠ 扫描中断: {e}")
+        finally:
+            self.done = True
+            self._queue.put(None)
+
+    def __iter__(self):
+        while True:
+            path = self._queue.get()
+            if path is None:
+                return
+            yield path
+
+    def total_label(self):
+        """进度显示的总数：扫描仍在进行时显示为“已发现数+”"""
+        return f"{self.queued}" if self.done else f"{self.queued}+"
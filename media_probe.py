@@ -0,0 +1,110 @@
+"""
+媒体时长探测 - batch_transcribe.py 调度和预计剩余时间使用
+WAV 直接解析文件头；其他格式调用 ffprobe（未安装 ffprobe 时解析 ffmpeg -i
+输出的 Duration 行）。探测只读取容器头部，多个文件在线程池中并行探测
+"""
+
+import os
+import re
+import shutil
+import subprocess
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# 并行探测的默认线程数（探测主要在等待子进程和磁盘 I/O）
+DEFAULT_PROBE_WORKERS = min(16, (os.cpu_count() or 1) * 2)
+
+# 单个文件探测超时（秒）
+PROBE_TIMEOUT = 30
+
+_DURATION_RE = re.compile(r"Duration:\s*(\d+):(\d+):(\d+(?:\.\d+)?)")
+
+
+def _wav_duration(path):
+    with wave.open(str(path), "rb") as f:
+        return f.getnframes() / float(f.getframerate())
+
+
+def _ffprobe_duration(path):
+    out = subprocess.run(
+        [
+            "ffprobe",
+            "-v",
+            "error",
+            "-show_entries",
+            "format=duration",
+            "-of",
+            "default=noprint_wrappers=1:nokey=1",
+            str(path),
+        ],
+        capture_output=True,
+        text=True,
+        timeout=PROBE_TIMEOUT,
+    ).stdout
+    return float(out.strip())
+
+
+def _ffmpeg_duration(path):
+    # 没有输出文件时 ffmpeg 以错误退出，但 stderr 中已包含输入文件信息
+    err = subprocess.run(
+        ["ffmpeg", "-hide_banner", "-nostdin", "-i", str(path)],
+        capture_output=True,
+        text=True,
+        errors="ignore",
+        timeout=PROBE_TIMEOUT,
+    ).stderr
+    match = _DURATION_RE.search(err)
+    if match is None:
+        raise ValueError("无法解析时长")
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def probe_duration(path):
+    """读取媒体时长（秒），无法读取时返回 None"""
+    if Path(path).suffix.lower() == ".wav":
+        try:
+            return _wav_duration(path)
+        except (wave.Error, EOFError, OSError):
+            pass  # 非 PCM 的 WAV（例如浮点或压缩格式）交给 ffprobe
+    probe = _ffprobe_duration if shutil.which("ffprobe") else _ffmpeg_duration
+    try:
+        duration = probe(path)
+    except (OSError, ValueError, subprocess.SubprocessError):
+        return None
+    return duration if duration > 0 else None
+
+
+def probe_durations(paths, workers=DEFAULT_PROBE_WORKERS, known=None):
+    """
+    并行探测多个文件的时长
+
+    Args:
+        paths:   文件路径列表
+        workers: 并行线程数
+        known:   已知时长 {路径字符串: 秒}（例如任务清单中记录的），这些文件不再探测
+
+    Returns:
+        dict: {路径: 时长秒数或 None}
+    """
+    known = known or {}
+    durations = {path: known.get(str(path)) for path in paths}
+    todo = [path for path, duration in durations.items() if duration is None]
+    if todo:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for path, duration in zip(todo, pool.map(probe_duration, todo)):
+                durations[path] = duration
+    return durations
+
+
+def format_duration(seconds):
+    """秒数格式化为“1 小时 02 分”“4 分 10 秒”“12 秒”"""
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours} 小时 {minutes:02d} 分"
+    if minutes:
+        return f"{minutes} 分 {secs:02d} 秒"
+    return f"{secs} 秒"
@@ -31,6 +31,8 @@ CONFIG = {
     "model_name": "base",  # 可选: 'tiny', 'base', 'small', 'medium', 'large'
     "language": "auto",  # 自动检测语言
     "transcribe_interval": 2,  # 每2秒转录一次
+    "engine": "whisper",  # 推理引擎: 'whisper', 'ctranslate2'
+    "quantize": False,  # whisper 引擎在 CPU 上使用动态 int8 量化
 }
 
 
@@ -43,7 +45,10 @@ def initialize_system():
     )
 
     transcriber = WhisperTranscriber(
-        model_name=CONFIG["model_name"], language=CONFIG["language"]
+        model_name=CONFIG["model_name"],
+        language=CONFIG["language"],
+        engine=CONFIG["engine"],
+        quantize=CONFIG["quantize"],
     )
 
     logger = TranscriptionLogger(output_dir="recordings")
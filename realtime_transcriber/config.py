@@ -17,6 +17,8 @@ WHISPER_CONFIG = {
     "language": "auto",  # 语言: 'auto', 'zh', 'en', 等
     "transcribe_interval": 2,  # 转录间隔 (秒)
     "use_gpu": False,  # 是否使用GPU加速
+    "engine": "whisper",  # 推理引擎: 'whisper', 'ctranslate2' (faster-whisper int8，CPU 更快)
+    "quantize": False,  # whisper 引擎在 CPU 上使用动态 int8 量化
 }
 
 # Flask应用配置
@@ -96,6 +98,9 @@ def validate_config():
     if WHISPER_CONFIG["model_name"] not in ["tiny", "base", "small", "medium", "large"]:
         issues.append("错误: 无效的模型名称")
 
+    if WHISPER_CONFIG["engine"] not in ["whisper", "ctranslate2"]:
+        issues.append("错误: 无效的推理引擎")
+
     if FLASK_CONFIG["port"] < 1024 or FLASK_CONFIG["port"] > 65535:
         issues.append("错误: 无效的端口号")
 
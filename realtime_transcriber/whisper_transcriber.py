@@ -6,34 +6,78 @@ import whisper
 import numpy as np
 from datetime import datetime
 import os
+import sys
 from pathlib import Path
 
 
+# 上级目录（audio_to_text.py 等所在目录），动态 int8 量化及量化模型缓存复用其中的 engines.py
+PACKAGE_DIR = Path(__file__).resolve().parent.parent
+
+
+def _load_quantized_model(model_name):
+    """加载动态 int8 量化的 Whisper 模型（CPU），与 audio_to_text.py 共用量化模型缓存"""
+    if str(PACKAGE_DIR) not in sys.path:
+        sys.path.append(str(PACKAGE_DIR))
+    from engines import load_quantized_whisper
+
+    return load_quantized_whisper(model_name)
+
+
 class WhisperTranscriber:
-    def __init__(self, model_name="base", language="auto"):
+    def __init__(
+        self, model_name="base", language="auto", engine="whisper", quantize=False
+    ):
         """
         初始化Whisper转录器
 
         Args:
             model_name: 模型大小 ('tiny', 'base', 'small', 'medium', 'large')
             language: 语言代码或'auto'自动检测
+            engine: 推理引擎 ('whisper' 或 'ctranslate2'，后者使用 faster-whisper
+                    int8 推理，CPU 上明显更快)
+            quantize: whisper 引擎在 CPU 上对 Linear 层做动态 int8 量化，
+                      量化后的模型缓存到磁盘，之后加载不再重新转换
         """
         self.model_name = model_name
         self.language = language if language != "auto" else None
+        self.engine = engine
+        self.quantize = quantize
         self.model = self._load_model(model_name)
         self.last_transcript = ""
 
     def _load_model(self, model_name):
         """加载Whisper模型"""
         try:
-            print(f"加载Whisper模型: {model_name}")
-            model = whisper.load_model(model_name)
+            print(f"加载Whisper模型: {model_name} (引擎: {self.engine})")
+            if self.engine == "ctranslate2":
+                from faster_whisper import WhisperModel
+
+                model = WhisperModel(model_name, device="cpu", compute_type="int8")
+            elif self.quantize:
+                model = _load_quantized_model(model_name)
+            else:
+                model = whisper.load_model(model_name)
             print(f"模型加载成功!")
             return model
         except Exception as e:
             print(f"加载模型失败: {e}")
             raise
 
+    def _transcribe_ctranslate2(self, audio, language):
+        """使用 faster-whisper 转录，结果整理为与 openai-whisper 相同的结构"""
+        segments, info = self.model.transcribe(
+            np.asarray(audio, dtype=np.float32), language=language, beam_size=1
+        )
+        segments = [
+            {"id": idx, "start": seg.start, "end": seg.end, "text": seg.text}
+            for idx, seg in enumerate(segments)
+        ]
+        return {
+            "text": "".join(seg["text"] for seg in segments),
+            "segments": segments,
+            "language": info.language,
+        }
+
     def transcribe_audio(self, audio_data, language=None):
         """
         转录音频
@@ -64,7 +108,12 @@ class WhisperTranscriber:
                 # 自动检测语言
                 transcribe_kwargs["language"] = None
 
-            result = self.model.transcribe(audio, **transcribe_kwargs)
+            if self.engine == "ctranslate2":
+                result = self._transcribe_ctranslate2(
+                    audio, transcribe_kwargs["language"]
+                )
+            else:
+                result = self.model.transcribe(audio, **transcribe_kwargs)
 
             return {
                 "text": result["text"].strip(),
@@ -0,0 +1,110 @@
+"""
+说话人分配 - audio_to_text_diarize.py 使用
+为每个分段和每个词分配与其重叠时长最长的说话人，结果与
+whisperx.assign_word_speakers 相同（重叠时长按说话人累加，只统计正重叠；
+并列时与 whisperx 的 groupby("speaker").sum().sort_values(ascending=False)
+相同，取说话人标签排序最靠前的）。
+
+whisperx 对每个分段/词都扫描全部说话人段落（O(n·m)，新版为开始时间早于
+查询结束时间的全部段落）。这里把查询区间和说话人段落都按开始时间排序后扫描一遍：
+段落按开始时间依次进入活动堆，结束时间早于当前查询起点的段落出堆，
+每个查询只与活动堆中的段落比较，总复杂度为 O((n+m) log m)，
+3 小时会议的数万个词也能在一秒内完成
+"""
+
+import heapq
+
+
+def diarize_turns(diarize_segments):
+    """说话人分离结果（DataFrame 或记录列表）转为按开始时间排序的 (start, end, speaker) 列表"""
+    if hasattr(diarize_segments, "columns"):
+        turns = zip(
+            diarize_segments["start"].tolist(),
+            diarize_segments["end"].tolist(),
+            diarize_segments["speaker"].tolist(),
+        )
+    else:
+        turns = ((t["start"], t["end"], t["speaker"]) for t in diarize_segments)
+    # 稳定排序：开始时间相同的段落保持原有顺序（与 whisperx 一致）
+    return sorted(turns, key=lambda turn: turn[0])
+
+
+def max_overlap_speakers(intervals, turns):
+    """
+    为每个查询区间找出重叠时长最长的说话人
+
+    Args:
+        intervals: (start, end) 查询区间列表（顺序任意）
+        turns:     diarize_turns 返回的已排序说话人段落
+
+    Returns:
+        list: 与 intervals 一一对应的说话人，没有重叠时为 None
+    """
+    speakers = [None] * len(intervals)
+    order = sorted(range(len(intervals)), key=lambda i: intervals[i][0])
+    active = []  # (段落结束时间, 段落序号) 小顶堆
+    next_turn = 0
+
+    for i in order:
+        start, end = intervals[i]
+        # 开始时间早于查询结束时间的段落进入活动堆
+        while next_turn < len(turns) and turns[next_turn][0] < end:
+            heapq.heappush(active, (turns[next_turn][1], next_turn))
+            next_turn += 1
+        # 查询按开始时间递增，已经结束的段落之后也不会再重叠
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+
+        overlaps = []
+        for turn_end, j in active:
+            overlap = min(turn_end, end) - max(turns[j][0], start)
+            if overlap > 0:
+                overlaps.append((j, overlap))
+        if not overlaps:
+            continue
+
+        # 按段落顺序累加，保证浮点累加顺序与 whisperx 相同
+        totals = {}
+        for j, overlap in sorted(overlaps):
+            speaker = turns[j][2]
+            totals[speaker] = totals.get(speaker, 0.0) + overlap
+        # 并列时取标签排序最靠前的说话人（groupby 按标签排序，降序排序时并列项保持原顺序）
+        best = max(totals.values())
+        speakers[i] = min(speaker for speaker, total in totals.items() if total == best)
+
+    return speakers
+
+
+def assign_word_speakers(diarize_segments, result):
+    """
+    为转录结果的分段和词分配说话人（原地修改并返回 result），
+    可直接替换 whisperx.assign_word_speakers
+
+    Args:
+        diarize_segments: 说话人分离结果（含 start / end / speaker 列的 DataFrame 或记录列表）
+        result:           转录/对齐结果字典（segments，分段可含 words）
+    """
+    segments = result.get("segments", [])
+    if not segments or diarize_segments is None or len(diarize_segments) == 0:
+        return result
+    turns = diarize_turns(diarize_segments)
+
+    seg_speakers = max_overlap_speakers(
+        [(seg.get("start", 0.0), seg.get("end", 0.0)) for seg in segments], turns
+    )
+    for seg, speaker in zip(segments, seg_speakers):
+        if speaker is not None:
+            seg["speaker"] = speaker
+
+    # 没有时间戳（对齐失败的数字、符号等）的词不分配说话人
+    words = [
+        word for seg in segments for word in seg.get("words", []) if "start" in word
+    ]
+    word_speakers = max_overlap_speakers(
+        [(word["start"], word.get("end", word["start"])) for word in words], turns
+    )
+    for word, speaker in zip(words, word_speakers):
+        if speaker is not None:
+            word["speaker"] = speaker
+
+    return result
@@ -0,0 +1,102 @@
+"""
+说话人识别流程的阶段产物 - audio_to_text_diarize.py 使用
+把各阶段的输出（原始转录分段、对齐后的分段、说话人分离结果）分别保存为
+JSON 旁路文件，以输入文件（路径、大小、修改时间）和影响该阶段结果的选项为键。
+重新运行时从第一个缺失的阶段开始：例如只修改 --min-speakers 时，
+转录和对齐直接读取已有产物，只重新运行说话人分离和说话人分配
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+# 阶段产物默认保存在音频文件所在目录下的该子目录中
+DEFAULT_STAGE_DIRNAME = ".diarize_stages"
+
+# 各阶段的名称
+STAGE_LABELS = {"asr": "转录", "aligned": "对齐", "diarize": "说话人分离"}
+
+
+def input_identity(audio_file):
+    """输入文件标识：绝对路径、文件大小和修改时间（无需解码音频）"""
+    stat = os.stat(audio_file)
+    return f"{os.path.abspath(audio_file)}|{stat.st_size}|{stat.st_mtime_ns}"
+
+
+def stage_key(parent, **options):
+    """由上游标识（输入文件或上一阶段的键）和本阶段选项生成键"""
+    payload = json.dumps([parent, options], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _json_default(value):
+    """numpy 标量/数组等无法直接序列化的值转为 Python 原生类型"""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    raise TypeError(f"无法序列化的类型: {type(value).__name__}")
+
+
+class StageArtifacts:
+    """
+    单个输入文件的阶段产物读写，enabled=False 时不读也不写
+
+    用法:
+        artifacts = StageArtifacts(audio_file)
+        result = artifacts.load("asr", key)
+        if result is None:
+            ...
+            artifacts.save("asr", key, result)
+    """
+
+    def __init__(self, audio_file, stage_dir=None, enabled=True):
+        audio_path = Path(audio_file)
+        self.stem = audio_path.stem
+        self.stage_dir = (
+            Path(stage_dir) if stage_dir else audio_path.parent / DEFAULT_STAGE_DIRNAME
+        )
+        self.enabled = enabled
+        # 本次运行中复用了已有产物的阶段
+        self.reused = []
+
+    def path(self, stage, key):
+        """产物文件路径：<文件名>.<阶段>.<键前缀>.json"""
+        return self.stage_dir / f"{self.stem}.{stage}.{key[:16]}.json"
+
+    def load(self, stage, key):
+        """读取阶段产物，不存在、键不一致或损坏时返回 None"""
+        path = self.path(stage, key)
+        if not self.enabled or not path.exists():
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                artifact = json.load(f)
+            if artifact.get("key") != key:
+                return None
+            data = artifact["data"]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"⚠ 读取阶段产物失败（将重新运行该阶段）: {e}")
+            return None
+        self.reused.append(stage)
+        print(f"✓ 复用已保存的{STAGE_LABELS.get(stage, stage)}结果: {path}")
+        return data
+
+    def save(self, stage, key, data):
+        """原子地保存阶段产物（先写临时文件再替换），失败时只打印警告"""
+        if not self.enabled:
+            return
+        path = self.path(stage, key)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"stage": stage, "key": key, "data": data},
+                    f,
+                    ensure_ascii=False,
+                    default=_json_default,
+                )
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"⚠ 保存阶段产物失败: {e}")
+            Path(tmp_path).unlink(missing_ok=True)
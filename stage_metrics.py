@@ -0,0 +1,177 @@
+"""
+转录各阶段耗时与资源统计
+transcribe_audio / transcribe_with_diarization 用 StageTimer 记录每个阶段
+（GPU 检测、模型加载、解码、推理、繁简转换、CSV 写入等）的耗时和内存快照，
+每个文件输出一条 JSON Lines 记录；batch_transcribe.py 汇总一次运行内的记录，
+给出各阶段耗时的分位数
+"""
+
+import json
+import math
+import os
+import resource
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+
+
+def current_rss_mb():
+    """当前进程常驻内存（MB）"""
+    try:
+        with open("/proc/self/statm", "r") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError, IndexError):
+        return peak_rss_mb()
+
+
+def peak_rss_mb():
+    """进程峰值常驻内存（MB）"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def gpu_peak_mb():
+    """GPU 显存峰值（MB）；未加载 torch 或无 GPU 时返回 None"""
+    torch = sys.modules.get("torch")
+    if torch is None or not torch.cuda.is_available():
+        return None
+    return torch.cuda.max_memory_allocated() / 1024 / 1024
+
+
+def stage(timer, name):
+    """timer 为 None 时不计时的便捷写法"""
+    return timer.stage(name) if timer is not None else nullcontext()
+
+
+class StageTimer:
+    """
+    阶段计时器
+
+    用法:
+        timer = StageTimer(audio_file, model="turbo")
+        with timer.stage("decode"):
+            ...
+        timer.write("metrics.jsonl")
+    """
+
+    def __init__(self, audio_file, **meta):
+        self.audio_file = str(audio_file)
+        self.meta = meta
+        self.stages = {}
+        self.memory_mb = {}
+        self.error = None
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        """累计记录一个阶段的耗时（同名阶段多次进入时累加），结束时记录内存快照"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - start
+            self.memory_mb[name] = round(current_rss_mb(), 1)
+
+    def fail(self, error):
+        self.error = f"{type(error).__name__}: {error}"
+
+    def record(self):
+        """生成本文件的统计记录"""
+        total = time.perf_counter() - self._start
+        audio_seconds = self.meta.get("audio_seconds")
+        record = {
+            "file": self.audio_file,
+            "status": "error" if self.error else "ok",
+            "error": self.error,
+            "timestamp": time.time(),
+            "pid": os.getpid(),
+            "total_seconds": round(total, 4),
+            "rtf": round(total / audio_seconds, 4) if audio_seconds else None,
+            "stages": {name: round(sec, 4) for name, sec in self.stages.items()},
+            "memory_mb": self.memory_mb,
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "gpu_peak_mb": gpu_peak_mb(),
+        }
+        record.update(self.meta)
+        return record
+
+    def write(self, metrics_out):
+        """以 JSON Lines 追加写入（单次 write，多个进程同时追加也不会交错）"""
+        line = json.dumps(self.record(), ensure_ascii=False) + "\n"
+        with open(metrics_out, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+def load_records(metrics_out, since=None):
+    """读取 JSON Lines 记录，可只保留 since 时间戳之后的记录"""
+    records = []
+    if not os.path.exists(metrics_out):
+        return records
+    with open(metrics_out, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if since is None or record.get("timestamp", 0) >= since:
+                records.append(record)
+    return records
+
+
+def percentile(values, q):
+    """线性插值分位数（q 取 0-100）"""
+    values = sorted(values)
+    if not values:
+        return None
+    pos = (len(values) - 1) * q / 100
+    lo, hi = math.floor(pos), math.ceil(pos)
+    return values[lo] + (values[hi] - values[lo]) * (pos - lo)
+
+
+def summarize(records, quantiles=(50, 90, 99)):
+    """
+    汇总多条记录：各阶段耗时的分位数、均值和总和
+
+    Returns:
+        dict: {"files", "failed", "audio_seconds", "total_seconds", "stages": {...}}
+    """
+    stage_values = {}
+    for record in records:
+        for name, seconds in record.get("stages", {}).items():
+            stage_values.setdefault(name, []).append(seconds)
+        stage_values.setdefault("total", []).append(record.get("total_seconds", 0.0))
+
+    stages = {}
+    for name, values in stage_values.items():
+        stats = {f"p{q}": round(percentile(values, q), 4) for q in quantiles}
+        stats["mean"] = round(sum(values) / len(values), 4)
+        stats["sum"] = round(sum(values), 4)
+        stats["count"] = len(values)
+        stages[name] = stats
+
+    return {
+        "files": len(records),
+        "failed": sum(1 for r in records if r.get("status") != "ok"),
+        "audio_seconds": round(sum(r.get("audio_seconds") or 0 for r in records), 2),
+        "peak_rss_mb": max((r.get("peak_rss_mb") or 0 for r in records), default=0),
+        "stages": stages,
+    }
+
+
+def print_summary(summary):
+    """打印汇总表"""
+    print(f"\n各阶段耗时统计（{summary['files']} 个文件，失败 {summary['failed']} 个）:")
+    print(f"  {'阶段':<14}{'p50':>9}{'p90':>9}{'p99':>9}{'均值':>9}{'合计':>10}")
+    for name, stats in sorted(
+        summary["stages"].items(), key=lambda item: -item[1]["sum"]
+    ):
+        print(
+            f"  {name:<14}{stats['p50']:>9.2f}{stats['p90']:>9.2f}"
+            f"{stats['p99']:>9.2f}{stats['mean']:>9.2f}{stats['sum']:>10.1f}"
+        )
+    print(f"  峰值内存: {summary['peak_rss_mb']:.0f} MB")
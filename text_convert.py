@@ -0,0 +1,177 @@
+"""
+繁体转简体 - audio_to_text.py 与 audio_to_text_diarize.py 共用
+opencc-python-reimplemented 每次转换都要为每个片段建解析树、逐个长度查字典，
+大量分段时很慢。这里在首次使用时把它的 t2s 词典（TSPhrases / TSCharacters）
+编译一次：单字映射编译为 str.translate 转换表，词组编译为字典树（trie），
+转换结果与 OpenCC("t2s").convert 完全相同；整份转录的分段文本一次传入，
+重复的句子（“嗯”“谢谢”以及幻觉重复）只转换一次
+
+未安装 opencc-python-reimplemented（例如安装的是 C++ 版 opencc）时使用
+OpenCC("t2s").convert，再退而使用 zhconv，两者同样带有结果缓存
+"""
+
+import re
+from functools import lru_cache
+from pathlib import Path
+
+# 单条文本转换结果的缓存条数
+MEMO_SIZE = 65536
+
+# opencc-python-reimplemented 的分句符：分句符本身不转换，词组也不含这些字符
+_SPLIT_RE = re.compile(
+    r"(\s+|-|,|\.|\?|!|\*|　|，|。|、|；|：|？|！|…|“|”|‘|’|『|』|「|」|﹁|﹂|—|－|（|）"
+    r"|《|》|〈|〉|～|．|／|＼|︒|︑|︔|︓|︿|﹀|︹|︺|︙|︐|［|﹇|］|﹈|︕|︖|︰|︳|︴|︽|︾|︵|︶"
+    r"|｛|︷|｝|︸|﹃|﹄|【|︻|】|︼)"
+)
+
+# 字典树中表示“到此为一个完整词组”的键
+_END = ""
+
+# 转换函数（首次需要时才构建；False 表示未安装任何转换库）
+_converter = None
+
+
+def _read_dictionary(path):
+    """读取 OpenCC 文本词典：每行“繁体\\t简体 [其他候选]”，多个候选时取第一个"""
+    mapping = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            key, _, value = line.rstrip("\n").partition("\t")
+            if key and value:
+                mapping[key] = value.split(" ")[0]
+    return mapping
+
+
+class CompiledConverter:
+    """
+    预编译的繁体转简体转换器
+
+    词组匹配规则与 opencc-python-reimplemented 相同：先取最长的词组
+    （同样长度取最左边），再分别处理其左右两侧；未被词组覆盖的字逐字查单字表
+    """
+
+    def __init__(self, phrases, characters):
+        # 分句符原样保留（OpenCC 不转换分句符）
+        self.table = str.maketrans(
+            {k: v for k, v in characters.items() if not _SPLIT_RE.fullmatch(k)}
+        )
+        self.trie = {}
+        for key, value in phrases.items():
+            node = self.trie
+            for ch in key:
+                node = node.setdefault(ch, {})
+            node[_END] = value
+        # 在 C 层查找词组出现的位置：不含任何词组的分段（绝大多数）整段查表即可
+        self.phrase_re = re.compile(
+            "|".join(map(re.escape, sorted(phrases, key=len, reverse=True)))
+        )
+
+    @classmethod
+    def from_opencc(cls):
+        """从 opencc-python-reimplemented 自带的词典构建，未安装时返回 None"""
+        try:
+            import opencc
+        except ImportError:
+            return None
+        dictionary_dir = Path(opencc.__file__).parent / "dictionary"
+        phrases = dictionary_dir / "TSPhrases.txt"
+        characters = dictionary_dir / "TSCharacters.txt"
+        if not (phrases.exists() and characters.exists()):
+            return None
+        return cls(_read_dictionary(phrases), _read_dictionary(characters))
+
+    def _matches(self, text):
+        """找出文本中所有词组出现的位置 (开始, 结束, 简体)，包括互相重叠的"""
+        matches = []
+        found = self.phrase_re.search(text)
+        while found is not None:
+            # 从该位置沿字典树找出所有长度的词组，再从下一个字继续查找
+            i = found.start()
+            node = self.trie
+            for j in range(i, len(text)):
+                node = node.get(text[j])
+                if node is None:
+                    break
+                if _END in node:
+                    matches.append((i, j + 1, node[_END]))
+            found = self.phrase_re.search(text, i + 1)
+        return matches
+
+    def convert(self, text):
+        matches = self._matches(text)
+        if not matches:
+            return text.translate(self.table)
+
+        # 长的优先，同样长度左边优先；与已选词组重叠的跳过。
+        # 词组不含分句符，不同分句片段中的词组互不重叠，
+        # 因此在整段上选择与 OpenCC 逐个片段选择的结果相同
+        matches.sort(key=lambda m: (m[0] - m[1], m[0]))
+        taken = [False] * len(text)
+        chosen = []
+        for start, end, value in matches:
+            if not any(taken[start:end]):
+                taken[start:end] = [True] * (end - start)
+                chosen.append((start, end, value))
+        chosen.sort()
+
+        parts, pos = [], 0
+        for start, end, value in chosen:
+            parts.append(text[pos:start].translate(self.table))
+            parts.append(value)
+            pos = end
+        parts.append(text[pos:].translate(self.table))
+        return "".join(parts)
+
+
+def _build_converter():
+    """按优先级构建转换函数：预编译的 OpenCC 词典 > OpenCC > zhconv"""
+    compiled = CompiledConverter.from_opencc()
+    if compiled is not None:
+        return compiled.convert
+    try:
+        from opencc import OpenCC
+
+        return OpenCC("t2s").convert
+    except ImportError:
+        pass
+    try:
+        import zhconv
+
+        return lambda text: zhconv.convert(text, "zh-cn")
+    except ImportError:
+        return False
+
+
+def get_converter():
+    """返回繁体转简体的转换函数（带结果缓存），未安装 opencc / zhconv 时返回 None"""
+    global _converter
+    if _converter is None:
+        converter = _build_converter()
+        _converter = lru_cache(maxsize=MEMO_SIZE)(converter) if converter else False
+    return _converter or None
+
+
+def convert_to_simplified(text):
+    """将文本转换为简体中文"""
+    converter = get_converter()
+    return converter(text) if converter else text
+
+
+def convert_texts(texts):
+    """
+    批量转换为简体中文：词典只构建一次，重复的文本只转换一次
+
+    Args:
+        texts: 文本列表（例如整份转录的分段文本）
+
+    Returns:
+        list: 转换后的文本，顺序与输入相同；未安装转换库时原样返回
+    """
+    converter = get_converter()
+    if not converter:
+        return list(texts)
+    converted = {}
+    for text in texts:
+        if text not in converted:
+            converted[text] = converter(text)
+    return [converted[text] for text in texts]
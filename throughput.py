@@ -0,0 +1,132 @@
+"""
+批量转录吞吐量估计与历史记录 - batch_transcribe.py 使用
+实时率（RTF）= 墙钟时间 / 音频时长。运行中按最近完成的若干个文件滚动估计
+（多个工作进程并行时自然反映整体吞吐量），据此给出预计剩余时间；
+还没有文件完成时使用历史记录中相同模型/引擎/进程数最近几次运行的中位数。
+每次批量运行结束后在历史文件中追加一行 JSON
+"""
+
+import json
+import os
+import statistics
+import time
+from collections import deque
+from pathlib import Path
+
+from media_probe import format_duration
+
+# 默认历史记录文件（与转录缓存同一目录）
+DEFAULT_HISTORY = Path.home() / ".cache" / "audio_to_text" / "throughput.jsonl"
+
+# 滚动估计使用的最近完成文件数
+DEFAULT_WINDOW = 20
+
+# 先验估计使用的最近运行次数
+PRIOR_RUNS = 5
+
+
+def load_history(path=DEFAULT_HISTORY):
+    """读取历史记录（每行一个 JSON），文件不存在时返回空列表"""
+    if not os.path.exists(path):
+        return []
+    records = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return records
+
+
+def prior_rtf(records, model, engine, **config):
+    """
+    历史实时率：优先取模型/引擎及其余配置（量化、运行方式、进程数）都相同的
+    最近几次运行的中位数，没有时放宽为只要求模型和引擎相同；都没有时返回 None
+    """
+
+    def matching(**key):
+        return [
+            r["rtf"]
+            for r in records
+            if r.get("rtf") and all(r.get(k) == v for k, v in key.items())
+        ][-PRIOR_RUNS:]
+
+    rtfs = matching(model=model, engine=engine, **config)
+    if not rtfs:
+        rtfs = matching(model=model, engine=engine)
+    return statistics.median(rtfs) if rtfs else None
+
+
+def append_history(path, record):
+    """追加一条运行记录"""
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+class EtaEstimator:
+    """
+    按已完成文件的音频时长滚动估计实时率和剩余时间
+
+    Args:
+        durations: {文件: 时长秒数或 None}，时长未知的文件按已知文件的平均时长计算
+        prior_rtf: 还没有文件完成时使用的实时率（例如历史记录）
+        window:    滚动估计使用的最近完成文件数
+    """
+
+    def __init__(self, durations, prior_rtf=None, window=DEFAULT_WINDOW):
+        known = [d for d in durations.values() if d]
+        fallback = sum(known) / len(known) if known else 0.0
+        self.durations = {str(f): d or fallback for f, d in durations.items()}
+        self.total = sum(self.durations.values())
+        self.prior_rtf = prior_rtf
+        self.done_audio = 0.0
+        self.success_audio = 0.0
+        self.started = time.time()
+        self._recent = deque(maxlen=window + 1)  # (完成时间, 音频秒数)
+        self._recent.append((self.started, 0.0))
+
+    @property
+    def remaining(self):
+        return max(self.total - self.done_audio, 0.0)
+
+    def rtf(self):
+        """最近完成的文件的实时率：两次完成之间的墙钟时间 / 期间完成的音频时长"""
+        audio = sum(a for _, a in list(self._recent)[1:])
+        if audio <= 0:
+            return self.prior_rtf
+        return (self._recent[-1][0] - self._recent[0][0]) / audio
+
+    def eta(self):
+        """预计剩余秒数，无法估计时返回 None"""
+        rtf = self.rtf()
+        return None if rtf is None else self.remaining * rtf
+
+    def complete(self, media_file, error=None, duration=None):
+        """
+        记录一个文件完成（失败的文件同样计入已处理的音频），返回进度说明
+
+        duration 为转录结果中的实际时长，给出时替换探测（或估计）的时长
+        """
+        audio = self.durations.get(str(media_file), 0.0)
+        if duration:
+            self.total += duration - audio
+            self.durations[str(media_file)] = audio = duration
+        self.done_audio += audio
+        if error is None:
+            self.success_audio += audio
+        self._recent.append((time.time(), audio))
+        return self.describe()
+
+    def describe(self):
+        """进度说明：已完成音频、比例、实时率和预计剩余时间"""
+        percent = 100.0 * self.done_audio / self.total if self.total else 100.0
+        text = (
+            f"已完成 {format_duration(self.done_audio)} / {format_duration(self.total)} 音频"
+            f" ({percent:.0f}%)"
+        )
+        rtf = self.rtf()
+        if rtf is not None:
+            text += f"，实时率 {rtf:.3f}，预计剩余 {format_duration(self.eta())}"
+        return text
@@ -0,0 +1,140 @@
+"""
+按内容寻址的转录结果缓存
+以解码后 PCM 的内容哈希 + 模型/语言/提示词/繁简转换等选项为键，
+把完整的分段列表存入缓存目录下的 SQLite 数据库。同一段录音被复制、
+改名或重新封装后再次转录时直接命中缓存，无需加载模型。
+缓存有总大小和条目数上限，超出时按最近最少使用（LRU）淘汰
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+# 默认缓存目录与容量上限
+DEFAULT_CACHE_DIR = Path.home() / ".cache" / "audio_to_text"
+DEFAULT_MAX_MB = 2048
+DEFAULT_MAX_ENTRIES = 100000
+
+
+def audio_fingerprint(audio):
+    """解码后 PCM 的内容哈希（与文件名、容器格式无关）"""
+    pcm = np.ascontiguousarray(audio, dtype=np.float32)
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(str(len(pcm)).encode())
+    digest.update(memoryview(pcm).cast("B"))
+    return digest.hexdigest()
+
+
+def make_key(fingerprint, **options):
+    """由音频指纹和影响转录结果的选项生成缓存键"""
+    payload = json.dumps([fingerprint, options], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TranscriptCache:
+    """
+    转录结果缓存（SQLite）
+
+    用法:
+        with TranscriptCache(cache_dir) as cache:
+            result = cache.get(key)
+            if result is None:
+                ...
+                cache.put(key, result)
+    """
+
+    def __init__(
+        self,
+        cache_dir=DEFAULT_CACHE_DIR,
+        max_mb=DEFAULT_MAX_MB,
+        max_entries=DEFAULT_MAX_ENTRIES,
+    ):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.max_entries = max_entries
+
+        # 多个工作进程可能同时读写同一个缓存
+        self._conn = sqlite3.connect(
+            str(self.cache_dir / "transcripts.sqlite3"), timeout=30
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS transcripts (
+                key         TEXT PRIMARY KEY,
+                payload     BLOB NOT NULL,
+                size_bytes  INTEGER NOT NULL,
+                created_at  REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_last_access ON transcripts(last_access)"
+        )
+        self._conn.commit()
+
+    def get(self, key):
+        """读取缓存结果，未命中返回 None；命中时刷新最近访问时间"""
+        row = self._conn.execute(
+            "SELECT payload FROM transcripts WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        with self._conn:
+            self._conn.execute(
+                "UPDATE transcripts SET last_access = ? WHERE key = ?",
+                (time.time(), key),
+            )
+        return json.loads(zlib.decompress(row[0]).decode("utf-8"))
+
+    def put(self, key, result):
+        """写入转录结果（JSON 可序列化的字典），随后按容量上限淘汰"""
+        payload = zlib.compress(
+            json.dumps(result, ensure_ascii=False).encode("utf-8")
+        )
+        now = time.time()
+        with self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), now, now),
+            )
+        self.evict()
+
+    def evict(self):
+        """超出总大小或条目数上限时，按最近访问时间从旧到新删除"""
+        total_bytes, count = self._conn.execute(
+            "SELECT COALESCE(SUM(size_bytes), 0), COUNT(*) FROM transcripts"
+        ).fetchone()
+        if total_bytes <= self.max_bytes and count <= self.max_entries:
+            return 0
+
+        removed = 0
+        rows = self._conn.execute(
+            "SELECT key, size_bytes FROM transcripts ORDER BY last_access ASC"
+        ).fetchall()
+        with self._conn:
+            for key, size_bytes in rows:
+                if total_bytes <= self.max_bytes and count <= self.max_entries:
+                    break
+                self._conn.execute("DELETE FROM transcripts WHERE key = ?", (key,))
+                total_bytes -= size_bytes
+                count -= 1
+                removed += 1
+        return removed
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
@@ -0,0 +1,401 @@
+"""
+列式转录输出（Parquet / Arrow）- audio_to_text.py、audio_to_text_diarize.py
+与 batch_transcribe.py 共用
+
+分段以列式表格保存：start_time / end_time / duration / start_timestamp /
+end_timestamp / [speaker] / text，外加 file、model、language 等元数据列。
+时间戳列是由秒数整列换算的 duration[ms] 类型（不逐行格式化字符串），
+大量转录结果可以直接用 pyarrow / pandas / DuckDB 读取分析。
+
+ColumnarSegmentWriter 的接口与 transcript_io.SegmentWriter 相同：Parquet 每批
+追加一个 row group 并更新断点日志，进程被终止时从恢复日志恢复已写入的批次；
+断点日志不可用时读取 end_time 列的最大值即可续传。
+
+依赖（可选）:
+    pip install pyarrow
+"""
+
+import hashlib
+import os
+import time
+from pathlib import Path
+
+import numpy as np
+
+from transcript_io import DEFAULT_FSYNC_INTERVAL, rebuild_journal, write_journal
+
+# 输出格式与对应的扩展名
+OUTPUT_FORMATS = ("csv", "parquet", "arrow")
+OUTPUT_SUFFIXES = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow"}
+
+# 识别为列式输出的扩展名
+_COLUMNAR_SUFFIXES = {".parquet": "parquet", ".arrow": "arrow", ".feather": "arrow"}
+
+# Parquet 流式写入的恢复日志扩展名（见 ColumnarSegmentWriter）
+RECOVERY_SUFFIX = ".rows.arrows"
+
+# 批量数据集的分区列（hive 风格目录：model=turbo/language=zh/）
+DATASET_PARTITIONS = ("model", "language")
+
+
+def require_pyarrow():
+    """导入 pyarrow，未安装时给出安装提示"""
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("未安装 pyarrow，请运行: pip install pyarrow")
+    return pyarrow
+
+
+def resolve_format(output_file, output_format="csv"):
+    """输出文件扩展名为 .parquet / .arrow / .feather 时以扩展名为准，否则使用 output_format"""
+    if output_file is not None:
+        suffix_format = _COLUMNAR_SUFFIXES.get(Path(output_file).suffix.lower())
+        if suffix_format:
+            return suffix_format
+    return output_format or "csv"
+
+
+def segments_table(rows, **metadata):
+    """
+    把分段行（build_rows 的输出，不需要字符串时间戳）转为 Arrow 表
+
+    Args:
+        rows:     分段字典列表（start_time / end_time / text，可含 speaker）
+        metadata: 每行相同的元数据列（file、model、language 等），字典编码保存
+    """
+    pa = require_pyarrow()
+
+    n = len(rows)
+    start = np.fromiter((row["start_time"] for row in rows), np.float64, n)
+    end = np.fromiter((row["end_time"] for row in rows), np.float64, n)
+    columns = {
+        "start_time": start,
+        "end_time": end,
+        "duration": np.round(end - start, 3),
+        "start_timestamp": pa.array(
+            np.round(start * 1000).astype(np.int64), pa.duration("ms")
+        ),
+        "end_timestamp": pa.array(np.round(end * 1000).astype(np.int64), pa.duration("ms")),
+    }
+    if rows and "speaker" in rows[0]:
+        columns["speaker"] = pa.array(
+            [row["speaker"] for row in rows], pa.string()
+        ).dictionary_encode()
+    columns["text"] = pa.array([row["text"] for row in rows], pa.string())
+    for name, value in metadata.items():
+        columns[name] = pa.array(
+            [None if value is None else str(value)] * n, pa.string()
+        ).dictionary_encode()
+    return pa.table(columns)
+
+
+def read_table(path):
+    """读取 Parquet / Arrow 转录文件"""
+    require_pyarrow()
+    if resolve_format(path) == "parquet":
+        import pyarrow.parquet as pq
+
+        return pq.read_table(path)
+    import pyarrow.feather as feather
+
+    return feather.read_table(path)
+
+
+def _tmp_path(path):
+    """原子写入使用的临时文件（与目标文件同目录）"""
+    path = Path(path)
+    return path.with_name(f"{path.name}.{os.getpid()}.tmp")
+
+
+def _write_file(table, path, output_format):
+    """写入 Parquet / Arrow 文件（zstd 压缩，非原子）"""
+    if output_format == "parquet":
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, path, compression="zstd")
+    else:
+        import pyarrow.feather as feather
+
+        feather.write_feather(table, path, compression="zstd")
+
+
+def write_table(table, path):
+    """原子地写入 Parquet / Arrow 文件（zstd 压缩）"""
+    require_pyarrow()
+    tmp_path = _tmp_path(path)
+    try:
+        _write_file(table, tmp_path, resolve_format(path))
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def conform_table(table, schema):
+    """按 schema 调整表的列顺序和类型，缺少的列补空值"""
+    pa = require_pyarrow()
+    columns = [
+        table.column(field.name).cast(field.type)
+        if field.name in table.column_names
+        else pa.nulls(len(table), field.type)
+        for field in schema
+    ]
+    return pa.table(columns, schema=schema)
+
+
+def read_last_end_time(path):
+    """读取列式转录文件中最后的结束时间（只读取 end_time 一列）"""
+    if not os.path.exists(path):
+        return 0.0
+    try:
+        if resolve_format(path) == "parquet":
+            import pyarrow.parquet as pq
+
+            column = pq.read_table(path, columns=["end_time"]).column("end_time")
+        else:
+            column = read_table(path).column("end_time")
+        return float(max(column.to_pylist(), default=0.0))
+    except Exception as e:
+        print(f"⚠ 读取现有文件失败: {e}")
+        return 0.0
+
+
+def recovery_path(output_file):
+    """Parquet 流式写入的恢复日志路径：<输出文件>.rows.arrows（Arrow IPC 流）"""
+    return f"{output_file}{RECOVERY_SUFFIX}"
+
+
+def recover_interrupted(output_file):
+    """
+    上次写入 Parquet 时进程被终止（文件尾部的元数据未写入，文件不可读）：
+    从恢复日志中读出全部完整的批次，原子地重写输出文件并重建断点日志
+
+    Returns:
+        bool: 是否进行了恢复
+    """
+    path = recovery_path(output_file)
+    if not os.path.exists(path):
+        return False
+    pa = require_pyarrow()
+    import pyarrow.ipc as ipc
+
+    batches = []
+    try:
+        with open(path, "rb") as f:
+            # 最后一个批次可能只写入了一部分，读到不完整的消息时停止
+            for batch in ipc.open_stream(f):
+                batches.append(batch)
+    except (pa.ArrowInvalid, OSError):
+        pass
+    # 恢复日志在截断输出文件之前已写入并落盘，没有完整批次时输出文件未被改动
+    if batches:
+        table = pa.Table.from_batches(batches)
+        write_table(table, output_file)
+        end_time = float(max(table.column("end_time").to_pylist(), default=0.0))
+        rebuild_journal(output_file, end_time, table.num_rows)
+        print(f"⚠ 上次写入被中断，已从恢复日志恢复 {table.num_rows} 个分段: {output_file}")
+    os.remove(path)
+    return bool(batches)
+
+
+class ColumnarSegmentWriter:
+    """
+    列式分段写入器（Parquet / Arrow），接口与 transcript_io.SegmentWriter 相同
+
+    Parquet 输出用 ParquetWriter 直接写入输出文件，每次 write() 追加一个 row group，
+    不重写已写入的内容，并更新断点日志。Parquet 的元数据在文件尾部，关闭前文件
+    不可读，因此各批次同时追加到恢复日志（Arrow IPC 流，可以读出被截断前的完整
+    批次），进程被终止后由 recover_interrupted 恢复；close() 后删除恢复日志。
+
+    Arrow 文件格式每个字典列只能有一个字典，无法逐批追加：每次 write() 原子地
+    重写整个文件，只适合一次写入（不支持 --stream）
+
+    用法:
+        with ColumnarSegmentWriter(output_file, file="a.mp3", model="turbo") as writer:
+            writer.write(rows, language="zh")
+    """
+
+    def __init__(
+        self,
+        output_file,
+        fsync_interval=DEFAULT_FSYNC_INTERVAL,
+        journal_fields=None,
+        **metadata,
+    ):
+        self.output_file = str(output_file)
+        self.fsync_interval = fsync_interval
+        # 每次更新断点日志时一并写入的字段（例如生成这些分段时使用的选项）
+        self.journal_fields = journal_fields or {}
+        self.metadata = metadata
+        self.rows_written = 0
+        self.end_time = None
+        self._parquet = resolve_format(self.output_file) == "parquet"
+        self._schema = None
+        self._table = None  # Arrow: 已写入的全部内容
+        self._writer = None  # Parquet: 打开的 ParquetWriter
+        self._log = None  # Parquet: 恢复日志的 (文件, RecordBatchStreamWriter)
+        self._last_sync = time.monotonic()
+
+    def _open(self, table):
+        """首次写入：续传时先写入已有内容，返回本次要写入的表"""
+        pa = require_pyarrow()
+        recover_interrupted(self.output_file)
+        if os.path.exists(self.output_file):
+            # 续传：保留已有内容，列类型以合并后的表为准
+            table = pa.concat_tables(
+                [read_table(self.output_file), table], promote_options="permissive"
+            )
+        self._schema = table.schema
+        if self._parquet:
+            import pyarrow.ipc as ipc
+            import pyarrow.parquet as pq
+
+            # 先让恢复日志包含全部内容并落盘，再截断输出文件
+            log_file = open(recovery_path(self.output_file), "wb")
+            self._log = (log_file, ipc.new_stream(log_file, self._schema))
+            self._log[1].write_table(table)
+            self._sync()
+            self._writer = pq.ParquetWriter(
+                self.output_file, self._schema, compression="zstd"
+            )
+        return table
+
+    def write(self, rows, **metadata):
+        """追加一批分段；metadata 为本批次的元数据列（例如检测到的语言）"""
+        if not rows:
+            return
+        pa = require_pyarrow()
+        table = segments_table(rows, **{**self.metadata, **metadata})
+        if self._schema is None:
+            table = self._open(table)
+        else:
+            table = conform_table(table, self._schema)
+            if self._parquet:
+                self._log[1].write_table(table)
+
+        if self._parquet:
+            self._writer.write_table(table)
+            self._log[0].flush()
+        else:
+            if self._table is not None:
+                table = pa.concat_tables([self._table, table])
+            write_table(table.unify_dictionaries(), self.output_file)
+            self._table = table
+        self.rows_written += len(rows)
+        self.end_time = float(rows[-1]["end_time"])
+
+        sync = self._parquet and time.monotonic() - self._last_sync >= self.fsync_interval
+        if sync:
+            self._sync()
+        self._update_journal(sync)
+
+    def _sync(self):
+        self._log[0].flush()
+        os.fsync(self._log[0].fileno())
+        self._last_sync = time.monotonic()
+
+    def _update_journal(self, sync):
+        write_journal(
+            self.output_file,
+            self.end_time,
+            self.rows_written,
+            os.path.getsize(self.output_file),
+            sync,
+            **self.journal_fields,
+        )
+
+    def close(self):
+        """写入 Parquet 文件尾部的元数据，更新断点日志并删除恢复日志"""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+            self._update_journal(True)
+            log_file, stream = self._log
+            self._log = None
+            stream.close()
+            log_file.close()
+            os.remove(recovery_path(self.output_file))
+        self._schema = None
+        self._table = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def open_segment_writer(
+    output_file, fieldnames, output_format="csv", journal_fields=None, **metadata
+):
+    """
+    按输出格式创建分段写入器：CSV 使用 SegmentWriter（元数据不写入 CSV），
+    journal_fields 为每次更新断点日志时一并写入的字段
+    """
+    if output_format == "csv":
+        from transcript_io import SegmentWriter
+
+        return SegmentWriter(output_file, fieldnames, journal_fields=journal_fields)
+    require_pyarrow()
+    return ColumnarSegmentWriter(output_file, journal_fields=journal_fields, **metadata)
+
+
+def dataset_fragments(dataset_dir):
+    """
+    遍历一次数据集目录，返回 {源文件名哈希: [分片路径]}
+
+    批量写入时传给 write_dataset_fragment，每个文件不必再遍历整个数据集目录树
+    """
+    fragments = {}
+    stack = [str(dataset_dir)]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.name.endswith(".parquet"):
+                        name = entry.name.split("-", 1)[0]
+                        fragments.setdefault(name, []).append(entry.path)
+        except FileNotFoundError:
+            continue
+    return fragments
+
+
+def write_dataset_fragment(table, dataset_dir, source_file, fragments=None):
+    """
+    把单个文件的转录结果写入 hive 分区数据集（dataset_dir/model=.../language=.../）
+
+    分区内的文件名由源文件路径生成，重复运行时覆盖同一个文件，不会产生重复数据
+
+    Args:
+        fragments: dataset_fragments 的结果（写入后随之更新）；不提供时遍历数据集目录
+    """
+    require_pyarrow()
+    import pyarrow.dataset as ds
+
+    if fragments is None:
+        fragments = dataset_fragments(dataset_dir)
+    name = hashlib.sha1(os.path.abspath(source_file).encode("utf-8")).hexdigest()[:16]
+    # 分区值（例如检测到的语言）可能与上次不同，先删除该文件之前写入的分片
+    for old in fragments.pop(name, []):
+        if os.path.exists(old):
+            os.remove(old)
+    partitions = [col for col in DATASET_PARTITIONS if col in table.column_names]
+    # 分区列以普通字符串保存在目录名中
+    for col in partitions:
+        idx = table.column_names.index(col)
+        table = table.set_column(idx, col, table.column(col).cast("string"))
+    written = fragments.setdefault(name, [])
+    ds.write_dataset(
+        table,
+        dataset_dir,
+        format="parquet",
+        partitioning=partitions or None,
+        partitioning_flavor="hive" if partitions else None,
+        basename_template=f"{name}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+        file_visitor=lambda written_file: written.append(written_file.path),
+    )
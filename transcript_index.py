@@ -0,0 +1,465 @@
+"""
+转录结果全文检索索引
+把目录下的转录文件（audio_to_text.py / audio_to_text_diarize.py 输出的 CSV，
+以及 Parquet / Arrow 文件）导入 SQLite FTS5 索引，按短语查找所在文件和时间。
+
+中文没有空格分词：索引时把连续的中日韩文字切成重叠的二元组（“转录结果”→
+“转录 录结 结果 果”），查询时按同样方式切分并作为短语（相邻词元）匹配，
+等价于子串查找；英文等按单词索引。繁体字统一转为简体后再索引和查询
+（需安装 opencc-python-reimplemented 或 zhconv，否则原样处理）。
+
+增量更新：按文件大小和修改时间判断，未变化的文件直接跳过，
+已修改的文件重新导入，已删除的文件从索引中移除。
+
+使用方法:
+    python transcript_index.py index D:\\recordings -r
+    python transcript_index.py search "人工智能"
+"""
+
+import argparse
+import csv
+import json
+import os
+import re
+import sqlite3
+import sys
+import time
+from pathlib import Path
+
+from text_convert import convert_to_simplified
+
+# 默认索引数据库
+DEFAULT_DB = "transcript_index.sqlite3"
+
+# 识别为转录结果的文件扩展名
+TRANSCRIPT_SUFFIXES = {".csv", ".parquet", ".arrow", ".feather"}
+
+# 转录文件必须包含的列
+REQUIRED_COLUMNS = {"start_time", "end_time", "text"}
+
+# 中日韩文字（汉字、假名、谚文），按二元组切分
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af"
+_TOKEN_RE = re.compile(f"([{_CJK}]+)|[^\\W{_CJK}]+")
+
+
+def normalize(text):
+    """统一为简体小写，索引和查询使用相同的规则"""
+    return convert_to_simplified(text).lower()
+
+
+def tokenize(text):
+    """
+    切分为索引词元：连续的中日韩文字切成重叠的二元组，并在末尾补上最后一个字
+    （单字查询按前缀匹配时也能找到位于末尾的字）；其他文字按单词切分
+    """
+    tokens = []
+    for match in _TOKEN_RE.finditer(normalize(text)):
+        run = match.group(1)
+        if run is None:
+            tokens.append(match.group(0))
+        elif len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i : i + 2] for i in range(len(run) - 1))
+            tokens.append(run[-1])
+    return tokens
+
+
+def _quote(token):
+    return '"' + token.replace('"', '""') + '"'
+
+
+def build_match(query):
+    """
+    把查询字符串转为 FTS5 MATCH 表达式
+
+    空格分隔的多个词需同时出现（AND）；每个词按索引规则切分后作为短语匹配，
+    单个中文字和以 * 结尾的英文词按前缀匹配
+    """
+    terms = []
+    for word in query.split():
+        prefix = word.endswith("*")
+        phrase = []
+        for match in _TOKEN_RE.finditer(normalize(word.rstrip("*"))):
+            run = match.group(1)
+            if run is None:
+                phrase.append(match.group(0))
+            elif len(run) == 1:
+                phrase.append(run)
+                prefix = True
+            else:
+                phrase.extend(run[i : i + 2] for i in range(len(run) - 1))
+        if not phrase:
+            continue
+        expr = " + ".join(_quote(token) for token in phrase)
+        # FTS5 的前缀只作用于短语的最后一个词元
+        terms.append(expr + ("*" if prefix else ""))
+    return " AND ".join(terms)
+
+
+def iter_transcripts(directory, recursive=False):
+    """
+    用 os.scandir 遍历目录，逐个产出 (转录文件路径, os.stat_result)
+
+    与 batch_transcribe.iter_media_files 相同：只对扩展名匹配的文件取 stat，
+    目录按名称顺序深度优先遍历（不跟随目录符号链接）
+    """
+    directory = Path(directory)
+    if not directory.exists():
+        raise FileNotFoundError(f"目录不存在: {directory}")
+    if not directory.is_dir():
+        raise NotADirectoryError(f"不是目录: {directory}")
+    return _walk_transcripts(str(directory), recursive)
+
+
+def _walk_transcripts(directory, recursive):
+    """iter_transcripts 的遍历部分（目录已检查）"""
+    stack = [directory]
+    while stack:
+        current = stack.pop()
+        files, subdirs = [], []
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive:
+                                subdirs.append(entry.path)
+                        elif os.path.splitext(entry.name)[1].lower() in (
+                            TRANSCRIPT_SUFFIXES
+                        ) and entry.is_file():
+                            files.append((entry.name, entry))
+                    except OSError:
+                        continue
+        except OSError as e:
+            print(f"⚠ 无法读取目录 ({e}): {current}")
+            continue
+
+        for _, entry in sorted(files, key=lambda item: item[0]):
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            yield Path(entry.path), st
+        stack.extend(sorted(subdirs, reverse=True))
+
+
+def find_transcripts(directory, recursive=False):
+    """查找目录下的转录文件（CSV / Parquet / Arrow），按路径排序"""
+    return sorted(path for path, _ in iter_transcripts(directory, recursive=recursive))
+
+
+def read_segments(path):
+    """
+    读取转录文件的分段 (start_ms, end_ms, speaker, text)
+
+    Returns:
+        list；不是转录文件（缺少 start_time / end_time / text 列）时返回 None
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            reader = csv.DictReader(f)
+            if not REQUIRED_COLUMNS.issubset(reader.fieldnames or ()):
+                return None
+            rows = list(reader)
+    else:
+        from transcript_columnar import read_table
+
+        table = read_table(path)
+        if not REQUIRED_COLUMNS.issubset(table.column_names):
+            return None
+        columns = ["start_time", "end_time", "text"]
+        if "speaker" in table.column_names:
+            columns.append("speaker")
+        rows = table.select(columns).to_pylist()
+
+    return [
+        (
+            round(float(row["start_time"]) * 1000),
+            round(float(row["end_time"]) * 1000),
+            row.get("speaker") or None,
+            row["text"] or "",
+        )
+        for row in rows
+    ]
+
+
+def format_ms(ms):
+    """毫秒转为 HH:MM:SS.mmm"""
+    secs, millis = divmod(int(ms), 1000)
+    return f"{secs // 3600:02d}:{secs % 3600 // 60:02d}:{secs % 60:02d}.{millis:03d}"
+
+
+class TranscriptIndex:
+    """
+    转录全文检索索引（SQLite FTS5）
+
+    用法:
+        with TranscriptIndex("transcript_index.sqlite3") as index:
+            index.update("D:/recordings", recursive=True)
+            for hit in index.search("人工智能"):
+                ...
+    """
+
+    def __init__(self, db_path=DEFAULT_DB):
+        self.db_path = str(db_path)
+        self._conn = sqlite3.connect(self.db_path, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS files (
+                id         INTEGER PRIMARY KEY,
+                path       TEXT UNIQUE NOT NULL,
+                size       INTEGER NOT NULL,
+                mtime_ns   INTEGER NOT NULL,
+                segments   INTEGER NOT NULL,
+                indexed_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS segments (
+                id       INTEGER PRIMARY KEY,
+                file_id  INTEGER NOT NULL,
+                start_ms INTEGER NOT NULL,
+                end_ms   INTEGER NOT NULL,
+                speaker  TEXT,
+                text     TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_segments_file ON segments(file_id);
+            CREATE VIRTUAL TABLE IF NOT EXISTS segments_fts
+                USING fts5(tokens, tokenize = 'unicode61 remove_diacritics 2');
+            """
+        )
+
+    def _remove(self, file_id):
+        """删除某个文件的全部分段（FTS 行与分段表按 rowid 对应）"""
+        self._conn.execute(
+            "DELETE FROM segments_fts WHERE rowid IN "
+            "(SELECT id FROM segments WHERE file_id = ?)",
+            (file_id,),
+        )
+        self._conn.execute("DELETE FROM segments WHERE file_id = ?", (file_id,))
+        self._conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+
+    def update(self, directory, recursive=False):
+        """
+        增量更新目录下的转录文件，返回统计字典
+        (added / updated / unchanged / removed / skipped / segments)
+        """
+        stats = dict.fromkeys(
+            ("added", "updated", "unchanged", "removed", "skipped", "segments"), 0
+        )
+        known = {
+            path: (file_id, size, mtime_ns)
+            for file_id, path, size, mtime_ns in self._conn.execute(
+                "SELECT id, path, size, mtime_ns FROM files"
+            )
+        }
+        seen = set()
+
+        for transcript, st in iter_transcripts(directory, recursive=recursive):
+            path = os.path.abspath(transcript)
+            seen.add(path)
+            previous = known.get(path)
+            if previous and previous[1:] == (st.st_size, st.st_mtime_ns):
+                stats["unchanged"] += 1
+                continue
+
+            try:
+                segments = read_segments(path)
+            except Exception as e:
+                print(f"  ⚠ 读取失败 ({e}): {transcript.name}")
+                stats["skipped"] += 1
+                continue
+            if segments is None:
+                # 不是转录文件（例如其他 CSV）
+                stats["skipped"] += 1
+                continue
+
+            # 每个文件一个事务：中断时索引中不会留下半个文件
+            with self._conn:
+                if previous:
+                    self._remove(previous[0])
+                file_id = self._conn.execute(
+                    "INSERT INTO files (path, size, mtime_ns, segments, indexed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (path, st.st_size, st.st_mtime_ns, len(segments), time.time()),
+                ).lastrowid
+                for start_ms, end_ms, speaker, text in segments:
+                    seg_id = self._conn.execute(
+                        "INSERT INTO segments (file_id, start_ms, end_ms, speaker, text) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (file_id, start_ms, end_ms, speaker, text),
+                    ).lastrowid
+                    self._conn.execute(
+                        "INSERT INTO segments_fts (rowid, tokens) VALUES (?, ?)",
+                        (seg_id, " ".join(tokenize(text))),
+                    )
+            stats["updated" if previous else "added"] += 1
+            stats["segments"] += len(segments)
+
+        # 移除该目录下已删除的文件（其他目录的索引不受影响）
+        root = os.path.join(os.path.abspath(directory), "")
+        with self._conn:
+            for path, (file_id, _, _) in known.items():
+                if path.startswith(root) and path not in seen:
+                    if recursive or os.path.dirname(path) == root.rstrip(os.sep):
+                        self._remove(file_id)
+                        stats["removed"] += 1
+        return stats
+
+    def search(self, query, speaker=None, file_pattern=None, limit=50):
+        """
+        查找包含查询短语的分段，按文件和开始时间排序
+
+        Args:
+            query:        查询字符串（空格分隔的多个词需同时出现）
+            speaker:      只返回该说话人的分段（可选）
+            file_pattern: 文件路径需包含的子串（可选）
+            limit:        最多返回条数
+
+        Returns:
+            list[dict]: file / start_ms / end_ms / speaker / text
+        """
+        match = build_match(query)
+        if not match:
+            return []
+        sql = (
+            "SELECT f.path, s.start_ms, s.end_ms, s.speaker, s.text "
+            "FROM segments_fts JOIN segments s ON s.id = segments_fts.rowid "
+            "JOIN files f ON f.id = s.file_id "
+            "WHERE segments_fts MATCH ?"
+        )
+        params = [match]
+        if speaker:
+            sql += " AND s.speaker = ?"
+            params.append(speaker)
+        if file_pattern:
+            sql += " AND instr(f.path, ?) > 0"
+            params.append(file_pattern)
+        sql += " ORDER BY f.path, s.start_ms LIMIT ?"
+        params.append(limit)
+        return [
+            {"file": path, "start_ms": start, "end_ms": end, "speaker": spk, "text": text}
+            for path, start, end, spk, text in self._conn.execute(sql, params)
+        ]
+
+    def stats(self):
+        """索引中的文件数和分段数"""
+        files, segments = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(segments), 0) FROM files"
+        ).fetchone()
+        return {"files": files, "segments": segments}
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+def update_index(db_path, directory, recursive=False):
+    """增量更新索引并打印统计（batch_transcribe.py --index 使用）"""
+    print(f"\n▶ 更新检索索引: {db_path}")
+    with TranscriptIndex(db_path) as index:
+        stats = index.update(directory, recursive=recursive)
+        total = index.stats()
+    print(
+        f"  ✓ 新增 {stats['added']} 个, 更新 {stats['updated']} 个, "
+        f"未变化 {stats['unchanged']} 个, 移除 {stats['removed']} 个, "
+        f"跳过 {stats['skipped']} 个（导入 {stats['segments']} 条分段）"
+    )
+    print(f"  ✓ 索引共 {total['files']} 个文件, {total['segments']} 条分段")
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="转录结果全文检索：把转录 CSV / Parquet 导入 SQLite FTS5 索引并查询",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="""
+使用示例:
+  # 建立 / 增量更新索引（只重新导入大小或修改时间变化的文件）
+  python transcript_index.py index D:\\recordings -r
+  python transcript_index.py index D:\\meetings --db D:\\transcripts.sqlite3
+
+  # 查询短语（中文按字的二元组匹配，繁体自动转为简体）
+  python transcript_index.py search "人工智能"
+  python transcript_index.py search "预算 下季度" --speaker SPEAKER_01
+  python transcript_index.py search "deep learn*" --file 2024 --json
+
+输出:
+  每条结果包含文件、开始/结束时间（毫秒）、说话人和文本
+        """,
+    )
+    parser.add_argument(
+        "--db", default=DEFAULT_DB, help=f"索引数据库文件 (默认: {DEFAULT_DB})"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    index_parser = commands.add_parser("index", help="建立或增量更新索引")
+    index_parser.add_argument("directory", help="转录文件所在目录")
+    index_parser.add_argument(
+        "-r", "--recursive", action="store_true", help="递归遍历子目录"
+    )
+
+    search_parser = commands.add_parser("search", help="查询索引")
+    search_parser.add_argument("query", help="查询内容，空格分隔的多个词需同时出现")
+    search_parser.add_argument("--speaker", help="只返回该说话人的分段")
+    search_parser.add_argument("--file", help="文件路径需包含的子串")
+    search_parser.add_argument(
+        "-n", "--limit", type=int, default=50, help="最多返回条数 (默认: 50)"
+    )
+    search_parser.add_argument(
+        "--json", action="store_true", help="每条结果输出一行 JSON"
+    )
+
+    args = parser.parse_args()
+
+    if args.command == "index":
+        try:
+            update_index(args.db, args.directory, recursive=args.recursive)
+        except (FileNotFoundError, NotADirectoryError) as e:
+            print(f"✗ {e}")
+            return 1
+        return 0
+
+    if not os.path.exists(args.db):
+        print(f"✗ 索引不存在: {args.db}（请先运行 index 命令）")
+        return 1
+    with TranscriptIndex(args.db) as index:
+        try:
+            hits = index.search(
+                args.query, speaker=args.speaker, file_pattern=args.file, limit=args.limit
+            )
+        except sqlite3.OperationalError as e:
+            print(f"✗ 查询失败: {e}")
+            return 1
+
+    if args.json:
+        for hit in hits:
+            sys.stdout.write(json.dumps(hit, ensure_ascii=False) + "\n")
+        return 0
+
+    if not hits:
+        print("⚠ 没有匹配的分段")
+        return 0
+    print(f"✓ 找到 {len(hits)} 条匹配" + ("（已达上限）" if len(hits) == args.limit else ""))
+    current = None
+    for hit in hits:
+        if hit["file"] != current:
+            current = hit["file"]
+            print(f"\n{current}")
+        speaker = f"[{hit['speaker']}] " if hit["speaker"] else ""
+        print(
+            f"  {format_ms(hit['start_ms'])} --> {format_ms(hit['end_ms'])} "
+            f"({hit['start_ms']}-{hit['end_ms']} ms)  {speaker}{hit['text']}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
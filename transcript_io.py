@@ -0,0 +1,245 @@
+"""
+转录分段处理与写入工具 - audio_to_text.py 与 audio_to_text_diarize.py 共用
+时间轴平移、流式窗口边界处理；逐批追加 CSV 分段并定期 fsync，同时维护一个断点日志（journal）旁路文件，
+断点续传时 O(1) 读取上次位置，无需读取整个 CSV
+"""
+
+import csv
+import json
+import os
+import time
+
+# 距离上次 fsync 超过该秒数时强制落盘
+DEFAULT_FSYNC_INTERVAL = 10.0
+
+
+def shift_segments(segments, offset):
+    """将分段（及逐词）时间戳整体平移 offset 秒，映射回原始时间轴"""
+    if not offset:
+        return segments
+    for seg in segments:
+        seg["start"] += offset
+        seg["end"] += offset
+        for word in seg.get("words", []):
+            if "start" in word:
+                word["start"] += offset
+            if "end" in word:
+                word["end"] += offset
+    return segments
+
+
+def trim_window(segments, pos, end, total):
+    """
+    处理窗口边界：窗口末尾的最后一个分段可能被截断，将其丢弃，
+    下一个窗口从它的起点开始（与 Whisper 内部 30 秒窗口的推进方式一致）
+
+    Args:
+        segments: 当前窗口的分段（时间相对窗口起点）
+        pos, end: 当前窗口在音频中的起止时间（秒）
+        total: 音频总时长（秒）
+
+    Returns:
+        (保留的分段, 下一个窗口的起点)
+    """
+    if end >= total or len(segments) <= 1:
+        return segments, end
+    segments = segments[:-1]
+    next_pos = pos + segments[-1]["end"]
+    if next_pos <= pos + 1.0:
+        next_pos = end
+    return segments, next_pos
+
+
+def journal_path(output_file):
+    """断点日志文件路径：<输出文件>.progress.json"""
+    return f"{output_file}.progress.json"
+
+
+def read_journal(output_file):
+    """
+    读取断点日志
+
+    日志中记录了写入时输出文件的字节数，与当前文件大小不一致（文件被修改、
+    或崩溃时日志未及时更新）时视为不可用
+
+    Returns:
+        dict: end_time（上次转录的结束时间）、complete（整个文件已转录完成）等；
+        日志不存在或不可用时返回 None
+    """
+    path = journal_path(output_file)
+    if not os.path.exists(path) or not os.path.exists(output_file):
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            checkpoint = json.load(f)
+        if checkpoint.get("csv_size") != os.path.getsize(output_file):
+            return None
+        checkpoint["end_time"] = float(checkpoint["end_time"])
+        return checkpoint
+    except (OSError, ValueError, KeyError) as e:
+        print(f"⚠ 读取断点日志失败: {e}")
+        return None
+
+
+def update_journal(output_file, end_time, **fields):
+    """
+    在断点日志中合并写入额外字段（以当前输出文件大小为准）
+
+    断点日志不存在或不可用时以 end_time 新建
+    """
+    if not os.path.exists(output_file):
+        return
+    checkpoint = read_journal(output_file) or {}
+    extra = {k: v for k, v in checkpoint.items() if k not in _JOURNAL_KEYS}
+    extra.update(fields)
+    write_journal(
+        output_file,
+        checkpoint.get("end_time", end_time),
+        checkpoint.get("rows", 0),
+        os.path.getsize(output_file),
+        True,
+        **extra,
+    )
+
+
+def rebuild_journal(output_file, end_time, rows):
+    """
+    输出文件被整体重写后（例如列式输出从恢复日志恢复）按新的文件大小重建断点日志
+
+    保留原日志中的额外字段（完成标记除外），原日志的文件大小已不一致，不做校验
+    """
+    extra = {}
+    try:
+        with open(journal_path(output_file), "r", encoding="utf-8") as f:
+            extra = {k: v for k, v in json.load(f).items() if k not in _JOURNAL_KEYS}
+    except (OSError, ValueError):
+        pass
+    extra.pop("complete", None)
+    write_journal(output_file, end_time, rows, os.path.getsize(output_file), True, **extra)
+
+
+def mark_complete(output_file, end_time, duration):
+    """
+    在断点日志中记录整个文件已转录完成
+
+    Whisper 的最后一个分段通常在音频结束前就结束了，没有这个标记时，
+    重复运行会把末尾剩下的一小段音频单独转录（容易产生幻觉文本）并追加到输出中
+    """
+    update_journal(output_file, end_time, complete=True, duration=duration)
+
+
+def discard_output(output_file):
+    """删除输出文件及其断点日志（需要从头重写时使用）"""
+    for path in (output_file, journal_path(output_file)):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+# 断点日志的基本字段（其余为 update_journal / journal_fields 写入的额外字段）
+_JOURNAL_KEYS = ("end_time", "rows", "csv_size", "updated_at")
+
+
+def write_journal(output_file, end_time, rows, csv_size, sync, **extra):
+    """原子地更新断点日志（先写临时文件再替换）"""
+    path = journal_path(output_file)
+    tmp_path = f"{path}.tmp"
+    checkpoint = {
+        "end_time": end_time,
+        "rows": rows,
+        "csv_size": csv_size,
+        "updated_at": time.time(),
+        **extra,
+    }
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(checkpoint, f)
+        if sync:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class SegmentWriter:
+    """
+    CSV 分段追加写入器
+
+    每次 write() 后立即 flush 并更新断点日志，距上次落盘超过 fsync_interval
+    秒时执行 fsync；close() 时总会 fsync 一次
+
+    用法:
+        with SegmentWriter(output_file, fieldnames) as writer:
+            writer.write(rows)
+    """
+
+    def __init__(
+        self,
+        output_file,
+        fieldnames,
+        fsync_interval=DEFAULT_FSYNC_INTERVAL,
+        journal_fields=None,
+    ):
+        self.output_file = str(output_file)
+        self.fieldnames = fieldnames
+        self.fsync_interval = fsync_interval
+        # 每次更新断点日志时一并写入的字段（例如生成这些分段时使用的选项）
+        self.journal_fields = journal_fields or {}
+        self.rows_written = 0
+        self.end_time = None
+        self._file = None
+        self._writer = None
+        self._last_sync = time.monotonic()
+
+    def _open(self):
+        file_exists = os.path.exists(self.output_file)
+        mode = "a" if file_exists else "w"
+        self._file = open(self.output_file, mode, encoding="utf-8-sig", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames)
+        # 如果是新文件，写入表头
+        if not file_exists:
+            self._writer.writeheader()
+
+    def write(self, rows, **metadata):
+        """追加一批分段（字典需包含 end_time 字段）；metadata 仅用于列式输出，CSV 中忽略"""
+        if not rows:
+            return
+        if self._file is None:
+            self._open()
+
+        for row in rows:
+            self._writer.writerow(row)
+        self._file.flush()
+        self.rows_written += len(rows)
+        self.end_time = float(rows[-1]["end_time"])
+
+        sync = time.monotonic() - self._last_sync >= self.fsync_interval
+        if sync:
+            self._sync()
+        self._update_journal(sync)
+
+    def _sync(self):
+        os.fsync(self._file.fileno())
+        self._last_sync = time.monotonic()
+
+    def _update_journal(self, sync):
+        write_journal(
+            self.output_file,
+            self.end_time,
+            self.rows_written,
+            os.path.getsize(self.output_file),
+            sync,
+            **self.journal_fields,
+        )
+
+    def close(self):
+        if self._file is None:
+            return
+        self._sync()
+        self._update_journal(True)
+        self._file.close()
+        self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
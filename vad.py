@@ -0,0 +1,179 @@
+"""
+语音活动检测（VAD）- audio_to_text.py 推理前去除静音
+会议、带课间休息的讲座等录音中常有大段静音：送入模型之前先找出语音区间，
+只把这些区间拼接起来转录，转录结果的时间戳再映射回原始时间轴。
+既省去静音部分的推理，也避免模型在静音上产生幻觉文本。
+
+检测方法:
+    energy - 按帧能量相对噪声底判断（默认，无额外依赖）
+    silero - Silero VAD 神经网络模型（需 pip install faster-whisper）
+"""
+
+import bisect
+
+import numpy as np
+
+from audio_cache import SAMPLE_RATE
+from chunked_transcribe import FRAME_SECONDS, frame_energy_db
+
+# 支持的检测方法
+VAD_METHODS = ["energy", "silero"]
+
+# 语音帧阈值：高于噪声底（帧能量 10% 分位数）多少 dB
+THRESHOLD_DB = 12.0
+
+# 阈值上限：不高于最响部分（99% 分位数）减去该值，几乎没有静音的录音不会被误删
+DYNAMIC_RANGE_DB = 35.0
+
+# 低于该能量（dB）的帧一律视为静音
+SILENCE_FLOOR_DB = -70.0
+
+# 短于该时长（秒）的停顿不切开
+MIN_SILENCE_SECONDS = 1.0
+
+# 短于该时长（秒）的孤立语音视为噪声
+MIN_SPEECH_SECONDS = 0.25
+
+# 每个语音区间前后保留的余量（秒）
+PAD_SECONDS = 0.3
+
+
+def _merge_spans(spans, min_gap):
+    """合并间隔小于 min_gap 的区间（输入按起点排序）"""
+    merged = []
+    for start, end in spans:
+        if merged and start - merged[-1][1] < min_gap:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def energy_spans(audio):
+    """按帧能量检测语音区间，返回 [(起点秒, 终点秒)]"""
+    energy = frame_energy_db(audio)
+    if len(energy) == 0:
+        return []
+    noise = float(np.percentile(energy, 10))
+    peak = float(np.percentile(energy, 99))
+    threshold = max(min(noise + THRESHOLD_DB, peak - DYNAMIC_RANGE_DB), SILENCE_FLOOR_DB)
+
+    # 语音帧的连续区间：speech 由 False 变 True 处为起点，由 True 变 False 处为终点
+    speech = np.concatenate([[False], energy > threshold, [False]])
+    edges = np.flatnonzero(np.diff(speech.astype(np.int8)))
+    spans = [
+        (float(start) * FRAME_SECONDS, float(end) * FRAME_SECONDS)
+        for start, end in zip(edges[::2], edges[1::2])
+    ]
+    spans = _merge_spans(spans, MIN_SILENCE_SECONDS)
+    return [(start, end) for start, end in spans if end - start >= MIN_SPEECH_SECONDS]
+
+
+def silero_spans(audio):
+    """使用 Silero VAD（faster-whisper 自带的 ONNX 模型）检测语音区间"""
+    try:
+        from faster_whisper.vad import VadOptions, get_speech_timestamps
+    except ImportError:
+        raise ImportError("silero VAD 需要 faster-whisper: pip install faster-whisper")
+
+    options = VadOptions(
+        min_silence_duration_ms=int(MIN_SILENCE_SECONDS * 1000),
+        min_speech_duration_ms=int(MIN_SPEECH_SECONDS * 1000),
+        speech_pad_ms=0,
+    )
+    timestamps = get_speech_timestamps(np.asarray(audio, dtype=np.float32), options)
+    return [(ts["start"] / SAMPLE_RATE, ts["end"] / SAMPLE_RATE) for ts in timestamps]
+
+
+class SpeechTimeline:
+    """
+    语音区间与拼接后音频之间的时间映射
+
+    Args:
+        spans:         语音区间 [(起点秒, 终点秒)]（已加余量、按时间排序、互不重叠）
+        total_seconds: 原始音频时长（秒）
+    """
+
+    def __init__(self, spans, total_seconds):
+        self.spans = spans
+        self.total_seconds = total_seconds
+        # 每个区间在拼接后音频中的起点（秒）
+        self._offsets = []
+        position = 0.0
+        for start, end in spans:
+            self._offsets.append(position)
+            position += end - start
+        self.speech_seconds = position
+
+    @property
+    def skipped_seconds(self):
+        return max(self.total_seconds - self.speech_seconds, 0.0)
+
+    def concatenate(self, audio):
+        """拼接各语音区间的音频"""
+        if not self.spans:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(
+            [
+                audio[int(start * SAMPLE_RATE) : int(end * SAMPLE_RATE)]
+                for start, end in self.spans
+            ]
+        )
+
+    def to_original(self, seconds, is_end=False):
+        """
+        拼接后音频中的时间映射回原始时间轴
+
+        恰好落在两个区间交界处的时间：起点映射到后一个区间的开头，
+        终点映射到前一个区间的末尾（不跨过中间的静音）
+        """
+        if not self.spans:
+            return seconds
+        search = bisect.bisect_left if is_end else bisect.bisect_right
+        index = min(max(search(self._offsets, seconds) - 1, 0), len(self.spans) - 1)
+        start, end = self.spans[index]
+        return round(min(start + max(seconds - self._offsets[index], 0.0), end), 3)
+
+    def remap_segments(self, segments):
+        """分段（及逐词）时间戳映射回原始时间轴（原地修改并返回）"""
+        for seg in segments:
+            seg["start"] = self.to_original(seg["start"])
+            seg["end"] = self.to_original(seg["end"], is_end=True)
+            for word in seg.get("words", []):
+                if "start" in word:
+                    word["start"] = self.to_original(word["start"])
+                if "end" in word:
+                    word["end"] = self.to_original(word["end"], is_end=True)
+        return segments
+
+    def describe(self):
+        """检测结果说明：语音时长、跳过的静音时长及比例"""
+        percent = (
+            100.0 * self.skipped_seconds / self.total_seconds if self.total_seconds else 0.0
+        )
+        return (
+            f"{len(self.spans)} 个语音区间，共 {self.speech_seconds:.1f} 秒；"
+            f"跳过静音 {self.skipped_seconds:.1f} 秒 ({percent:.0f}%)"
+        )
+
+
+def detect_speech(audio, method="energy"):
+    """
+    检测语音区间
+
+    Args:
+        audio:  16kHz 单声道 float32 音频
+        method: 检测方法（energy 或 silero）
+
+    Returns:
+        SpeechTimeline: 各区间已加上前后余量并合并重叠部分
+    """
+    if method not in VAD_METHODS:
+        raise ValueError(f"不支持的 VAD 方法: {method}（可选: {', '.join(VAD_METHODS)}）")
+    total = len(audio) / SAMPLE_RATE
+    spans = energy_spans(audio) if method == "energy" else silero_spans(audio)
+    padded = [
+        (round(max(0.0, start - PAD_SECONDS), 3), round(min(total, end + PAD_SECONDS), 3))
+        for start, end in spans
+    ]
+    return SpeechTimeline(_merge_spans(padded, 0.0), total)
@@ -0,0 +1,216 @@
+"""
+监视目录 - batch_transcribe.py --watch 使用
+发现新的音视频文件后等待其大小和修改时间在 settle_seconds 秒内不再变化
+（避免处理复制到一半的文件），再放入有界的工作队列。
+
+文件事件优先使用 watchdog（Linux 上为 inotify，Windows 上为 ReadDirectoryChangesW），
+未安装 watchdog 或指定 poll=True（NFS/SMB 网络共享上其他主机的写入不会产生
+inotify 事件）时定期用 os.scandir 重新扫描。
+
+依赖（可选）:
+    pip install watchdog
+"""
+
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+# 默认参数
+DEFAULT_SETTLE_SECONDS = 5.0
+DEFAULT_POLL_INTERVAL = 10.0
+DEFAULT_QUEUE_SIZE = 100
+
+
+class FolderWatcher:
+    """
+    监视目录中的新音视频文件，按稳定下来的顺序逐个产出（无限迭代，stop() 后结束）
+
+    Args:
+        directory:      要监视的目录
+        recursive:      是否包括子目录
+        accept:         判断函数 accept(路径, os.stat_result)，返回 False 的文件不处理
+                        （例如已有输出文件、任务清单中已完成）
+        settle_seconds: 文件大小和修改时间保持不变多少秒后才放入队列
+        poll_interval:  轮询模式下重新扫描目录的间隔（秒）
+        queue_size:     工作队列容量，队列满时稳定的文件留在候选中，稍后再放入
+        poll:           强制使用轮询（不使用 watchdog）
+        extensions:     音视频扩展名集合（默认与 batch_transcribe 相同）
+        scan:           扫描函数 scan(directory, recursive)，产出 (路径, os.stat_result)
+                        （默认为 batch_transcribe.iter_media_files）
+    """
+
+    def __init__(
+        self,
+        directory,
+        recursive=False,
+        accept=None,
+        settle_seconds=DEFAULT_SETTLE_SECONDS,
+        poll_interval=DEFAULT_POLL_INTERVAL,
+        queue_size=DEFAULT_QUEUE_SIZE,
+        poll=False,
+        extensions=None,
+        scan=None,
+    ):
+        if extensions is None or scan is None:
+            import batch_transcribe
+
+            extensions = extensions or batch_transcribe.AUDIO_VIDEO_EXTENSIONS
+            scan = scan or batch_transcribe.iter_media_files
+        self.directory = os.path.abspath(directory)
+        self.recursive = recursive
+        self.accept = accept
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.poll = poll
+        self.extensions = extensions
+        self.scan = scan
+        self.queued = 0
+        self.mode = None
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._candidates = {}  # 路径 -> (大小, 修改时间, 开始稳定的时间)
+        self._handled = {}  # 已放入队列或已拒绝的文件 -> (大小, 修改时间)
+        self._stop = threading.Event()
+        self._threads = []
+        self._observer = None
+
+    def start(self):
+        """扫描已有文件，启动文件事件监听（或轮询）和稳定性检查线程"""
+        self.rescan()
+        if not self.poll and self._start_observer():
+            self.mode = "watchdog"
+        else:
+            self.mode = "poll"
+            self._spawn(self._poll_loop, "watch-poll")
+        self._spawn(self._settle_loop, "watch-settle")
+        return self
+
+    def _spawn(self, target, name):
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def _start_observer(self):
+        """启动 watchdog 监听，未安装时返回 False"""
+        try:
+            from watchdog.events import FileSystemEventHandler
+            from watchdog.observers import Observer
+        except ImportError:
+            print("⚠ 未安装 watchdog，改为定期扫描目录（pip install watchdog）")
+            return False
+
+        watcher = self
+
+        class Handler(FileSystemEventHandler):
+            def on_created(self, event):
+                if not event.is_directory:
+                    watcher.notify(event.src_path)
+                elif watcher.recursive:
+                    # 整个目录被移动/复制进来时，其中的文件不一定有单独的事件
+                    watcher.rescan(event.src_path)
+
+            def on_modified(self, event):
+                if not event.is_directory:
+                    watcher.notify(event.src_path)
+
+            def on_moved(self, event):
+                if not event.is_directory:
+                    watcher.notify(event.dest_path)
+                elif watcher.recursive:
+                    watcher.rescan(event.dest_path)
+
+        self._observer = Observer()
+        self._observer.schedule(Handler(), self.directory, recursive=self.recursive)
+        self._observer.daemon = True
+        self._observer.start()
+        return True
+
+    def notify(self, path):
+        """记录可能有变化的文件：加入候选，等待其稳定"""
+        if Path(path).suffix.lower() not in self.extensions:
+            return
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        self._observe(os.path.abspath(path), st)
+
+    def _observe(self, path, st):
+        key = (st.st_size, st.st_mtime_ns)
+        with self._lock:
+            if self._handled.get(path) == key:
+                return
+            previous = self._candidates.get(path)
+            if previous is None or previous[:2] != key:
+                self._candidates[path] = (*key, time.monotonic())
+
+    def rescan(self, directory=None):
+        """扫描目录（默认为监视的根目录），未处理或有变化的文件加入候选"""
+        try:
+            for path, st in self.scan(directory or self.directory, self.recursive):
+                self._observe(os.path.abspath(path), st)
+        except OSError as e:
+            print(f"⚠ 扫描目录失败: {e}")
+
+    def _poll_loop(self):
+        while not self._stop.wait(self.poll_interval):
+            self.rescan()
+
+    def _settle_loop(self):
+        """定期检查候选文件：大小和修改时间稳定 settle_seconds 秒后放入队列"""
+        interval = min(1.0, max(self.settle_seconds / 2, 0.1))
+        while not self._stop.wait(interval):
+            now = time.monotonic()
+            with self._lock:
+                candidates = list(self._candidates.items())
+            for path, (size, mtime_ns, since) in candidates:
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    # 文件已被删除或改名
+                    with self._lock:
+                        self._candidates.pop(path, None)
+                    continue
+                key = (st.st_size, st.st_mtime_ns)
+                if key != (size, mtime_ns):
+                    with self._lock:
+                        self._candidates[path] = (*key, now)
+                    continue
+                if now - since < self.settle_seconds:
+                    continue
+                if self.accept is not None and not self.accept(Path(path), st):
+                    with self._lock:
+                        self._candidates.pop(path, None)
+                        self._handled[path] = key
+                    continue
+                try:
+                    self._queue.put_nowait(Path(path))
+                except queue.Full:
+                    # 队列已满：留在候选中，下次检查时再放入
+                    break
+                with self._lock:
+                    self._candidates.pop(path, None)
+                    self._handled[path] = key
+                self.queued += 1
+
+    def __iter__(self):
+        # 带超时地等待，保证 Ctrl+C 在 Windows 上也能及时响应
+        while not self._stop.is_set():
+            try:
+                yield self._queue.get(timeout=1.0)
+            except queue.Empty:
+                continue
+
+    def total_label(self):
+        """进度显示：已放入队列的文件数"""
+        return str(self.queued)
+
+    def stop(self):
+        self._stop.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+        for thread in self._threads:
+            thread.join(timeout=5)